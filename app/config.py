@@ -23,7 +23,98 @@ class Settings:
     log_level: str = config("LOG_LEVEL", default="INFO")
     bcrypt_rounds: int = config("BCRYPT_ROUNDS", default=12, cast=int)
 
+    # 逗号分隔的指标列表，例如 "sma20,ema12,rsi14,macd"；为空则不做增量计算
+    incremental_indicators: str = config("INCREMENTAL_INDICATORS", default="")
+    incremental_indicator_target: str = config(
+        "INCREMENTAL_INDICATOR_TARGET", default="primary"
+    )
+
+    # 回测等计算任务的进程池大小，0 表示使用 CPU 核数
+    compute_workers: int = config("COMPUTE_WORKERS", default=0, cast=int)
+
+    # 角色权限缓存的最长有效期（秒），角色增删改时立即刷新
+    role_cache_ttl: float = config("ROLE_CACHE_TTL", default=60.0, cast=float)
+
+    # 已认证用户缓存（秒/条数）与令牌解码结果缓存（秒/条数）
+    user_cache_ttl: float = config("USER_CACHE_TTL", default=30.0, cast=float)
+    user_cache_size: int = config("USER_CACHE_SIZE", default=1024, cast=int)
+    token_cache_ttl: float = config("TOKEN_CACHE_TTL", default=300.0, cast=float)
+    token_cache_size: int = config("TOKEN_CACHE_SIZE", default=4096, cast=int)
+
+    # API Key 摘要的 HMAC 密钥（为空时使用 SECRET_KEY）与 Key 表的最长有效期（秒）
+    api_key_secret: str = config("API_KEY_SECRET", default="")
+    api_key_cache_ttl: float = config("API_KEY_CACHE_TTL", default=60.0, cast=float)
+
+    # 同时进行的密码哈希（bcrypt）数，0 表示 CPU 核数的一半
+    password_hash_concurrency: int = config(
+        "PASSWORD_HASH_CONCURRENCY", default=0, cast=int
+    )
+
+    # 行情面板指数名称到 K 线 symbol 的映射，格式 "shanghaiIndex:SH000001,..."
+    market_index_symbols_raw: str = config(
+        "MARKET_INDEX_SYMBOLS",
+        default="shanghaiIndex:SH000001,zhongzheng2000Index:SH932000",
+    )
+
+    # 未推送交易日历时，用该 symbol 的日 K 线推导交易日（默认上证指数）
+    trading_calendar_symbol: str = config(
+        "TRADING_CALENDAR_SYMBOL", default="SH000001"
+    )
+
+    # 实时推送：每个连接的最短帧间隔（毫秒）与待发送更新的上限
+    realtime_tick_ms: int = config("REALTIME_TICK_MS", default=500, cast=int)
+    realtime_max_pending: int = config(
+        "REALTIME_MAX_PENDING", default=5000, cast=int
+    )
+
+    # 通知邮件 SMTP 配置；SMTP_HOST 为空时不发送邮件
+    smtp_host: str = config("SMTP_HOST", default="")
+    smtp_port: int = config("SMTP_PORT", default=25, cast=int)
+    smtp_username: str = config("SMTP_USERNAME", default="")
+    smtp_password: str = config("SMTP_PASSWORD", default="")
+    smtp_sender: str = config("SMTP_SENDER", default="")
+    smtp_use_tls: bool = config("SMTP_USE_TLS", default=False, cast=bool)
+    smtp_use_ssl: bool = config("SMTP_USE_SSL", default=False, cast=bool)
+    smtp_timeout: float = config("SMTP_TIMEOUT", default=10.0, cast=float)
+
+    # 通知分发：每个渠道的发送协程数、批大小、攒批等待、重试次数与首次重试间隔
+    notification_workers: int = config("NOTIFICATION_WORKERS", default=2, cast=int)
+    notification_batch_size: int = config(
+        "NOTIFICATION_BATCH_SIZE", default=50, cast=int
+    )
+    notification_batch_window_ms: int = config(
+        "NOTIFICATION_BATCH_WINDOW_MS", default=200, cast=int
+    )
+    notification_max_retries: int = config(
+        "NOTIFICATION_MAX_RETRIES", default=3, cast=int
+    )
+    notification_retry_delay: float = config(
+        "NOTIFICATION_RETRY_DELAY", default=5.0, cast=float
+    )
+    notification_queue_size: int = config(
+        "NOTIFICATION_QUEUE_SIZE", default=10000, cast=int
+    )
+
+    # 每日预计算涨停梯队的时间（UTC，HH:MM，默认北京时间 16:00），为空则只能手动重建
+    limitup_rebuild_time: str = config("LIMITUP_REBUILD_TIME", default="08:00")
+
+    # 跨 worker 缓存失效：local 为单进程，redis 通过 REDIS_URL 的 pub/sub 广播
+    invalidation_backend: str = config("INVALIDATION_BACKEND", default="local")
+    redis_url: str = config("REDIS_URL", default="redis://localhost:6379/0")
+    invalidation_channel: str = config(
+        "INVALIDATION_CHANNEL", default="stock_platform:invalidation"
+    )
+
     def __init__(self):
+        self.market_index_symbols = {
+            name.strip(): symbol.strip().upper()
+            for name, _, symbol in (
+                item.partition(":")
+                for item in self.market_index_symbols_raw.split(",")
+            )
+            if name.strip() and symbol.strip()
+        }
+
         data_targets_raw = config("DATA_TARGETS", default="")
         if data_targets_raw:
             try:
@@ -1,15 +1,25 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.core.deps import (
+    get_factor_evaluation_service,
     get_industry_analytics_service,
+    get_industry_metrics_service,
     get_optional_active_user,
+    require_permissions,
+)
+from app.models.analytics import (
+    FactorEvaluationResponse,
+    IndustryMetricResponse,
+    IndustryMetricsComputeRequest,
+    IndustryMetricsComputeSummary,
 )
-from app.models.analytics import IndustryMetricResponse
 from app.models.user import User
+from app.services.factor_evaluation_service import FactorEvaluationService
 from app.services.industry_analytics_service import IndustryAnalyticsService
+from app.services.industry_metrics_service import IndustryMetricsService
 
 router = APIRouter(prefix="/analytics", tags=["行业分析"])
 
@@ -51,3 +61,85 @@ async def fetch_industry_metrics(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"查询行业指标失败: {exc}",
         ) from exc
+
+
+@router.post(
+    "/industry/metrics/compute",
+    response_model=IndustryMetricsComputeSummary,
+    summary="计算行业动量/宽度指标",
+    description=(
+        "按 stock_basic.industry 分组，基于日 K 线批量计算各行业的动量"
+        "（成分股 N 日平均涨幅）与宽度（站上 N 日均线的成分股占比），"
+        "结果写入 indicator_data，可通过 /analytics/industry/metrics 查询。"
+    ),
+)
+async def compute_industry_metrics(
+    payload: IndustryMetricsComputeRequest,
+    _: User = Depends(require_permissions(["indicators:write", "stocks:read"])),
+    service: IndustryMetricsService = Depends(get_industry_metrics_service),
+) -> IndustryMetricsComputeSummary:
+    try:
+        return await service.compute_and_store(payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"计算行业指标失败: {exc}",
+        ) from exc
+
+
+@router.get(
+    "/factors/evaluate",
+    response_model=FactorEvaluationResponse,
+    summary="因子评估",
+    description=(
+        "以 indicator_data 中的指标值为因子，对比日 K 线计算的远期收益，"
+        "返回逐日截面 IC / Rank IC、分位组合收益与换手率。"
+    ),
+)
+async def evaluate_factor(
+    indicator: str = Query(..., description="因子对应的指标标识"),
+    start: date = Query(..., description="评估开始日期"),
+    end: date = Query(..., description="评估结束日期"),
+    horizon: int = Query(1, ge=1, le=60, description="远期收益的持有交易日数"),
+    quantiles: int = Query(5, ge=2, le=20, description="分位组数"),
+    field: str = Query(
+        "value", description="因子取值字段：value 或 values.<键名>，如 values.dif"
+    ),
+    timeframe: str = Query("1d", description="指标时间粒度"),
+    target: str = Query("primary", description="指标数据目标别名"),
+    source_target: str = Query("primary", description="K 线数据目标别名"),
+    _: User = Depends(require_permissions(["indicators:read", "stocks:read"])),
+    service: FactorEvaluationService = Depends(get_factor_evaluation_service),
+) -> FactorEvaluationResponse:
+    if field != "value" and not field.startswith("values."):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="field 只能为 value 或 values.<键名>",
+        )
+    try:
+        return await service.evaluate(
+            indicator,
+            start=start,
+            end=end,
+            horizon=horizon,
+            quantiles=quantiles,
+            field=field,
+            timeframe=timeframe,
+            target=target,
+            source_target=source_target,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"因子评估失败: {exc}",
+        ) from exc
@@ -1,15 +1,20 @@
 from datetime import timedelta
+from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.config import settings
 from app.core.deps import (
+    get_api_key_service,
     get_current_active_user,
+    get_current_superuser,
     get_settings_service,
     get_user_service,
 )
 from app.core.security import create_access_token
+from app.models.api_key import ApiKey, ApiKeyCreate, ApiKeyCreated
 from app.models.auth_payloads import LoginRequest, LoginResponse, LoginUser
+from app.services.api_key_service import ApiKeyService
 from app.services.user_service import UserService
 from app.models.user import User, UserCreate
 from app.services.frontend_state_service import SettingsService
@@ -36,7 +41,6 @@ async def login(
     settings_service: SettingsService = Depends(get_settings_service),
 ):
     """用户登录"""
-    await user_service.ensure_default_admin()
     user = await user_service.authenticate_user(payload.username, payload.password)
     if not user:
         raise HTTPException(
@@ -69,3 +73,44 @@ async def login(
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     """获取当前用户信息"""
     return current_user
+
+
+@router.post(
+    "/api-keys",
+    response_model=ApiKeyCreated,
+    status_code=status.HTTP_201_CREATED,
+    summary="创建服务账号 API Key",
+    description="明文 Key 仅在本次响应中返回，数据库只保存其 HMAC-SHA256 摘要。",
+)
+async def create_api_key(
+    payload: ApiKeyCreate,
+    current_user: User = Depends(get_current_superuser),
+    api_key_service: ApiKeyService = Depends(get_api_key_service),
+):
+    try:
+        return await api_key_service.create_key(
+            payload, created_by=current_user.username
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/api-keys", response_model=List[ApiKey], summary="列出 API Key")
+async def list_api_keys(
+    _: User = Depends(get_current_superuser),
+    api_key_service: ApiKeyService = Depends(get_api_key_service),
+):
+    return await api_key_service.list_keys()
+
+
+@router.delete("/api-keys/{key_id}", summary="吊销 API Key")
+async def revoke_api_key(
+    key_id: str,
+    _: User = Depends(get_current_superuser),
+    api_key_service: ApiKeyService = Depends(get_api_key_service),
+):
+    if not await api_key_service.revoke_key(key_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="API Key 不存在"
+        )
+    return {"message": "API Key 已吊销"}
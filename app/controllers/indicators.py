@@ -2,15 +2,24 @@ from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
-from app.core.deps import get_indicator_service, require_permissions
+from app.core.deps import (
+    get_indicator_service,
+    get_technical_indicator_service,
+    require_permissions,
+)
 from app.models.indicator import (
+    IndicatorComputeRequest,
+    IndicatorComputeResponse,
     IndicatorPushRequest,
     IndicatorQueryResponse,
     IndicatorWriteSummary,
 )
 from app.models.user import User
 from app.services.indicator_service import IndicatorService
+from app.services.technical_indicator_service import TechnicalIndicatorService
+from app.utils.streaming import NDJSON_MEDIA_TYPE, iter_ndjson
 
 router = APIRouter(prefix="/indicators", tags=["指标数据"])
 
@@ -94,3 +103,107 @@ async def query_indicator_records(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"查询指标数据失败: {exc}",
         ) from exc
+
+
+@router.get(
+    "/records/stream",
+    summary="流式导出指标数据",
+    description=(
+        "按条件逐批读取指标结果并以 NDJSON（每行一个 JSON 对象）流式返回，"
+        "适合多年区间的大批量导出，服务端内存占用不随结果规模增长。"
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_indicator_records(
+    indicator: str = Query(..., description="指标标识，例如 rsi14"),
+    symbol: Optional[str] = Query(None, description="股票代码，例如 SH600519"),
+    timeframe: Optional[str] = Query(None, description="时间粒度，默认 1d"),
+    start: Optional[datetime] = Query(
+        None, description="开始时间（ISO8601），为空则不限制"
+    ),
+    end: Optional[datetime] = Query(
+        None, description="结束时间（ISO8601），为空则不限制"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, description="返回的记录数上限，为空则导出全部匹配记录"
+    ),
+    tags: Optional[List[str]] = Query(
+        None, description="按标签筛选，支持多次传参，如 ?tags=long&tags=demo"
+    ),
+    target: str = Query("primary", description="查询的数据目标别名，默认为 primary"),
+    _: User = Depends(require_permissions(["indicators:read"])),
+    service: IndicatorService = Depends(get_indicator_service),
+) -> StreamingResponse:
+    """以 NDJSON 流式导出指标结果"""
+    try:
+        items = service.stream(
+            indicator=indicator,
+            symbol=symbol,
+            timeframe=timeframe,
+            start=start,
+            end=end,
+            limit=limit,
+            tags=tags,
+            target=target,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    return StreamingResponse(iter_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post(
+    "/compute",
+    response_model=IndicatorComputeResponse,
+    summary="基于 K 线计算技术指标",
+    description=(
+        "使用已入库的 K 线在服务端计算 SMA/EMA/RSI/MACD/BOLL/ATR/KDJ，"
+        "结果直接返回，不写入数据库。"
+    ),
+)
+async def compute_indicator_records(
+    payload: IndicatorComputeRequest,
+    _: User = Depends(require_permissions(["indicators:read", "stocks:read"])),
+    service: TechnicalIndicatorService = Depends(get_technical_indicator_service),
+) -> IndicatorComputeResponse:
+    """服务端计算技术指标"""
+    try:
+        return await service.compute(payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"计算指标失败: {exc}",
+        ) from exc
+
+
+@router.post(
+    "/compute/persist",
+    response_model=IndicatorWriteSummary,
+    summary="计算技术指标并写入",
+    description=(
+        "与 /indicators/compute 相同的计算逻辑，结果按 indicator_data 的结构 upsert，"
+        "之后可通过 /indicators/records 查询。"
+    ),
+)
+async def compute_and_store_indicator_records(
+    payload: IndicatorComputeRequest,
+    _: User = Depends(require_permissions(["indicators:write", "stocks:read"])),
+    service: TechnicalIndicatorService = Depends(get_technical_indicator_service),
+) -> IndicatorWriteSummary:
+    """服务端计算技术指标并落库"""
+    try:
+        return await service.compute_and_store(payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"写入指标数据失败: {exc}",
+        ) from exc
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from app.core.deps import get_limitup_service, get_optional_active_user
-from app.models.limitup import LimitUpOverview
+from app.core.deps import (
+    get_limitup_service,
+    get_optional_active_user,
+    require_permissions,
+)
+from app.models.limitup import (
+    LimitUpOverview,
+    LimitUpRebuildRequest,
+    LimitUpRebuildSummary,
+)
 from app.models.user import User
 from app.services.frontend_state_service import LimitUpService
 
@@ -17,3 +25,30 @@ async def get_limitup_overview(
     service: LimitUpService = Depends(get_limitup_service),
 ):
     return await service.get_overview(date)
+
+
+@router.post(
+    "/rebuild",
+    response_model=LimitUpRebuildSummary,
+    summary="重建涨停梯队",
+    description=(
+        "基于日 K 线按板块涨跌幅限制（主板 10%、ST 5%、创业板/科创板 20%、北交所 30%）"
+        "与 qlib limit_status 标记推导每日涨停、连板高度与行业分布，按交易日落库。"
+    ),
+)
+async def rebuild_limitup_overview(
+    payload: LimitUpRebuildRequest,
+    _: User = Depends(require_permissions(["stocks:write"])),
+    service: LimitUpService = Depends(get_limitup_service),
+) -> LimitUpRebuildSummary:
+    try:
+        return await service.rebuild(payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"重建涨停梯队失败: {exc}",
+        ) from exc
@@ -0,0 +1,103 @@
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.deps import (
+    get_current_active_user,
+    get_effective_permissions,
+    get_role_service,
+)
+from app.core.realtime import DATASETS, Subscription, realtime_hub
+from app.models.user import User
+from app.services.role_service import RoleService
+from app.utils.streaming import SSE_MEDIA_TYPE, encode_sse_event
+
+router = APIRouter(prefix="/realtime", tags=["实时推送"])
+
+DATASET_PERMISSIONS = {"stock_kline": "stocks:read", "indicator": "indicators:read"}
+# 无数据时的心跳间隔（秒），防止代理因空闲断开连接
+HEARTBEAT_SECONDS = 15.0
+
+
+def _split(value: Optional[str], normalize=str.strip) -> List[str]:
+    if not value:
+        return []
+    return list(dict.fromkeys(normalize(item) for item in value.split(",") if item.strip()))
+
+
+async def _iter_events(
+    request: Request, subscription: Subscription
+) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            frame = await subscription.next_frame(HEARTBEAT_SECONDS)
+            if await request.is_disconnected():
+                break
+            if frame is None:
+                yield b": ping\n\n"
+                continue
+            yield encode_sse_event("update", frame)
+    finally:
+        realtime_hub.unsubscribe(subscription)
+
+
+@router.get(
+    "/stream",
+    summary="订阅实时 K 线与指标（SSE）",
+    description=(
+        "以 Server-Sent Events 推送新写入的 K 线（`stock_kline`）与指标点（`indicator`）。"
+        "按 `symbols`/`frequencies`/`indicators` 过滤，同一 symbol 的多次更新在一个 tick 内"
+        "合并为最新一条，每帧为 `event: update`，数据含 `seq`、`items` 与被合并丢弃的 `dropped` 数。"
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_realtime_updates(
+    request: Request,
+    datasets: str = Query(
+        "stock_kline,indicator", description="逗号分隔的数据集：stock_kline,indicator"
+    ),
+    symbols: Optional[str] = Query(
+        None, description="逗号分隔的代码，例如 SH600519,SZ000001；为空表示全部"
+    ),
+    frequencies: Optional[str] = Query(
+        None, description="K 线周期过滤，例如 d,15；为空表示全部"
+    ),
+    indicators: Optional[str] = Query(
+        None, description="指标过滤，例如 sma20,rsi14；为空表示全部"
+    ),
+    target: str = Query("primary", description="订阅的数据目标别名"),
+    current_user: User = Depends(get_current_active_user),
+    role_service: RoleService = Depends(get_role_service),
+) -> StreamingResponse:
+    requested = _split(datasets, lambda item: item.strip().lower())
+    unknown = [dataset for dataset in requested if dataset not in DATASETS]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"datasets 仅支持 {', '.join(DATASETS)}",
+        )
+
+    permissions = await get_effective_permissions(current_user, role_service)
+    missing = sorted(
+        {DATASET_PERMISSIONS[dataset] for dataset in requested} - permissions
+    )
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要权限: " + ",".join(missing),
+        )
+
+    subscription = realtime_hub.subscribe(
+        requested,
+        target=target.strip().lower() or "primary",
+        symbols=_split(symbols, lambda item: item.strip().upper().replace(".", "")),
+        indicators=_split(indicators, lambda item: item.strip().lower()),
+        frequencies=_split(frequencies, lambda item: item.strip().lower()),
+    )
+    return StreamingResponse(
+        _iter_events(request, subscription),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.core.deps import get_optional_active_user, get_settings_service
 from app.models.settings import SettingsData
@@ -22,5 +22,10 @@ async def save_settings_data(
     current_user: User = Depends(get_optional_active_user),
     service: SettingsService = Depends(get_settings_service),
 ):
-    await service.save_settings(current_user.username, payload)
+    try:
+        await service.save_settings(current_user.username, payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
     return {"ok": True}
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 
 from app.core.deps import (
+    get_quote_service,
+    get_screener_service,
     get_stock_data_service,
+    get_trading_calendar_service,
     require_permissions,
 )
 from app.models.stock_data import (
@@ -9,9 +16,18 @@ from app.models.stock_data import (
     DataWriteSummary,
     StockBasicBatch,
     StockKlineBatch,
+    StockQuotesResponse,
+    StockScreenRequest,
+    StockScreenResponse,
+    TradingCalendarBatch,
+    TradingCalendarResponse,
 )
 from app.models.user import User
+from app.services.quote_service import QuoteService
+from app.services.screener_service import ScreenerService
 from app.services.stock_data_service import StockDataService
+from app.services.trading_calendar_service import TradingCalendarService
+from app.utils.streaming import NDJSON_MEDIA_TYPE, encode_json, iter_ndjson
 
 router = APIRouter(prefix="/stocks", tags=["数据接入"])
 
@@ -79,3 +95,143 @@ async def ingest_stock_kline(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"写入 K 线数据失败: {exc}",
         ) from exc
+
+
+@router.get(
+    "/kline/stream",
+    summary="流式导出 K 线数据",
+    description=(
+        "按时间升序逐批读取已落库的 K 线并以 NDJSON（每行一个 JSON 对象）流式返回，"
+        "适合长区间历史数据抽取。"
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_stock_kline(
+    symbol: str = Query(..., description="股票代码，例如 SH600519"),
+    frequency: str = Query("d", description="K 线周期：d/w/m/15/30/60"),
+    start: Optional[datetime] = Query(
+        None, description="开始时间（ISO8601），为空则不限制"
+    ),
+    end: Optional[datetime] = Query(
+        None, description="结束时间（ISO8601），为空则不限制"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, description="返回的记录数上限，为空则导出全部匹配记录"
+    ),
+    target: str = Query("primary", description="查询的数据目标别名，默认为 primary"),
+    _: User = Depends(require_permissions(["stocks:read"])),
+    service: StockDataService = Depends(get_stock_data_service),
+) -> StreamingResponse:
+    try:
+        bars = service.stream_kline(
+            symbol=symbol,
+            frequency=frequency,
+            start=start,
+            end=end,
+            limit=limit,
+            target=target,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    return StreamingResponse(iter_ndjson(bars), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post(
+    "/screen",
+    response_model=StockScreenResponse,
+    summary="条件选股",
+    description=(
+        "在内存中的全市场最新快照（最新日 K + 股票基础信息）上按表达式筛选，"
+        "例如 `pe_ttm < 20 and pct_change > 3 and industry in (\"银行\", \"证券\")`，"
+        "支持排序与 Top N。"
+    ),
+)
+async def screen_stocks(
+    payload: StockScreenRequest,
+    _: User = Depends(require_permissions(["stocks:read"])),
+    service: ScreenerService = Depends(get_screener_service),
+) -> StockScreenResponse:
+    try:
+        return await service.screen(payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"选股失败: {exc}",
+        ) from exc
+
+
+@router.get(
+    "/quotes",
+    response_model=StockQuotesResponse,
+    summary="批量查询最新行情",
+    description="从进程内最新行情缓存读取多只股票的最新一根 K 线，一次可查询数千只。",
+)
+async def get_latest_quotes(
+    symbols: str = Query(
+        ..., description="逗号分隔的股票代码，例如 SH600519,600036"
+    ),
+    frequency: str = Query("d", description="K 线周期：d/w/m/15/30/60"),
+    _: User = Depends(require_permissions(["stocks:read"])),
+    service: QuoteService = Depends(get_quote_service),
+) -> Response:
+    try:
+        quotes = await service.get_quotes(symbols.split(","), frequency)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    # 数千条行情直接编码，避免响应模型逐字段二次序列化
+    return Response(content=encode_json(quotes), media_type="application/json")
+
+
+@router.post(
+    "/calendar",
+    response_model=DataWriteSummary,
+    summary="推送交易日历",
+    description=(
+        "写入沪深交易所的交易日列表。未推送的日期区间由基准指数日 K 线推导，"
+        "超出已知区间时按工作日推算。"
+    ),
+)
+async def ingest_trading_calendar(
+    payload: TradingCalendarBatch,
+    _: User = Depends(require_permissions(["stocks:write"])),
+    service: TradingCalendarService = Depends(get_trading_calendar_service),
+) -> DataWriteSummary:
+    try:
+        return await service.ingest(payload)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    except Exception as exc:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"写入交易日历失败: {exc}",
+        ) from exc
+
+
+@router.get(
+    "/calendar",
+    response_model=TradingCalendarResponse,
+    summary="查询交易日",
+    description="返回 [start, end] 区间内的交易日。",
+)
+async def get_trading_calendar(
+    start: date = Query(..., description="开始日期"),
+    end: date = Query(..., description="结束日期"),
+    _: User = Depends(require_permissions(["stocks:read"])),
+    service: TradingCalendarService = Depends(get_trading_calendar_service),
+) -> TradingCalendarResponse:
+    try:
+        return await service.get_range(start, end)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
@@ -1,12 +1,21 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from app.core.deps import (
+    get_backtest_service,
     get_current_active_user,
     get_current_superuser,
     get_strategy_service,
     require_permissions,
 )
+from app.services.backtest_service import BacktestService
 from app.services.strategy_service import StrategyService
+from app.models.backtest import (
+    BacktestBatchRequest,
+    BacktestBatchResponse,
+    BacktestResult,
+    BacktestSweepRequest,
+)
 from app.models.strategy import (
     Strategy,
     StrategyCreate,
@@ -15,6 +24,7 @@ from app.models.strategy import (
     StrategySubscriptionCreate,
 )
 from app.models.user import User
+from app.utils.streaming import NDJSON_MEDIA_TYPE, iter_ndjson
 
 router = APIRouter(prefix="/strategies", tags=["策略管理"])
 
@@ -55,6 +65,22 @@ async def get_public_strategies(
     return strategies
 
 
+@router.post("/backtests", response_model=BacktestBatchResponse)
+async def run_backtests(
+    payload: BacktestBatchRequest,
+    current_user: User = Depends(require_permissions(["strategies:read"])),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+):
+    """批量回测多个策略（在进程池中并行计算）"""
+    try:
+        return await backtest_service.run_many(payload.strategy_ids, current_user)
+    except Exception:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量回测失败",
+        )
+
+
 @router.get("/{strategy_id}", response_model=Strategy)
 async def get_strategy(
     strategy_id: str,
@@ -139,6 +165,67 @@ async def get_my_subscriptions(
     return subscriptions
 
 
+@router.post("/{strategy_id}/backtest", response_model=BacktestResult)
+async def run_backtest(
+    strategy_id: str,
+    current_user: User = Depends(require_permissions(["strategies:read"])),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+):
+    """回测策略，参数取自策略的 parameters（universe/start/end/fee_rate 等）"""
+    try:
+        return await backtest_service.run(strategy_id, current_user)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="策略回测失败"
+        )
+
+
+@router.get("/{strategy_id}/backtest", response_model=BacktestResult)
+async def get_latest_backtest(
+    strategy_id: str,
+    current_user: User = Depends(require_permissions(["strategies:read"])),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+):
+    """获取策略最近一次回测结果"""
+    try:
+        result = await backtest_service.get_latest(strategy_id, current_user)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="该策略暂无回测结果"
+        )
+    return result
+
+
+@router.post("/{strategy_id}/backtest/sweep", response_class=StreamingResponse)
+async def sweep_backtest(
+    strategy_id: str,
+    payload: BacktestSweepRequest,
+    current_user: User = Depends(require_permissions(["strategies:read"])),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+):
+    """参数扫描：以 NDJSON 流式返回进度与排行榜，每完成一个组合推送一行"""
+    try:
+        stream = await backtest_service.sweep(strategy_id, payload, current_user)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:  # pragma: no cover - defensive
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="参数扫描失败"
+        )
+    # 每个进度事件单独刷新，客户端可以实时看到排行榜
+    return StreamingResponse(
+        iter_ndjson(stream, chunk_size=1), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
 # 管理员路由
 @router.get("/admin/all", response_model=List[Strategy])
 async def get_all_strategies(
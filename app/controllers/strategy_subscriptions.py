@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
-from app.core.deps import get_optional_active_user, get_subscription_service
+from app.core.deps import (
+    get_notification_service,
+    get_optional_active_user,
+    get_subscription_service,
+    require_permissions,
+)
+from app.models.notification import NotificationDispatchSummary, StrategySignal
 from app.models.subscription import StrategySubscriptionState
 from app.models.user import User
 from app.services.frontend_state_service import StrategySubscriptionService
+from app.services.notification_service import NotificationService
 
 router = APIRouter(prefix="/strategies", tags=["策略订阅"])
 
@@ -51,3 +58,27 @@ async def update_blacklist(
 ):
     await service.update_blacklist(current_user.username, payload.blacklist)
     return {"ok": True}
+
+
+@router.post(
+    "/{strategy_id}/signals",
+    response_model=NotificationDispatchSummary,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="推送策略信号通知",
+    description=(
+        "按订阅关系把调仓信号渲染为用户的通知模板，放入各渠道的发送队列后立即返回，"
+        "邮件由后台批量发送并自动重试。"
+    ),
+)
+async def publish_strategy_signal(
+    strategy_id: str,
+    payload: StrategySignal,
+    _: User = Depends(require_permissions(["strategies:write"])),
+    service: NotificationService = Depends(get_notification_service),
+) -> NotificationDispatchSummary:
+    try:
+        return await service.publish_signal(strategy_id, payload)
+    except RuntimeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        ) from exc
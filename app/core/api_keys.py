@@ -0,0 +1,90 @@
+"""
+API Key 内存表
+
+数据推送等机器客户端用 ``X-API-Key`` 请求头认证。Key 只以 HMAC-SHA256（密钥为
+``API_KEY_SECRET``，缺省使用 ``SECRET_KEY``）摘要形式存储，校验时对请求中的 Key
+做一次 HMAC 后在内存表中查找，不访问数据库也不做 bcrypt。
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+from app.config import settings
+
+KEY_PREFIX = "smp_"
+# 明文 Key 中用于识别的前缀长度（含 KEY_PREFIX），会随列表接口返回
+DISPLAY_PREFIX_LENGTH = 12
+
+
+def hash_api_key(key: str) -> str:
+    secret = (settings.api_key_secret or settings.secret_key).encode("utf-8")
+    return hmac.new(secret, key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def generate_api_key() -> Tuple[str, str]:
+    """New plaintext key and its display prefix."""
+    key = KEY_PREFIX + secrets.token_urlsafe(32)
+    return key, key[:DISPLAY_PREFIX_LENGTH]
+
+
+@dataclass(frozen=True)
+class ApiKeyRecord:
+    id: str
+    name: str
+    username: str
+    permissions: FrozenSet[str]
+    expires_at: Optional[datetime] = None
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at is not None and self.expires_at <= (
+            now or datetime.utcnow()
+        )
+
+
+class ApiKeyTable:
+    """Key hash → record, reloaded when the key data version changes or on TTL."""
+
+    def __init__(self, ttl: float = 60.0) -> None:
+        self.ttl = ttl
+        self._records: Dict[str, ApiKeyRecord] = {}
+        self._version: Optional[Hashable] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_fresh(self, version: Hashable) -> bool:
+        return (
+            self._version is not None
+            and self._version == version
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def load(
+        self, records: Iterable[Tuple[str, ApiKeyRecord]], version: Hashable
+    ) -> None:
+        table = dict(records)
+        with self._lock:
+            self._records = table
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def lookup(self, key: str) -> Optional[ApiKeyRecord]:
+        """Record for a plaintext ``key``; ``None`` when unknown or expired."""
+        record = self._records.get(hash_api_key(key))
+        if record is None or record.is_expired():
+            return None
+        return record
+
+    def invalidate(self) -> None:
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+api_key_table = ApiKeyTable(ttl=settings.api_key_cache_ttl)
@@ -0,0 +1,104 @@
+"""
+进程内结果缓存
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class VersionedLRUCache:
+    """LRU cache whose entries are only valid for the data version they were built on."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = max(1, maxsize)
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TTLLRUCache:
+    """LRU cache whose entries expire ``ttl`` seconds after they were stored."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 30.0) -> None:
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop every entry whose value matches ``predicate``."""
+        with self._lock:
+            stale = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LoopLock:
+    """An ``asyncio.Lock`` per event loop, serializing cache reloads (single flight)."""
+
+    def __init__(self) -> None:
+        self._slot: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = None
+
+    def get(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        slot = self._slot
+        if slot is None or slot[0] is not loop:
+            slot = self._slot = (loop, asyncio.Lock())
+        return slot[1]
@@ -0,0 +1,71 @@
+"""
+进程内数据版本号
+
+写入路径在落库后调用 ``bump``，读路径把版本号作为缓存戳，版本不一致即视为失效。
+``bump`` 同时发布到失效总线，其它 worker 收到后推进各自的版本号。
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.invalidation import (
+    ALL,
+    InvalidationBus,
+    InvalidationEvent,
+    invalidation_bus,
+)
+
+
+class DataVersionRegistry:
+    """Monotonic version counters keyed by ``(dataset, key)``."""
+
+    def __init__(self, bus: Optional[InvalidationBus] = None) -> None:
+        self._versions: Dict[Tuple[str, str], int] = {}
+        # 尚未出现过的 key 的版本号；全量失效时抬高，使所有 key 都换新版本
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(ALL, self._on_invalidation)
+
+    def get(self, dataset: str, key: str) -> int:
+        return self._versions.get((dataset, key), self._floor)
+
+    def bump(self, dataset: str, key: str, symbols: Iterable[str] = ()) -> int:
+        """Advance the version; ``symbols`` narrows what other workers reload."""
+        with self._lock:
+            version = self._versions.get((dataset, key), self._floor) + 1
+            self._versions[(dataset, key)] = version
+        if self.bus is not None:
+            self.bus.publish(dataset, key, version, symbols)
+        return version
+
+    def observe(self, dataset: str, key: str, version: int) -> int:
+        """Advance past a version bumped in another worker (never publishes)."""
+        with self._lock:
+            current = self._versions.get((dataset, key), self._floor)
+            version = max(current + 1, version)
+            self._versions[(dataset, key)] = version
+            return version
+
+    def advance_all(self) -> None:
+        """Invalidate every versioned cache, e.g. after missing remote events."""
+        with self._lock:
+            self._floor = max([self._floor, *self._versions.values()]) + 1
+            self._versions.clear()
+
+    def _on_invalidation(self, event: InvalidationEvent) -> None:
+        if not event.remote:
+            return
+        if event.dataset == ALL:
+            self.advance_all()
+        else:
+            self.observe(event.dataset, event.key, event.version)
+
+
+def indicator_version_key(target: Optional[str], indicator: str) -> str:
+    """Version key for one indicator in one storage target."""
+    return f"{(target or 'primary').strip().lower()}:{indicator.strip().lower()}"
+
+
+data_versions = DataVersionRegistry(invalidation_bus)
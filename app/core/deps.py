@@ -1,13 +1,18 @@
-from typing import List, Optional
+from typing import FrozenSet, List, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.data_sinks import data_sink_registry
 from app.core.security import verify_token
 from app.models.user import User
+from app.services.api_key_service import ApiKeyService
+from app.services.backtest_service import BacktestService
+from app.services.factor_evaluation_service import FactorEvaluationService
 from app.services.indicator_service import IndicatorService
 from app.services.industry_analytics_service import IndustryAnalyticsService
+from app.services.industry_metrics_service import IndustryMetricsService
+from app.services.notification_service import NotificationService
 from app.services.qlib_data_service import QlibDataIngestionService
 from app.services.role_service import RoleService
 from app.services.frontend_state_service import (
@@ -18,12 +23,21 @@ from app.services.frontend_state_service import (
     SettingsService,
     StrategySubscriptionService,
 )
+from app.services.quote_service import QuoteService
+from app.services.screener_service import ScreenerService
 from app.services.stock_data_service import StockDataService
 from app.services.strategy_service import StrategyService
+from app.services.technical_indicator_service import TechnicalIndicatorService
+from app.services.trading_calendar_service import TradingCalendarService
 from app.services.user_service import UserService
 
 security = HTTPBearer(scheme_name="BearerAuth")
 optional_security = HTTPBearer(scheme_name="OptionalBearerAuth", auto_error=False)
+# require_permissions 接受 Bearer 令牌或 X-API-Key 之一，由依赖自行判断缺失
+permission_bearer = HTTPBearer(scheme_name="BearerAuth", auto_error=False)
+api_key_header = APIKeyHeader(
+    name="X-API-Key", scheme_name="ApiKeyAuth", auto_error=False
+)
 
 
 def get_user_service() -> UserService:
@@ -34,14 +48,26 @@ def get_role_service() -> RoleService:
     return RoleService()
 
 
+def get_api_key_service() -> ApiKeyService:
+    return ApiKeyService()
+
+
 def get_indicator_service() -> IndicatorService:
     return IndicatorService(registry=data_sink_registry)
 
 
+def get_technical_indicator_service() -> TechnicalIndicatorService:
+    return TechnicalIndicatorService(registry=data_sink_registry)
+
+
 def get_strategy_service() -> StrategyService:
     return StrategyService()
 
 
+def get_backtest_service() -> BacktestService:
+    return BacktestService(registry=data_sink_registry)
+
+
 def get_qlib_data_service() -> QlibDataIngestionService:
     return QlibDataIngestionService()
 
@@ -50,10 +76,30 @@ def get_stock_data_service() -> StockDataService:
     return StockDataService(registry=data_sink_registry)
 
 
+def get_quote_service() -> QuoteService:
+    return QuoteService(registry=data_sink_registry)
+
+
+def get_screener_service() -> ScreenerService:
+    return ScreenerService(registry=data_sink_registry)
+
+
+def get_trading_calendar_service() -> TradingCalendarService:
+    return TradingCalendarService(registry=data_sink_registry)
+
+
 def get_industry_analytics_service() -> IndustryAnalyticsService:
     return IndustryAnalyticsService(registry=data_sink_registry)
 
 
+def get_industry_metrics_service() -> IndustryMetricsService:
+    return IndustryMetricsService(registry=data_sink_registry)
+
+
+def get_factor_evaluation_service() -> FactorEvaluationService:
+    return FactorEvaluationService(registry=data_sink_registry)
+
+
 def get_settings_service() -> SettingsService:
     return SettingsService()
 
@@ -74,6 +120,10 @@ def get_subscription_service() -> StrategySubscriptionService:
     return StrategySubscriptionService()
 
 
+def get_notification_service() -> NotificationService:
+    return NotificationService()
+
+
 def get_account_service() -> AccountService:
     return AccountService()
 
@@ -94,7 +144,7 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
 
-    user = await user_service.get_user_by_username(username)
+    user = await user_service.get_cached_user_by_username(username)
     if user is None:
         raise credentials_exception
 
@@ -117,10 +167,10 @@ async def get_optional_user(
                 detail="无法验证凭据",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        user = await user_service.get_user_by_username(username)
+        user = await user_service.get_cached_user_by_username(username)
         if user:
             return user
-    return await user_service.ensure_default_admin()
+    return await user_service.get_default_admin()
 
 
 async def get_optional_active_user(
@@ -166,18 +216,66 @@ def require_roles(required_roles: List[str]):
     return dependency
 
 
+async def get_effective_permissions(
+    user: User, role_service: RoleService
+) -> FrozenSet[str]:
+    """合并用户直接权限与角色权限（读取进程内角色权限缓存）"""
+    return await role_service.get_effective_permissions(user)
+
+
+async def authenticate_api_key(
+    api_key: str, user_service: UserService, api_key_service: ApiKeyService
+) -> Tuple[User, FrozenSet[str]]:
+    """API Key 对应的服务账号及 Key 自身的权限"""
+    record = await api_key_service.authenticate(api_key)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API Key 无效或已过期",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+    user = await user_service.get_cached_user_by_username(record.username)
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API Key 对应的用户不存在或已禁用",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+    return user, record.permissions
+
+
 def require_permissions(required_permissions: List[str]):
+    required = frozenset(required_permissions)
+
     async def dependency(
-        current_user: User = Depends(get_current_active_user),
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(
+            permission_bearer
+        ),
+        api_key: Optional[str] = Depends(api_key_header),
+        user_service: UserService = Depends(get_user_service),
         role_service: RoleService = Depends(get_role_service),
+        api_key_service: ApiKeyService = Depends(get_api_key_service),
     ) -> User:
-        # 合并用户直接权限与角色权限
-        effective_permissions = set(current_user.permissions or [])
-        for role_name in current_user.roles or []:
-            role = await role_service.get_role_by_name(role_name)
-            if role:
-                effective_permissions.update(role.permissions or [])
-        if not set(required_permissions).issubset(effective_permissions):
+        if api_key:
+            current_user, key_permissions = await authenticate_api_key(
+                api_key, user_service, api_key_service
+            )
+            # Key 不能超出服务账号自身的权限
+            effective_permissions = key_permissions & await get_effective_permissions(
+                current_user, role_service
+            )
+        else:
+            if credentials is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated"
+                )
+            current_user = await get_current_active_user(
+                await get_current_user(credentials, user_service)
+            )
+            effective_permissions = await get_effective_permissions(
+                current_user, role_service
+            )
+        if not required <= effective_permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="需要权限: " + ",".join(required_permissions),
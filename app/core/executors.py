@@ -0,0 +1,84 @@
+"""
+执行器：CPU 密集的计算（回测等）在子进程执行，密码哈希（bcrypt）在有界线程池执行，
+避免阻塞事件循环
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_password_pool: Optional[ThreadPoolExecutor] = None
+# 按事件循环创建的并发槽位：(loop, semaphore)
+_password_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Lazily create the shared process pool (``spawn`` so workers start clean)."""
+    global _process_pool
+    if _process_pool is None:
+        workers = settings.compute_workers or os.cpu_count() or 1
+        _process_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info("Started compute process pool with %s workers", workers)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def password_hash_concurrency() -> int:
+    # 缺省留一半核给事件循环与其它请求
+    return max(1, settings.password_hash_concurrency or (os.cpu_count() or 2) // 2)
+
+
+def get_password_pool() -> ThreadPoolExecutor:
+    """Lazily create the bounded thread pool for bcrypt (which releases the GIL)."""
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(
+            max_workers=password_hash_concurrency(),
+            thread_name_prefix="password-hash",
+        )
+    return _password_pool
+
+
+def _password_semaphore() -> asyncio.Semaphore:
+    global _password_slots
+    loop = asyncio.get_running_loop()
+    if _password_slots is None or _password_slots[0] is not loop:
+        _password_slots = (loop, asyncio.Semaphore(password_hash_concurrency()))
+    return _password_slots[1]
+
+
+async def run_password_task(func: Callable[..., T], *args: Any) -> T:
+    """Run a hashing call off the event loop.
+
+    At most ``password_hash_concurrency()`` calls run at once; login bursts
+    wait on the semaphore without tying up threads, and a cancelled request
+    gives its slot back before any hashing starts.
+    """
+    async with _password_semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_pool(), func, *args)
+
+
+def shutdown_password_pool() -> None:
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
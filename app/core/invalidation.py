@@ -0,0 +1,332 @@
+"""
+跨进程缓存失效总线
+
+写入路径通过 ``data_versions.bump`` 发布 ``(dataset, key, version)`` 事件，各缓存层
+按数据集订阅。``UVICORN_WORKERS > 1`` 时事件经后端广播到其它 worker，收到远端事件
+的进程推进本地版本号或把缓存标记为待重新加载：
+
+- ``local``：单进程，不做跨进程广播
+- ``redis``：Redis pub/sub，断线重连后广播一次全量失效（``dataset == "*"``），
+  弥补断线期间错过的事件
+- ``MemoryBroker`` / ``MemoryBackend``：同一进程内连接多条总线，模拟多 worker，
+  用于测试
+
+K 线与基础信息的事件带上本次写入的 symbol（最多 ``MAX_EVENT_SYMBOLS`` 个），接收方
+只需重新加载这些 symbol；不带 symbol 的事件表示整个数据集失效。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 订阅全部数据集，同时也是全量失效事件的数据集与 key
+ALL = "*"
+# 单个事件携带的 symbol 上限，超过时退化为整个数据集失效
+MAX_EVENT_SYMBOLS = 1000
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    dataset: str
+    key: str
+    version: int
+    origin: str
+    # 本次写入涉及的 symbol；为空表示不限于某些 symbol
+    symbols: Tuple[str, ...] = ()
+    # 是否来自其它进程；本进程发布的事件对本地缓存通常已经生效
+    remote: bool = False
+
+    def matches(self, key: str) -> bool:
+        return self.key == ALL or self.key == key
+
+    def to_json(self) -> str:
+        payload = asdict(self)
+        payload.pop("remote")
+        return json.dumps(payload)
+
+    @classmethod
+    def from_json(cls, data: str) -> "InvalidationEvent":
+        payload = json.loads(data)
+        return cls(
+            dataset=str(payload["dataset"]),
+            key=str(payload["key"]),
+            version=int(payload["version"]),
+            origin=str(payload["origin"]),
+            symbols=tuple(str(symbol) for symbol in payload.get("symbols") or ()),
+        )
+
+
+Handler = Callable[[InvalidationEvent], None]
+Deliver = Callable[[InvalidationEvent], None]
+
+
+class InvalidationBackend:
+    """Transport carrying events between processes."""
+
+    async def start(self, deliver: Deliver) -> None:
+        """Begin delivering events published by other processes to ``deliver``."""
+
+    def publish(self, event: InvalidationEvent) -> None:
+        """Forward ``event`` without blocking; may be called from any thread."""
+
+    async def stop(self) -> None:
+        """Release connections and background tasks."""
+
+
+class LocalBackend(InvalidationBackend):
+    """Single-process deployments: events never leave the process."""
+
+
+class MemoryBroker:
+    """Fan-out between buses living in one process (stands in for Redis)."""
+
+    def __init__(self) -> None:
+        self._deliveries: List[Deliver] = []
+
+    def attach(self, deliver: Deliver) -> None:
+        self._deliveries.append(deliver)
+
+    def detach(self, deliver: Deliver) -> None:
+        if deliver in self._deliveries:
+            self._deliveries.remove(deliver)
+
+    def broadcast(self, event: InvalidationEvent) -> None:
+        for deliver in list(self._deliveries):
+            deliver(event)
+
+
+class MemoryBackend(InvalidationBackend):
+    def __init__(self, broker: MemoryBroker) -> None:
+        self.broker = broker
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self.broker.attach(deliver)
+
+    def publish(self, event: InvalidationEvent) -> None:
+        self.broker.broadcast(event)
+
+    async def stop(self) -> None:
+        if self._deliver is not None:
+            self.broker.detach(self._deliver)
+            self._deliver = None
+
+
+class RedisBackend(InvalidationBackend):
+    """Redis pub/sub on one channel, with reconnect and a bounded outbox."""
+
+    def __init__(
+        self,
+        url: str,
+        channel: str,
+        reconnect_delay: float = 1.0,
+        outbox_size: int = 10000,
+    ) -> None:
+        self.url = url
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.outbox_size = outbox_size
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # 发件箱溢出丢弃过事件，恢复发送时先广播一次全量失效
+        self._overflowed = False
+
+    async def start(self, deliver: Deliver) -> None:
+        # 仅启用 Redis 后端时才需要 redis 客户端
+        from redis import asyncio as aioredis
+
+        self._client = aioredis.from_url(self.url)
+        self._loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue(maxsize=self.outbox_size)
+        self._tasks = [
+            asyncio.create_task(self._listen(deliver), name="invalidation-listen"),
+            asyncio.create_task(self._send(), name="invalidation-send"),
+        ]
+        logger.info("Invalidation bus using Redis channel %s", self.channel)
+
+    def publish(self, event: InvalidationEvent) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        payload = event.to_json()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._enqueue(payload)
+        else:
+            loop.call_soon_threadsafe(self._enqueue, payload)
+
+    def _enqueue(self, payload: str) -> None:
+        if self._outbox is None:
+            return
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            if not self._overflowed:
+                logger.warning("Invalidation outbox full, dropping events")
+            self._overflowed = True
+
+    async def _send(self) -> None:
+        from redis.exceptions import RedisError
+
+        payload: Optional[str] = None
+        failing = False
+        while True:
+            if payload is None:
+                payload = await self._outbox.get()
+            try:
+                if self._overflowed:
+                    reset = InvalidationEvent(ALL, ALL, 0, "redis").to_json()
+                    await self._client.publish(self.channel, reset)
+                    self._overflowed = False
+                await self._client.publish(self.channel, payload)
+                payload = None
+                failing = False
+            except (RedisError, OSError) as exc:
+                # 其它 worker 的订阅连接可能一直正常，不会触发重连后的全量失效，
+                # 所以事件留在本地重试，不能丢弃；重试期间新事件在发件箱中排队
+                log = logger.debug if failing else logger.warning
+                log("Failed to publish invalidation event (%s), retrying", exc)
+                failing = True
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen(self, deliver: Deliver) -> None:
+        missed = False
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                if missed:
+                    # 断线期间可能错过了事件，让所有缓存失效一次
+                    deliver(InvalidationEvent(ALL, ALL, 0, "redis"))
+                    missed = False
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        event = InvalidationEvent.from_json(message["data"])
+                    except (KeyError, TypeError, ValueError):
+                        logger.warning("Ignoring malformed invalidation event")
+                        continue
+                    deliver(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # 同一次断线只告警一次，重试期间降为 debug
+                log = logger.debug if missed else logger.warning
+                log(
+                    "Invalidation subscription lost (%s), retrying in %ss",
+                    exc,
+                    self.reconnect_delay,
+                )
+                missed = True
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:  # pragma: no cover - defensive
+                    pass
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._outbox = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class InvalidationBus:
+    """Dispatch invalidation events to cache layers, locally and across workers."""
+
+    def __init__(self, backend: Optional[InvalidationBackend] = None) -> None:
+        self.backend = backend or LocalBackend()
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def subscribe(self, dataset: str, handler: Handler) -> None:
+        """Call ``handler`` for events of ``dataset`` (``"*"`` for every dataset)."""
+        self._handlers.setdefault(dataset, []).append(handler)
+
+    def unsubscribe(self, dataset: str, handler: Handler) -> None:
+        handlers = self._handlers.get(dataset, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(
+        self, dataset: str, key: str, version: int, symbols: Iterable[str] = ()
+    ) -> InvalidationEvent:
+        written = tuple(dict.fromkeys(symbols))
+        if len(written) > MAX_EVENT_SYMBOLS:
+            written = ()
+        event = InvalidationEvent(dataset, key, version, self.origin, written)
+        self._dispatch(event)
+        if self._running:
+            self.backend.publish(event)
+        return event
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        await self.backend.start(self._receive)
+        self._running = True
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        await self.backend.stop()
+
+    def _receive(self, event: InvalidationEvent) -> None:
+        if event.origin == self.origin:
+            return
+        self._dispatch(replace(event, remote=True))
+
+    def _dispatch(self, event: InvalidationEvent) -> None:
+        if event.dataset == ALL:
+            handlers = [
+                handler for group in self._handlers.values() for handler in group
+            ]
+        else:
+            handlers = self._handlers.get(event.dataset, []) + self._handlers.get(
+                ALL, []
+            )
+        for handler in list(dict.fromkeys(handlers)):
+            try:
+                handler(event)
+            except Exception:  # pragma: no cover - defensive
+                logger.exception("Invalidation handler failed for %s", event)
+
+
+def _configured_backend() -> InvalidationBackend:
+    backend = settings.invalidation_backend.strip().lower()
+    if backend == "redis":
+        return RedisBackend(settings.redis_url, settings.invalidation_channel)
+    if backend in ("", "local"):
+        return LocalBackend()
+    raise ValueError(f"不支持的 INVALIDATION_BACKEND: {settings.invalidation_backend}")
+
+
+invalidation_bus = InvalidationBus(_configured_backend())
@@ -0,0 +1,140 @@
+"""
+指数行情的进程内环形缓冲区
+
+每个 symbol 只保留最近 ``capacity`` 根日 K 的收盘价；K 线写入时同步追加，
+行情接口直接读内存，不再访问数据库。
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+
+
+class CloseRingBuffer:
+    """Fixed-size ring of ``(timestamp, close)`` kept in ascending time order."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._closes = np.empty(capacity, dtype=float)
+        self._timestamps: List[Optional[datetime]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[datetime]:
+        if not self._size:
+            return None
+        return self._timestamps[(self._start + self._size - 1) % self.capacity]
+
+    def append(self, timestamp: datetime, close: float) -> bool:
+        """Append a bar; returns ``False`` when it is not newer than the tail.
+
+        A bar equal to the tail replaces it in place (restated close).
+        """
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            return False
+        if last is not None and timestamp == last:
+            self._closes[(self._start + self._size - 1) % self.capacity] = close
+            return True
+
+        position = (self._start + self._size) % self.capacity
+        self._closes[position] = close
+        self._timestamps[position] = timestamp
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+        return True
+
+    def closes(self, count: Optional[int] = None) -> np.ndarray:
+        """The most recent ``count`` closes, oldest first."""
+        size = self._size if not count else min(count, self._size)
+        indices = (self._start + self._size - size + np.arange(size)) % self.capacity
+        return self._closes[indices]
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+
+class MarketCloseBuffer:
+    """Ring buffers of recent daily closes for the tracked index symbols."""
+
+    def __init__(self, capacity: int = 60) -> None:
+        self.capacity = capacity
+        self._buffers: Dict[str, CloseRingBuffer] = {}
+        # 需要从数据库（重新）加载的 symbol：未预热，或收到了早于缓冲尾部的补录数据
+        self._stale: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def is_warm(self, symbol: str) -> bool:
+        return symbol in self._buffers and symbol not in self._stale
+
+    def load(self, symbol: str, bars: Iterable[Dict[str, Any]]) -> None:
+        """Replace a symbol's buffer with bars given in ascending time order.
+
+        A symbol without bars is warm as well: its empty buffer is filled by
+        ``observe`` as bars are ingested, so reads do not re-query the database.
+        """
+        buffer = CloseRingBuffer(self.capacity)
+        for bar in bars:
+            if isinstance(bar.get("timestamp"), datetime) and bar.get("close") is not None:
+                buffer.append(bar["timestamp"], float(bar["close"]))
+        with self._lock:
+            self._buffers[symbol] = buffer
+            self._stale.discard(symbol)
+
+    def observe(self, documents: Iterable[Dict[str, Any]], symbols: Set[str]) -> None:
+        """Fold freshly written daily bars of tracked ``symbols`` into the buffers."""
+        bars = sorted(
+            (
+                document
+                for document in documents
+                if document.get("frequency") == "d"
+                and document.get("symbol") in symbols
+                and document.get("close") is not None
+            ),
+            key=lambda document: document["timestamp"],
+        )
+        with self._lock:
+            for bar in bars:
+                buffer = self._buffers.get(bar["symbol"])
+                if buffer is None:
+                    continue
+                if not buffer.append(bar["timestamp"], float(bar["close"])):
+                    self._stale.add(bar["symbol"])
+
+    def closes(self, symbol: str, count: Optional[int] = None) -> np.ndarray:
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            return np.empty(0)
+        return buffer.closes(count)
+
+    def invalidate(self) -> None:
+        """Mark every buffer for reload from the database."""
+        with self._lock:
+            self._stale.update(self._buffers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers.clear()
+            self._stale.clear()
+
+
+market_close_buffer = MarketCloseBuffer()
+
+
+def _on_invalidation(event: InvalidationEvent) -> None:
+    if event.remote and event.matches("primary"):
+        market_close_buffer.invalidate()
+
+
+invalidation_bus.subscribe("stock_kline", _on_invalidation)
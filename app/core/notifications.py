@@ -0,0 +1,330 @@
+"""
+通知分发
+
+每个渠道一个有界 ``asyncio.Queue`` 与若干后台发送协程：协程攒批（``batch_size``
+条或 ``batch_window`` 秒）后在线程中交给渠道发送器，同一发送器复用一条 SMTP
+连接发送整批邮件。发送失败的消息按指数退避重新入队，超过重试次数后记为失败。
+提交只是入队，信号高峰不会阻塞 API。
+"""
+
+import asyncio
+import logging
+import smtplib
+import ssl
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Notification:
+    channel: str
+    recipient: str
+    subject: str
+    body: str
+    attempts: int = 0
+
+
+Failure = Tuple[Notification, Exception]
+
+
+class NotificationSender(ABC):
+    """Channel backend; ``send_batch`` runs in a worker thread."""
+
+    @abstractmethod
+    def send_batch(self, messages: List[Notification]) -> List[Failure]:
+        """Send ``messages``; returns the ones that failed with their errors."""
+
+    def close(self) -> None:
+        """Release idle resources (connections); called from a worker thread."""
+
+
+class SmtpEmailSender(NotificationSender):
+    """Send a batch of e-mails over one reused SMTP connection."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 25,
+        username: str = "",
+        password: str = "",
+        sender: str = "",
+        use_tls: bool = False,
+        use_ssl: bool = False,
+        timeout: float = 10.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._client: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._client is not None:
+            return self._client
+        if self.use_ssl:
+            client: smtplib.SMTP = smtplib.SMTP_SSL(
+                self.host,
+                self.port,
+                timeout=self.timeout,
+                context=ssl.create_default_context(),
+            )
+        else:
+            client = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                client.starttls(context=ssl.create_default_context())
+        if self.username:
+            client.login(self.username, self.password)
+        self._client = client
+        return client
+
+    def _build(self, message: Notification) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email["Date"] = formatdate(localtime=True)
+        email["Message-ID"] = make_msgid()
+        email.set_content(message.body)
+        return email
+
+    def send_batch(self, messages: List[Notification]) -> List[Failure]:
+        failures: List[Failure] = []
+        for message in messages:
+            email = self._build(message)
+            try:
+                try:
+                    self._connect().send_message(email)
+                except smtplib.SMTPServerDisconnected:
+                    # 服务器关闭了空闲连接，重连后重发一次
+                    self._discard()
+                    self._connect().send_message(email)
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as exc:
+                # 服务器拒收单封邮件，连接仍可继续使用
+                failures.append((message, exc))
+            except (smtplib.SMTPException, OSError) as exc:
+                self._discard()
+                failures.append((message, exc))
+        return failures
+
+    def _discard(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.close()
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            client.quit()
+        except (smtplib.SMTPException, OSError):
+            client.close()
+
+
+SenderFactory = Callable[[], NotificationSender]
+
+
+class NotificationDispatcher:
+    """Per-channel queues drained in batches by background workers."""
+
+    def __init__(
+        self,
+        senders: Dict[str, SenderFactory],
+        *,
+        workers: int = 2,
+        batch_size: int = 50,
+        batch_window: float = 0.2,
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        queue_size: int = 10000,
+        idle_timeout: float = 30.0,
+    ) -> None:
+        self.senders = senders
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "rejected": 0}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.TimerHandle] = set()
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self.senders)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        for channel, factory in self.senders.items():
+            self._queues[channel] = asyncio.Queue(maxsize=self.queue_size)
+            for index in range(self.workers):
+                self._tasks.append(
+                    asyncio.create_task(
+                        self._worker(channel, factory()),
+                        name=f"notify-{channel}-{index}",
+                    )
+                )
+        if self._tasks:
+            logger.info(
+                "Started notification dispatcher for %s with %s workers each",
+                ", ".join(self.senders),
+                self.workers,
+            )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Drain queued notifications for up to ``timeout`` seconds, then stop."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Notification queues not drained before shutdown")
+        for handle in self._retries:
+            handle.cancel()
+        if self._retries:
+            logger.warning("Dropped %s pending notification retries", len(self._retries))
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = {}
+
+    def submit(self, messages: Iterable[Notification]) -> int:
+        """Enqueue without waiting; returns how many messages were accepted."""
+        if not self.running:
+            raise RuntimeError("通知分发服务未启动")
+        accepted = 0
+        for message in messages:
+            queue = self._queues.get(message.channel)
+            if queue is None:
+                raise ValueError(f"不支持的通知渠道: {message.channel}")
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.stats["rejected"] += 1
+                continue
+            accepted += 1
+        self.stats["queued"] += accepted
+        return accepted
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[Notification]:
+        batch = [await asyncio.wait_for(queue.get(), self.idle_timeout)]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self, channel: str, sender: NotificationSender) -> None:
+        queue = self._queues[channel]
+        try:
+            while True:
+                try:
+                    batch = await self._next_batch(queue)
+                except asyncio.TimeoutError:
+                    # 空闲时释放连接，下一批到来时重新建立
+                    await asyncio.to_thread(sender.close)
+                    continue
+                try:
+                    failures = await asyncio.to_thread(sender.send_batch, batch)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.exception("Notification sender for %s crashed", channel)
+                    failures = [(message, exc) for message in batch]
+                self.stats["sent"] += len(batch) - len(failures)
+                for message, exc in failures:
+                    self._retry(message, exc)
+                for _ in batch:
+                    queue.task_done()
+        finally:
+            await asyncio.to_thread(sender.close)
+
+    def _retry(self, message: Notification, exc: Exception) -> None:
+        message.attempts += 1
+        if message.attempts > self.max_retries:
+            self.stats["failed"] += 1
+            logger.error(
+                "Giving up %s notification to %s after %s attempts: %s",
+                message.channel,
+                message.recipient,
+                message.attempts,
+                exc,
+            )
+            return
+        self.stats["retried"] += 1
+        delay = self.retry_delay * 2 ** (message.attempts - 1)
+        handle: Optional[asyncio.TimerHandle] = None
+
+        def requeue() -> None:
+            self._retries.discard(handle)
+            queue = self._queues.get(message.channel)
+            if queue is None:
+                return
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.stats["failed"] += 1
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retries.add(handle)
+
+
+def _configured_senders() -> Dict[str, SenderFactory]:
+    senders: Dict[str, SenderFactory] = {}
+    if settings.smtp_host:
+        senders["email"] = lambda: SmtpEmailSender(
+            settings.smtp_host,
+            settings.smtp_port,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            sender=settings.smtp_sender,
+            use_tls=settings.smtp_use_tls,
+            use_ssl=settings.smtp_use_ssl,
+            timeout=settings.smtp_timeout,
+        )
+    return senders
+
+
+notification_dispatcher = NotificationDispatcher(
+    _configured_senders(),
+    workers=settings.notification_workers,
+    batch_size=settings.notification_batch_size,
+    batch_window=settings.notification_batch_window_ms / 1000,
+    max_retries=settings.notification_max_retries,
+    retry_delay=settings.notification_retry_delay,
+    queue_size=settings.notification_queue_size,
+)
@@ -0,0 +1,70 @@
+"""
+进程内角色权限缓存
+
+全部角色的权限一次加载为 ``{角色名: frozenset(权限)}``，并按用户的
+(角色, 直接权限) 组合预先合并为有效权限集合，鉴权只做内存中的集合比较。
+缓存在角色数据版本变化（本进程或其它 worker 增删改角色）或超过 TTL 后重新加载。
+"""
+
+import threading
+import time
+from typing import Dict, FrozenSet, Hashable, Iterable, Mapping, Optional, Tuple
+
+from app.config import settings
+
+Combination = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+class RolePermissionCache:
+    """Role name → permissions, plus memoized per-combination permission sets."""
+
+    def __init__(self, ttl: float = 60.0, max_combinations: int = 4096) -> None:
+        self.ttl = ttl
+        self.max_combinations = max_combinations
+        self._roles: Dict[str, FrozenSet[str]] = {}
+        self._combinations: Dict[Combination, FrozenSet[str]] = {}
+        self._version: Optional[Hashable] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_fresh(self, version: Hashable) -> bool:
+        return (
+            self._version is not None
+            and self._version == version
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def load(self, roles: Mapping[str, Iterable[str]], version: Hashable) -> None:
+        compiled = {name: frozenset(permissions) for name, permissions in roles.items()}
+        with self._lock:
+            self._roles = compiled
+            self._combinations = {}
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def resolve(
+        self, roles: Iterable[str], permissions: Iterable[str] = ()
+    ) -> FrozenSet[str]:
+        """Effective permissions of a user with ``roles`` and direct ``permissions``."""
+        key = (tuple(roles), tuple(permissions))
+        cached = self._combinations.get(key)
+        if cached is not None:
+            return cached
+        effective = set(key[1])
+        for name in key[0]:
+            effective.update(self._roles.get(name, ()))
+        resolved = frozenset(effective)
+        with self._lock:
+            if len(self._combinations) >= self.max_combinations:
+                self._combinations.clear()
+            self._combinations[key] = resolved
+        return resolved
+
+    def invalidate(self) -> None:
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._roles)
+
+
+role_permissions = RolePermissionCache(ttl=settings.role_cache_ttl)
@@ -0,0 +1,140 @@
+"""
+进程内最新行情缓存
+
+按 ``(symbol, frequency)`` 保存最新一根 K 线；启动时用一次聚合预热，
+之后 K 线写入时只接受不早于当前时间戳的数据，读取不访问数据库。
+其它 worker 写入的 symbol 经失效总线标记为待刷新，下次读取时只重新查询这些 symbol。
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.core.cache import LoopLock
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+
+QUOTE_FIELDS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "amount",
+    "pct_change",
+    "turnover_rate",
+    "pe_ttm",
+    "pb_mrq",
+    "ps_ttm",
+    "pcf_ncf_ttm",
+)
+
+
+class LatestQuoteStore:
+    """Latest bar per ``(symbol, frequency)``."""
+
+    def __init__(self) -> None:
+        self._quotes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._warm = False
+        self._stale: Set[str] = set()
+        # 预热与刷新串行执行，并发读取者等待同一次重新加载
+        self.reload_lock = LoopLock()
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    @property
+    def has_stale(self) -> bool:
+        return bool(self._stale)
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def _offer(self, document: Dict[str, Any]) -> bool:
+        symbol = document.get("symbol")
+        frequency = document.get("frequency")
+        timestamp = document.get("timestamp")
+        if not symbol or not frequency or not isinstance(timestamp, datetime):
+            return False
+        key = (symbol, frequency)
+        current = self._quotes.get(key)
+        # 同一时间戳视为对该根 K 线的修正，允许覆盖
+        if current is not None and timestamp < current["timestamp"]:
+            return False
+        quote = {"symbol": symbol, "frequency": frequency, "timestamp": timestamp}
+        quote.update(
+            {
+                field: document[field]
+                for field in QUOTE_FIELDS
+                if document.get(field) is not None
+            }
+        )
+        self._quotes[key] = quote
+        return True
+
+    def load(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """Merge warm-up results; bars ingested meanwhile are never regressed."""
+        with self._lock:
+            for document in documents:
+                self._offer(document)
+            self._warm = True
+
+    def update(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """Fold freshly written bars in; returns how many quotes changed."""
+        with self._lock:
+            return sum(self._offer(document) for document in documents)
+
+    def get(self, symbol: str, frequency: str = "d") -> Optional[Dict[str, Any]]:
+        return self._quotes.get((symbol, frequency))
+
+    def get_many(
+        self, symbols: Sequence[str], frequency: str = "d"
+    ) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        for symbol in symbols:
+            quote = self._quotes.get((symbol, frequency))
+            if quote is not None:
+                found[symbol] = quote
+        return found
+
+    def all(self, frequency: str = "d") -> List[Dict[str, Any]]:
+        return [
+            quote
+            for (_, quote_frequency), quote in list(self._quotes.items())
+            if quote_frequency == frequency
+        ]
+
+    def mark_stale(self, symbols: Iterable[str]) -> None:
+        """Re-query ``symbols`` on the next read."""
+        with self._lock:
+            self._stale.update(symbols)
+
+    def take_stale(self) -> List[str]:
+        with self._lock:
+            stale, self._stale = sorted(self._stale), set()
+        return stale
+
+    def invalidate(self) -> None:
+        """Keep serving current quotes but reload on the next read."""
+        self._warm = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._quotes.clear()
+            self._stale.clear()
+            self._warm = False
+
+    def on_invalidation(self, event: InvalidationEvent) -> None:
+        # 其它 worker 写入了主库 K 线，本进程的增量更新没有看到这些数据
+        if not event.remote or not event.matches("primary"):
+            return
+        if event.symbols:
+            self.mark_stale(event.symbols)
+        else:
+            self.invalidate()
+
+
+latest_quotes = LatestQuoteStore()
+
+invalidation_bus.subscribe("stock_kline", latest_quotes.on_invalidation)
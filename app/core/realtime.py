@@ -0,0 +1,183 @@
+"""
+实时推送
+
+写入路径把新落库的 K 线与指标点发布到进程内的 ``RealtimeHub``，按订阅条件分发给
+各个连接。每个订阅对同一 (数据集, symbol, 周期/指标) 只保留最新一条，并按 tick
+合并为一帧发送；消费慢的连接只会丢掉被覆盖的旧数据，不会无限积压。
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.quote_store import QUOTE_FIELDS
+
+DATASETS = ("stock_kline", "indicator")
+KLINE_FIELDS = ("symbol", "frequency", "timestamp", *QUOTE_FIELDS)
+INDICATOR_FIELDS = ("symbol", "indicator", "timeframe", "timestamp", "value", "values")
+
+UpdateKey = Tuple[str, str, str, str]
+
+
+def _project(dataset: str, document: Dict[str, Any]) -> Dict[str, Any]:
+    fields = KLINE_FIELDS if dataset == "stock_kline" else INDICATOR_FIELDS
+    item = {"dataset": dataset}
+    item.update({field: document.get(field) for field in fields})
+    return item
+
+
+def _update_key(dataset: str, document: Dict[str, Any]) -> UpdateKey:
+    if dataset == "stock_kline":
+        return dataset, document["symbol"], document.get("frequency", ""), ""
+    return (
+        dataset,
+        document["symbol"],
+        document.get("indicator", ""),
+        document.get("timeframe", ""),
+    )
+
+
+class Subscription:
+    """One client's filter plus its pending, coalesced updates."""
+
+    def __init__(
+        self,
+        datasets: Iterable[str],
+        target: str = "primary",
+        symbols: Optional[Iterable[str]] = None,
+        indicators: Optional[Iterable[str]] = None,
+        frequencies: Optional[Iterable[str]] = None,
+        interval: float = 0.5,
+        max_pending: int = 5000,
+    ) -> None:
+        self.datasets: FrozenSet[str] = frozenset(datasets)
+        self.target = target
+        self.symbols = frozenset(symbols) if symbols else None
+        self.indicators = frozenset(indicators) if indicators else None
+        self.frequencies = frozenset(frequencies) if frequencies else None
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[UpdateKey, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+        self._last_frame = 0.0
+        self._sequence = 0
+        # 自上一帧以来被新数据覆盖或因积压上限丢弃的更新数
+        self._dropped = 0
+
+    def wants(self, dataset: str, target: str) -> bool:
+        return dataset in self.datasets and target == self.target
+
+    def matches(self, dataset: str, document: Dict[str, Any]) -> bool:
+        if self.symbols is not None and document.get("symbol") not in self.symbols:
+            return False
+        if dataset == "stock_kline":
+            return self.frequencies is None or document.get("frequency") in self.frequencies
+        return self.indicators is None or document.get("indicator") in self.indicators
+
+    def push(self, key: UpdateKey, item: Dict[str, Any]) -> None:
+        pending = self._pending
+        current = pending.get(key)
+        if current is not None:
+            # 同一 key 的旧数据尚未发出，直接被新数据替换；补录的历史数据不覆盖更新的数据
+            self._dropped += 1
+            latest, incoming = current.get("timestamp"), item.get("timestamp")
+            if latest is not None and incoming is not None and incoming < latest:
+                return
+            del pending[key]
+        elif len(pending) >= self.max_pending:
+            pending.pop(next(iter(pending)))
+            self._dropped += 1
+        pending[key] = item
+        self._ready.set()
+
+    async def next_frame(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for pending updates and return them as one frame.
+
+        Frames are spaced at least ``interval`` seconds apart so bursts of
+        writes are merged; returns ``None`` when nothing arrived within
+        ``timeout`` (the caller sends a heartbeat).
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        delay = self._last_frame + self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        items = list(self._pending.values())
+        dropped = self._dropped
+        self._pending = {}
+        self._dropped = 0
+        self._ready.clear()
+        self._last_frame = time.monotonic()
+        self._sequence += 1
+        return {"seq": self._sequence, "items": items, "dropped": dropped}
+
+
+class RealtimeHub:
+    """In-process fan-out of freshly written bars and indicator points."""
+
+    def __init__(self, interval: float = 0.5, max_pending: int = 5000) -> None:
+        self.interval = interval
+        self.max_pending = max_pending
+        self._subscriptions: Set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(
+        self,
+        datasets: Iterable[str],
+        target: str = "primary",
+        symbols: Optional[Iterable[str]] = None,
+        indicators: Optional[Iterable[str]] = None,
+        frequencies: Optional[Iterable[str]] = None,
+    ) -> Subscription:
+        subscription = Subscription(
+            datasets,
+            target,
+            symbols,
+            indicators,
+            frequencies,
+            interval=self.interval,
+            max_pending=self.max_pending,
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(
+        self, dataset: str, target: str, documents: Iterable[Dict[str, Any]]
+    ) -> int:
+        """Queue ``documents`` for every matching subscriber; returns deliveries."""
+        interested = [
+            subscription
+            for subscription in self._subscriptions
+            if subscription.wants(dataset, target)
+        ]
+        if not interested:
+            return 0
+
+        delivered = 0
+        projected: List[Tuple[UpdateKey, Dict[str, Any], Dict[str, Any]]] = [
+            (_update_key(dataset, document), _project(dataset, document), document)
+            for document in documents
+            if document.get("symbol")
+        ]
+        for subscription in interested:
+            for key, item, document in projected:
+                if subscription.matches(dataset, document):
+                    subscription.push(key, item)
+                    delivered += 1
+        return delivered
+
+
+realtime_hub = RealtimeHub(
+    interval=settings.realtime_tick_ms / 1000,
+    max_pending=settings.realtime_max_pending,
+)
@@ -1,12 +1,21 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.core.cache import TTLLRUCache
+from app.core.executors import run_password_task
 
 # 密码加密上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# 已验证令牌的声明缓存：键为令牌的 SHA-256，值为 (用户名, 过期时间戳)
+token_claims_cache = TTLLRUCache(
+    maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
@@ -18,6 +27,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在密码哈希线程池中验证密码，不阻塞事件循环"""
+    return await run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在密码哈希线程池中计算密码哈希，不阻塞事件循环"""
+    return await run_password_task(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌"""
     to_encode = data.copy()
@@ -36,7 +55,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def verify_token(token: str) -> Optional[str]:
-    """验证令牌并返回用户名"""
+    """验证令牌并返回用户名（按令牌哈希缓存解码结果）"""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = token_claims_cache.get(key)
+    if cached is not None:
+        username, expires_at = cached
+        if expires_at is None or expires_at > time.time():
+            return username
+        token_claims_cache.discard(key)
+        return None
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -44,6 +71,10 @@ def verify_token(token: str) -> Optional[str]:
         username: str = payload.get("sub")
         if username is None:
             return None
+        expires_at = payload.get("exp")
+        token_claims_cache.set(
+            key, (username, float(expires_at) if expires_at is not None else None)
+        )
         return username
     except JWTError:
         return None
@@ -0,0 +1,208 @@
+"""
+全市场最新快照的进程内列式存储
+
+每个 symbol 一行：最新一根日 K 的数值字段 + stock_basic 的文本字段，
+各字段保存为等长的 NumPy 数组，供选股表达式整列求值；K 线与基础信息写入时增量更新。
+其它 worker 写入的 symbol 标记为待刷新，下次选股前只重新读取这些行。
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.core.cache import LoopLock
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+from app.utils.symbols import symbol_to_code
+
+NUMERIC_FIELDS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "amount",
+    "turnover_rate",
+    "pct_change",
+    "pe_ttm",
+    "pb_mrq",
+    "ps_ttm",
+    "pcf_ncf_ttm",
+)
+TEXT_FIELDS = ("name", "exchange", "industry", "market", "area", "status", "type")
+
+_NAT = np.datetime64("NaT", "us")
+
+
+class StockSnapshot:
+    """Columnar latest-bar snapshot keyed by symbol."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._warm = False
+        self._stale: Set[str] = set()
+        self.reload_lock = LoopLock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._size = 0
+        self._row_of: Dict[str, int] = {}
+        self._symbols = np.empty(capacity, dtype=object)
+        self._codes = np.empty(capacity, dtype=object)
+        self._timestamps = np.full(capacity, _NAT)
+        self._numeric = {
+            field: np.full(capacity, np.nan) for field in NUMERIC_FIELDS
+        }
+        self._text = {
+            field: np.full(capacity, "", dtype=object) for field in TEXT_FIELDS
+        }
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    @property
+    def has_stale(self) -> bool:
+        return bool(self._stale)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _row(self, symbol: str) -> int:
+        row = self._row_of.get(symbol)
+        if row is not None:
+            return row
+        if self._size == self._capacity:
+            self._grow(self._capacity * 2)
+        row = self._size
+        self._row_of[symbol] = row
+        self._symbols[row] = symbol
+        self._codes[row] = symbol_to_code(symbol)
+        self._size += 1
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - self._capacity
+        self._symbols = np.concatenate([self._symbols, np.empty(extra, dtype=object)])
+        self._codes = np.concatenate([self._codes, np.empty(extra, dtype=object)])
+        self._timestamps = np.concatenate([self._timestamps, np.full(extra, _NAT)])
+        for field, column in self._numeric.items():
+            self._numeric[field] = np.concatenate([column, np.full(extra, np.nan)])
+        for field, column in self._text.items():
+            self._text[field] = np.concatenate(
+                [column, np.full(extra, "", dtype=object)]
+            )
+        self._capacity = capacity
+
+    def _apply_basic(self, document: Dict[str, Any]) -> None:
+        row = self._row(document["symbol"])
+        for field in TEXT_FIELDS:
+            if field in document:
+                self._text[field][row] = str(document[field] or "")
+
+    def _apply_bar(self, document: Dict[str, Any]) -> None:
+        timestamp = np.datetime64(document["timestamp"], "us")
+        row = self._row(document["symbol"])
+        current = self._timestamps[row]
+        if not np.isnat(current) and timestamp < current:
+            return
+        # 最新一根 K 线整体替换，缺失字段置为 NaN
+        self._timestamps[row] = timestamp
+        for field in NUMERIC_FIELDS:
+            value = document.get(field)
+            self._numeric[field][row] = np.nan if value is None else float(value)
+
+    def load(
+        self,
+        basics: Iterable[Dict[str, Any]],
+        bars: Iterable[Dict[str, Any]],
+    ) -> None:
+        """Rebuild the snapshot from ``stock_basic`` documents and latest bars."""
+        basics = [document for document in basics if document.get("symbol")]
+        bars = [
+            document
+            for document in bars
+            if document.get("symbol")
+            and isinstance(document.get("timestamp"), datetime)
+        ]
+        with self._lock:
+            self._allocate(max(1024, len(basics) + len(bars)))
+            for document in basics:
+                self._apply_basic(document)
+            for document in bars:
+                self._apply_bar(document)
+            self._warm = True
+
+    def observe_basics(self, documents: Iterable[Dict[str, Any]]) -> None:
+        if not self._warm:
+            return
+        with self._lock:
+            for document in documents:
+                if document.get("symbol"):
+                    self._apply_basic(document)
+
+    def observe_bars(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """Fold freshly written daily bars in; older bars never replace newer ones."""
+        if not self._warm:
+            return
+        with self._lock:
+            for document in documents:
+                if (
+                    document.get("frequency") == "d"
+                    and document.get("symbol")
+                    and isinstance(document.get("timestamp"), datetime)
+                ):
+                    self._apply_bar(document)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Views of every column trimmed to the populated rows."""
+        size = self._size
+        columns: Dict[str, np.ndarray] = {
+            "symbol": self._symbols[:size],
+            "code": self._codes[:size],
+            "timestamp": self._timestamps[:size],
+        }
+        for group in (self._numeric, self._text):
+            columns.update({field: column[:size] for field, column in group.items()})
+        return columns
+
+    def latest_timestamp(self) -> Optional[datetime]:
+        timestamps = self._timestamps[: self._size]
+        valid = timestamps[~np.isnat(timestamps)]
+        return valid.max().astype(datetime) if valid.size else None
+
+    def mark_stale(self, symbols: Iterable[str]) -> None:
+        """Re-read the rows of ``symbols`` before the next screen."""
+        with self._lock:
+            self._stale.update(symbols)
+
+    def take_stale(self) -> List[str]:
+        with self._lock:
+            stale, self._stale = sorted(self._stale), set()
+        return stale
+
+    def invalidate(self) -> None:
+        """Stop folding writes in; the next reader rebuilds the snapshot."""
+        self._warm = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._allocate(1024)
+            self._stale.clear()
+            self._warm = False
+
+    def on_invalidation(self, event: InvalidationEvent) -> None:
+        if not event.remote or not event.matches("primary"):
+            return
+        if event.symbols:
+            self.mark_stale(event.symbols)
+        else:
+            self.invalidate()
+
+
+stock_snapshot = StockSnapshot()
+
+invalidation_bus.subscribe("stock_basic", stock_snapshot.on_invalidation)
+invalidation_bus.subscribe("stock_kline", stock_snapshot.on_invalidation)
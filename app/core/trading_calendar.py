@@ -0,0 +1,164 @@
+"""
+交易日历
+
+沪深交易日保存为升序的 ``datetime64[D]`` 数组，``shift`` / ``range`` /
+``is_trading_day`` 均为二分查找。日历来自推送的 ``trading_calendar`` 数据集，
+或由基准指数的日 K 线推导；超出已知区间的部分按工作日（周一至周五）推算。
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from app.core.invalidation import InvalidationEvent, invalidation_bus
+
+DayLike = Union[date, datetime, np.datetime64]
+
+
+def _to_day(value: DayLike) -> np.datetime64:
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+class TradingCalendar:
+    """Sorted trading days with ``O(log n)`` date arithmetic."""
+
+    def __init__(self) -> None:
+        self._days = np.empty(0, dtype="datetime64[D]")
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return int(self._days.size)
+
+    @property
+    def first(self) -> Optional[date]:
+        return self._days[0].astype(date) if self._days.size else None
+
+    @property
+    def last(self) -> Optional[date]:
+        return self._days[-1].astype(date) if self._days.size else None
+
+    def load(self, days: Iterable[DayLike]) -> None:
+        """Replace the calendar with ``days`` (any order, duplicates allowed)."""
+        values = np.unique(np.array([_to_day(day) for day in days], dtype="datetime64[D]"))
+        with self._lock:
+            self._days = values
+            self._loaded = True
+
+    def extend(self, days: Iterable[DayLike]) -> int:
+        """Merge newly observed trading days; returns how many were new."""
+        values = np.array([_to_day(day) for day in days], dtype="datetime64[D]")
+        if values.size == 0:
+            return 0
+        with self._lock:
+            merged = np.union1d(self._days, values)
+            added = merged.size - self._days.size
+            self._days = merged
+            return int(added)
+
+    def observe(self, documents: Iterable[Dict[str, Any]], symbol: str) -> int:
+        """Add the dates of freshly written daily bars of the reference ``symbol``."""
+        return self.extend(
+            document["timestamp"]
+            for document in documents
+            if document.get("symbol") == symbol
+            and document.get("frequency") == "d"
+            and document.get("timestamp")
+        )
+
+    def is_trading_day(self, day: DayLike) -> bool:
+        target = _to_day(day)
+        days = self._days
+        if days.size and days[0] <= target <= days[-1]:
+            index = np.searchsorted(days, target)
+            return bool(days[index] == target)
+        return bool(np.is_busday(target))
+
+    def shift(self, day: DayLike, offset: int) -> date:
+        """The trading day ``offset`` trading days away from ``day``.
+
+        A non-trading ``day`` first rolls back to the previous trading day, so
+        ``shift(saturday, 0)`` is the Friday before and ``shift(day, -(n - 1))``
+        is the first day of an ``n``-trading-day window ending on ``day``.
+        """
+        target = _to_day(day)
+        days = self._days
+        if days.size == 0:
+            anchor = np.busday_offset(target, 0, roll="backward")
+            return np.busday_offset(anchor, offset).astype(date)
+
+        # 锚点：不晚于 day 的最后一个交易日在数组中的下标，区间外按工作日延伸
+        if target < days[0]:
+            rolled = np.busday_offset(target, 0, roll="backward")
+            position = -int(np.busday_count(rolled, days[0])) + offset
+        elif target > days[-1]:
+            extra = int(np.busday_count(days[-1] + 1, target + 1))
+            position = days.size - 1 + extra + offset
+        else:
+            position = int(np.searchsorted(days, target, side="right")) - 1 + offset
+
+        last = days.size - 1
+        if position < 0:
+            return np.busday_offset(days[0], position).astype(date)
+        if position > last:
+            return np.busday_offset(days[-1], position - last).astype(date)
+        return days[position].astype(date)
+
+    def range(self, start: DayLike, end: DayLike) -> List[date]:
+        """Trading days in ``[start, end]``."""
+        first, last = _to_day(start), _to_day(end)
+        if first > last:
+            return []
+        days = self._days
+        known: np.ndarray = np.empty(0, dtype="datetime64[D]")
+        if days.size:
+            lower = np.searchsorted(days, first, side="left")
+            upper = np.searchsorted(days, last, side="right")
+            known = days[lower:upper]
+        parts = []
+        if not days.size or first < days[0]:
+            head_end = last if not days.size else min(last, days[0] - 1)
+            parts.append(self._weekdays(first, head_end))
+        parts.append(known)
+        if days.size and last > days[-1]:
+            parts.append(self._weekdays(max(first, days[-1] + 1), last))
+        return np.concatenate(parts).astype(date).tolist()
+
+    def count(self, start: DayLike, end: DayLike) -> int:
+        return len(self.range(start, end))
+
+    @staticmethod
+    def _weekdays(start: np.datetime64, end: np.datetime64) -> np.ndarray:
+        if start > end:
+            return np.empty(0, dtype="datetime64[D]")
+        span = np.arange(start, end + 1, dtype="datetime64[D]")
+        return span[np.is_busday(span)]
+
+    def invalidate(self) -> None:
+        """Keep answering from the current days until the next ``load``."""
+        self._loaded = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._days = np.empty(0, dtype="datetime64[D]")
+            self._loaded = False
+
+
+trading_calendar = TradingCalendar()
+
+
+def _on_invalidation(event: InvalidationEvent) -> None:
+    # 其它 worker 推送了交易日，重新从数据库加载
+    if event.remote:
+        trading_calendar.invalidate()
+
+
+invalidation_bus.subscribe("trading_calendar", _on_invalidation)
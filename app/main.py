@@ -1,3 +1,5 @@
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI, Request
@@ -13,6 +15,7 @@ from app.controllers import (
     limitup,
     market,
     portfolio,
+    realtime,
     roles,
     stocks,
     strategy_subscriptions,
@@ -21,13 +24,55 @@ from app.controllers import (
     settings as settings_controller,
 )
 from app.config import settings
+from app.core.executors import shutdown_password_pool, shutdown_process_pool
+from app.core.invalidation import invalidation_bus
+from app.core.notifications import notification_dispatcher
 from app.db import db_connection_manager, lifespan
+from app.services.limitup_scheduler import limitup_scheduler
+from app.services.quote_service import QuoteService
+from app.services.trading_calendar_service import TradingCalendarService
+from app.services.user_service import UserService
 from app.utils.swagger_config import (
     get_api_tags,
     get_custom_openapi,
     get_servers,
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def app_lifespan(app: FastAPI):
+    """Database lifespan plus process-level caches and compute resources."""
+    async with lifespan(app):
+        # 先订阅失效事件，预热期间其它 worker 的写入也不会漏掉
+        await invalidation_bus.start()
+        try:
+            await QuoteService().warm()
+        except Exception:
+            # 预热失败不影响启动，首次读取时会再次加载
+            logger.exception("Failed to warm the latest-quote cache")
+        try:
+            await TradingCalendarService().load()
+        except Exception:
+            logger.exception("Failed to load the trading calendar")
+        try:
+            await UserService().ensure_default_admin()
+        except Exception:
+            # 失败时由首个匿名请求再次创建
+            logger.exception("Failed to provision the default admin user")
+        await notification_dispatcher.start()
+        await limitup_scheduler.start()
+        try:
+            yield
+        finally:
+            await limitup_scheduler.stop()
+            await notification_dispatcher.stop()
+            await invalidation_bus.stop()
+            shutdown_process_pool()
+            shutdown_password_pool()
+
+
 app = FastAPI(
     title=settings.project_name,
     description=settings.description,
@@ -40,7 +85,7 @@ app = FastAPI(
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
     servers=get_servers(),
     tags=get_api_tags(),
-    lifespan=lifespan,
+    lifespan=app_lifespan,
 )
 
 app.add_middleware(
@@ -64,6 +109,7 @@ app.include_router(indicators.router, prefix=settings.api_v1_str, tags=["指标
 app.include_router(data_feed.router, prefix=settings.api_v1_str, tags=["数据接入"])
 app.include_router(stocks.router, prefix=settings.api_v1_str, tags=["数据接入"])
 app.include_router(analytics.router, prefix=settings.api_v1_str, tags=["行业分析"])
+app.include_router(realtime.router, prefix=settings.api_v1_str, tags=["实时推送"])
 app.include_router(account.router, prefix=settings.api_v1_str, tags=["账户与系统设置"])
 app.include_router(
     settings_controller.router,
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 
 
 class IndustryMetricPoint(BaseModel):
@@ -28,3 +28,90 @@ class IndustryMetricResponse(BaseModel):
     series: List[IndustryMetricSeries] = Field(
         default_factory=list, description="行业序列集合"
     )
+
+
+class IndustryMetricsComputeRequest(BaseModel):
+    indicator: str = Field("industry_metrics", description="写入的指标标识")
+    days: int = Field(60, ge=1, le=750, description="输出最近多少个交易日")
+    momentum_window: int = Field(
+        20, ge=1, le=250, description="动量回看交易日数（N 日涨幅）"
+    )
+    ma_window: int = Field(
+        20, ge=2, le=250, description="宽度使用的均线窗口（站上 N 日均线的占比）"
+    )
+    end: Optional[datetime] = Field(
+        None, description="计算截止时间（UTC），默认当前时间"
+    )
+    source_target: str = Field(
+        "primary", description="stock_basic / stock_kline 的数据目标别名"
+    )
+    target: str = Field("primary", description="指标结果写入的数据目标别名")
+
+    @validator("indicator", "source_target", "target")
+    def normalize_token(cls, value: str) -> str:
+        cleaned = (value or "").strip().lower()
+        if not cleaned:
+            raise ValueError("indicator/source_target/target 不能为空")
+        return cleaned
+
+
+class IndustryMetricsComputeSummary(BaseModel):
+    industries: int = Field(..., ge=0, description="参与计算的行业数")
+    symbols: int = Field(..., ge=0, description="参与计算的股票数")
+    dates: int = Field(..., ge=0, description="输出的交易日数")
+    total: int = Field(..., ge=0, description="写入的行业指标点数")
+    matched: int = Field(0, ge=0)
+    modified: int = Field(0, ge=0)
+    upserted: int = Field(0, ge=0)
+
+
+class FactorEvaluationSummary(BaseModel):
+    ic_mean: Optional[float] = Field(None, description="IC 均值")
+    ic_std: Optional[float] = Field(None, description="IC 标准差")
+    icir: Optional[float] = Field(None, description="IC 均值 / 标准差")
+    ic_positive_ratio: Optional[float] = Field(None, description="IC > 0 的占比")
+    rank_ic_mean: Optional[float] = Field(None, description="Rank IC 均值")
+    rank_ic_std: Optional[float] = Field(None, description="Rank IC 标准差")
+    rank_icir: Optional[float] = Field(None, description="Rank IC 均值 / 标准差")
+    rank_ic_positive_ratio: Optional[float] = Field(
+        None, description="Rank IC > 0 的占比"
+    )
+    long_short_mean: Optional[float] = Field(
+        None, description="最高分位减最低分位的平均收益"
+    )
+    top_turnover_mean: Optional[float] = Field(
+        None, description="最高分位的日均换手率"
+    )
+
+
+class FactorDailyPoint(BaseModel):
+    date: str
+    ic: Optional[float] = None
+    rank_ic: Optional[float] = None
+    long_short: Optional[float] = None
+    top_turnover: Optional[float] = None
+    coverage: int = Field(0, ge=0, description="因子与远期收益均有效的股票数")
+
+
+class FactorQuantileStat(BaseModel):
+    quantile: int = Field(..., ge=1, description="分位（1 为因子值最低）")
+    mean_return: Optional[float] = Field(None, description="持有期平均收益")
+    cumulative_return: Optional[float] = Field(
+        None, description="按不重叠持有期复利的累计收益"
+    )
+    turnover: Optional[float] = Field(None, description="平均换手率")
+
+
+class FactorEvaluationResponse(BaseModel):
+    indicator: str
+    target: str
+    source_target: str
+    field: str
+    start: date
+    end: date
+    horizon: int
+    quantiles: int
+    symbols: int = Field(..., ge=0)
+    summary: FactorEvaluationSummary
+    quantile_stats: List[FactorQuantileStat] = Field(default_factory=list)
+    daily: List[FactorDailyPoint] = Field(default_factory=list)
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, validator
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=64, description="Key 用途说明")
+    username: str = Field(..., description="Key 代表的服务账号用户名")
+    permissions: List[str] = Field(
+        ...,
+        min_items=1,
+        description="Key 可用的权限，例如 stocks:write；实际生效的是其与服务账号自身权限的交集",
+    )
+    expires_at: Optional[datetime] = Field(
+        default=None, description="过期时间（UTC），为空表示长期有效"
+    )
+
+    @validator("expires_at")
+    def normalize_expires_at(cls, value: Optional[datetime]) -> Optional[datetime]:
+        if value is None:
+            return value
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if value <= datetime.utcnow():
+            raise ValueError("expires_at 必须晚于当前时间")
+        return value
+
+
+class ApiKey(BaseModel):
+    id: str
+    name: str
+    prefix: str = Field(..., description="明文 Key 的前缀，用于识别")
+    username: str
+    permissions: List[str] = Field(default_factory=list)
+    expires_at: Optional[datetime] = None
+    created_at: datetime
+    created_by: Optional[str] = None
+
+
+class ApiKeyCreated(ApiKey):
+    key: str = Field(..., description="明文 Key，仅在创建时返回一次")
@@ -0,0 +1,125 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, validator
+
+from app.utils.symbols import code_to_symbol
+
+
+class BacktestConfig(BaseModel):
+    """回测相关的策略参数，取自 ``Strategy.parameters``"""
+
+    universe: List[str] = Field(
+        ..., min_items=1, max_items=500, description="股票池，如 SH600519 或 600519"
+    )
+    source: Literal["stock_kline", "qlib"] = Field(
+        "stock_kline", description="行情来源：stock_kline 或 qlib_stock_data"
+    )
+    target: str = Field("primary", description="stock_kline 的数据目标别名")
+    start: Optional[date] = Field(None, description="回测开始日期")
+    end: Optional[date] = Field(None, description="回测结束日期")
+    initial_capital: float = Field(1_000_000, gt=0, description="初始资金")
+    fee_rate: float = Field(0.0003, ge=0, le=0.05, description="单边交易费率")
+
+    @validator("universe", pre=True)
+    def normalize_universe(cls, value: Any) -> List[str]:
+        if isinstance(value, str):
+            value = value.split(",")
+        symbols = [code_to_symbol(str(item)) for item in value or [] if str(item).strip()]
+        return list(dict.fromkeys(symbols))
+
+
+class BacktestMetrics(BaseModel):
+    total_return: float = Field(..., description="累计收益率")
+    annual_return: float = Field(..., description="年化收益率")
+    volatility: float = Field(..., description="年化波动率")
+    sharpe: float = Field(..., description="夏普比率（无风险利率取 0）")
+    max_drawdown: float = Field(..., description="最大回撤（负数）")
+    win_rate: float = Field(..., description="日收益为正的占比")
+    turnover: float = Field(..., description="日均换手（权重变动绝对值之和）")
+    periods: int = Field(..., ge=0, description="交易日数")
+
+
+class EquityPoint(BaseModel):
+    date: str
+    equity: float
+    drawdown: float
+
+
+class BacktestResult(BaseModel):
+    strategy_id: str
+    strategy_type: str
+    symbols: List[str]
+    source: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    metrics: BacktestMetrics
+    equity_curve: List[EquityPoint] = Field(default_factory=list)
+    elapsed_ms: float = Field(0, description="计算耗时（毫秒，不含数据加载）")
+    created_at: datetime
+
+
+class BacktestBatchRequest(BaseModel):
+    strategy_ids: List[str] = Field(..., min_items=1, max_items=50)
+
+
+class BacktestBatchResponse(BaseModel):
+    results: List[BacktestResult] = Field(default_factory=list)
+    errors: Dict[str, str] = Field(
+        default_factory=dict, description="回测失败的策略及原因"
+    )
+
+
+SweepMetric = Literal[
+    "total_return", "annual_return", "sharpe", "max_drawdown", "win_rate"
+]
+
+
+class BacktestSweepRequest(BaseModel):
+    grid: Dict[str, List[Any]] = Field(
+        ..., description="参数名到候选值列表，如 {\"fast\": [3, 5], \"slow\": [20, 30]}"
+    )
+    mode: Literal["grid", "random"] = Field(
+        "grid", description="grid 为全组合，random 为从全组合中无放回抽样"
+    )
+    samples: int = Field(50, ge=1, le=500, description="random 模式的抽样组合数")
+    seed: Optional[int] = Field(None, description="random 模式的随机种子")
+    sort_by: SweepMetric = Field("sharpe", description="排行榜排序指标（降序）")
+    top: int = Field(10, ge=1, le=100, description="排行榜保留条数")
+
+    @validator("grid")
+    def validate_grid(cls, value: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+        if not value:
+            raise ValueError("grid 不能为空")
+        reserved = set(value) & set(BacktestConfig.__fields__)
+        if reserved:
+            raise ValueError(
+                "回测区间与股票池在一次扫描中保持不变，不能扫描: "
+                + ", ".join(sorted(reserved))
+            )
+        for key, candidates in value.items():
+            if not candidates:
+                raise ValueError(f"参数 {key} 的候选值不能为空")
+        return value
+
+
+class BacktestSweepEntry(BaseModel):
+    parameters: Dict[str, Any]
+    metrics: BacktestMetrics
+    cached: bool = False
+
+
+class BacktestSweepProgress(BaseModel):
+    """NDJSON 流中的一行：每完成一个组合推送一次当前排行榜"""
+
+    event: Literal["progress", "done"] = "progress"
+    completed: int = 0
+    total: int = 0
+    cached: int = 0
+    failed: int = 0
+    leaderboard: List[BacktestSweepEntry] = Field(default_factory=list)
+    errors: List[Dict[str, Any]] = Field(
+        default_factory=list, description="失败的组合及原因（仅 done 事件）"
+    )
+    elapsed_ms: Optional[float] = None
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, root_validator, validator
 
@@ -120,3 +120,73 @@ class IndicatorQueryResponse(BaseModel):
     data: List[IndicatorQueryItem] = Field(
         default_factory=list, description="指标记录列表"
     )
+
+
+class IndicatorSpec(BaseModel):
+    """内置指标计算参数"""
+
+    name: Literal["sma", "ema", "rsi", "macd", "boll", "atr", "kdj"] = Field(
+        ..., description="指标名称"
+    )
+    params: Dict[str, float] = Field(
+        default_factory=dict,
+        description="指标参数，例如 {\"window\": 20}，缺省使用常用默认值",
+    )
+
+    @validator("name", pre=True)
+    def normalize_name(cls, value: str) -> str:
+        return str(value or "").strip().lower()
+
+
+class IndicatorComputeRequest(BaseModel):
+    """基于已入库 K 线计算技术指标的请求"""
+
+    symbols: List[str] = Field(..., description="股票代码列表，例如 [\"SH600519\"]")
+    indicators: List[IndicatorSpec] = Field(..., description="需要计算的指标列表")
+    frequency: Literal["d", "w", "m", "15", "30", "60"] = Field(
+        "d", description="使用的 K 线周期"
+    )
+    start: Optional[datetime] = Field(
+        None, description="输出区间开始时间，预热所需的更早历史会自动读取"
+    )
+    end: Optional[datetime] = Field(None, description="输出区间结束时间")
+    source_target: str = Field("primary", description="读取 K 线的数据目标别名")
+    target: str = Field("primary", description="写入指标结果的数据目标别名")
+    provider: str = Field("builtin", description="写入时记录的来源标识")
+
+    @validator("symbols")
+    def normalize_symbols(cls, value: List[str]) -> List[str]:
+        normalized = []
+        for item in value:
+            symbol = (item or "").strip().upper().replace(".", "")
+            if symbol and symbol not in normalized:
+                normalized.append(symbol)
+        if not normalized:
+            raise ValueError("symbols 不可为空")
+        return normalized
+
+    @validator("indicators")
+    def ensure_indicators(cls, value: List[IndicatorSpec]) -> List[IndicatorSpec]:
+        if not value:
+            raise ValueError("indicators 不可为空")
+        return value
+
+    @validator("frequency", pre=True)
+    def normalize_frequency(cls, value: Any) -> str:
+        return str(value).strip().lower()
+
+    @validator("source_target", "target", "provider")
+    def normalize_token(cls, value: str) -> str:
+        normalized = (value or "").strip().lower()
+        if not normalized:
+            raise ValueError("target/provider 不能为空")
+        return normalized
+
+
+class IndicatorComputeResponse(BaseModel):
+    """内置指标计算结果"""
+
+    total: int = Field(..., ge=0, description="计算得到的记录数")
+    data: List[IndicatorRecord] = Field(
+        default_factory=list, description="指标记录列表"
+    )
@@ -1,6 +1,7 @@
+from datetime import date
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SectorData(BaseModel):
@@ -35,3 +36,16 @@ class LimitUpOverview(BaseModel):
     date: str
     sectors: List[SectorData]
     ladders: List[LadderGroup]
+
+
+class LimitUpRebuildRequest(BaseModel):
+    start: Optional[date] = Field(None, description="起始交易日，默认等于 end")
+    end: Optional[date] = Field(None, description="结束交易日，默认今天（UTC）")
+    source_target: str = Field(
+        "primary", description="stock_basic / stock_kline 的数据目标别名"
+    )
+
+
+class LimitUpRebuildSummary(BaseModel):
+    dates: List[str] = Field(default_factory=list, description="已重建的交易日")
+    limit_up: int = Field(0, ge=0, description="区间内涨停（收盘封板）的总家次")
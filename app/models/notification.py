@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, validator
+
+
+class SignalOrder(BaseModel):
+    """单条调仓委托，字段名与通知模板变量一致"""
+
+    stock: str = Field(..., description="股票代码或名称")
+    quantity: float = Field(0, description="委托数量")
+    orderType: str = Field("限价", description="委托类型")
+    price: Optional[float] = Field(None, description="委托价格")
+    action: str = Field(..., description="买入/卖出")
+    position: Optional[float] = Field(None, description="调仓后目标仓位（%）")
+
+    @validator("stock", "action")
+    def strip_text(cls, value: str) -> str:
+        cleaned = (value or "").strip()
+        if not cleaned:
+            raise ValueError("stock/action 不能为空")
+        return cleaned
+
+
+class StrategySignal(BaseModel):
+    """策略产生的调仓信号，推送给订阅该策略的用户"""
+
+    strategyName: Optional[str] = Field(None, description="策略名称，缺省取订阅列表中的名称")
+    orderTime: datetime = Field(
+        default_factory=datetime.utcnow, description="委托时间"
+    )
+    orders: List[SignalOrder] = Field(..., description="调仓委托列表")
+    templateId: Optional[str] = Field(
+        None, description="使用的通知模板 ID，缺省使用用户第一个启用的模板"
+    )
+
+    @validator("orders")
+    def ensure_orders(cls, value: List[SignalOrder]) -> List[SignalOrder]:
+        if not value:
+            raise ValueError("orders 不能为空")
+        return value
+
+
+class NotificationDispatchSummary(BaseModel):
+    strategy_id: str
+    subscribers: int = Field(0, ge=0, description="订阅该策略的用户数")
+    queued: int = Field(0, ge=0, description="已进入发送队列的通知数")
+    skipped: int = Field(
+        0, ge=0, description="未发送的订阅（渠道未配置、无收件人或委托均在黑名单中）"
+    )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -15,6 +15,7 @@ class PortfolioItem(BaseModel):
     status: str
     createdAt: str
     marketValue: float
+    costPrice: Optional[float] = None
 
 
 class StrategySummary(BaseModel):
@@ -26,6 +27,8 @@ class StrategySummary(BaseModel):
     totalWeight: float
     items: List[PortfolioItem]
     createdAt: str
+    todayPnL: Optional[float] = None
+    totalPnL: Optional[float] = None
 
 
 class PortfolioOverview(BaseModel):
@@ -37,6 +37,9 @@ class DataWriteSummary(BaseModel):
     matched: int = Field(..., ge=0)
     modified: int = Field(..., ge=0)
     upserted: int = Field(..., ge=0)
+    indicator_points: int = Field(
+        0, ge=0, description="K 线写入后增量更新的指标点数"
+    )
 
 
 class StockBasicRecord(BaseModel):
@@ -187,3 +190,66 @@ class StockKlineBatch(BaseModel):
         if not value:
             raise ValueError("items 不能为空")
         return value
+
+
+class StockScreenRequest(BaseModel):
+    expression: Optional[str] = Field(
+        None,
+        max_length=1000,
+        description=(
+            "筛选条件，Python 表达式语法，如 "
+            "pe_ttm < 20 and pct_change > 3 and industry in (\"银行\", \"证券\")；"
+            "为空则返回全部股票"
+        ),
+    )
+    sort_by: Optional[str] = Field(None, description="排序字段，如 pct_change")
+    ascending: bool = Field(False, description="是否升序，默认降序")
+    limit: int = Field(50, ge=1, le=5000, description="返回条数（Top N）")
+    fields: Optional[List[str]] = Field(
+        None, description="返回的字段，缺省返回全部快照字段"
+    )
+
+
+class StockScreenResponse(BaseModel):
+    total: int = Field(..., ge=0, description="快照中的股票数")
+    matched: int = Field(..., ge=0, description="满足条件的股票数")
+    as_of: Optional[datetime] = Field(None, description="快照中最新 K 线时间")
+    items: List[Dict[str, Any]] = Field(default_factory=list)
+    elapsed_ms: float = Field(0, description="筛选耗时（毫秒）")
+
+
+class StockQuotesResponse(BaseModel):
+    frequency: str = Field(..., description="K 线周期")
+    quotes: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="按请求顺序排列的最新 K 线（symbol/timestamp/open/high/low/close 等）",
+    )
+    missing: List[str] = Field(default_factory=list, description="暂无行情的代码")
+
+
+class TradingCalendarBatch(BaseModel):
+    exchange: Literal["SSE", "SZSE"] = Field("SSE", description="交易所：SSE/SZSE")
+    dates: List[date] = Field(..., description="交易日列表，支持 YYYY-MM-DD 或 YYYYMMDD")
+
+    @validator("exchange", pre=True)
+    def normalize_exchange(cls, value: Any) -> Any:
+        return value.strip().upper() if isinstance(value, str) else value
+
+    @validator("dates", pre=True)
+    def normalize_dates(cls, value: Any) -> Any:
+        if isinstance(value, list):
+            return [_parse_compact_date(item) for item in value]
+        return value
+
+    @validator("dates")
+    def ensure_dates(cls, value: List[date]) -> List[date]:
+        if not value:
+            raise ValueError("dates 不能为空")
+        return value
+
+
+class TradingCalendarResponse(BaseModel):
+    start: date
+    end: date
+    days: List[date] = Field(default_factory=list, description="区间内的交易日")
+    total: int = Field(0, ge=0)
@@ -0,0 +1,39 @@
+"""
+MongoDB persistence helpers for API keys (only their HMAC digests are stored).
+"""
+
+import inspect
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from .base import BaseRepository
+
+
+class ApiKeyRepository(BaseRepository):
+    collection_name = "api_keys"
+
+    async def ensure_indexes(self) -> None:
+        create_index = getattr(self.collection, "create_index", None)
+        if not callable(create_index):
+            return
+        task = create_index(
+            [("key_hash", ASCENDING)], unique=True, name="key_hash_unique"
+        )
+        if inspect.isawaitable(task):
+            await task
+
+    async def insert_key(self, document: Dict[str, Any]) -> str:
+        result = await self.collection.insert_one(document)
+        return str(result.inserted_id)
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        cursor = self.collection.find({})
+        return await cursor.to_list(length=None)
+
+    async def delete_key(self, key_id: str) -> bool:
+        if not ObjectId.is_valid(key_id):
+            return False
+        result = await self.collection.delete_one({"_id": ObjectId(key_id)})
+        return result.deleted_count > 0
@@ -0,0 +1,32 @@
+import inspect
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING
+
+from .base import BaseRepository
+
+
+class BacktestResultRepository(BaseRepository):
+    """Latest backtest result and equity curve of each strategy."""
+
+    collection_name = "backtest_results"
+
+    async def ensure_indexes(self) -> None:
+        create_index = getattr(self.collection, "create_index", None)
+        if not callable(create_index):
+            return
+        task = create_index(
+            [("strategy_id", ASCENDING)], unique=True, name="strategy_id_unique"
+        )
+        if inspect.isawaitable(task):
+            await task
+
+    async def save_result(self, document: Dict[str, Any]) -> None:
+        await self.collection.update_one(
+            {"strategy_id": document["strategy_id"]},
+            {"$set": document},
+            upsert=True,
+        )
+
+    async def find_by_strategy(self, strategy_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"strategy_id": strategy_id})
@@ -2,7 +2,9 @@
 Shared base helpers for repository classes.
 """
 
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
 
 from app.db import db_manager, mongodb
 
@@ -27,3 +29,20 @@ class BaseRepository:
             self.collection = db_manager.get_database(database_name)[self.collection_name]
         else:
             self.collection = mongodb.db[self.collection_name]
+
+    async def find_by_ids(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Documents keyed by their string ``_id``, fetched with one ``$in`` query.
+
+        Use this to embed related documents in list responses instead of one
+        ``find_one`` per item; invalid or missing ids are simply absent.
+        """
+        object_ids = list(
+            {ObjectId(value) for value in ids if value and ObjectId.is_valid(value)}
+        )
+        if not object_ids:
+            return {}
+        cursor = self.collection.find({"_id": {"$in": object_ids}})
+        return {
+            str(document["_id"]): document
+            for document in await cursor.to_list(length=None)
+        }
@@ -1,8 +1,8 @@
 import inspect
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 
 from .base import BaseRepository
 
@@ -48,11 +48,8 @@ class IndicatorDataRepository(BaseRepository):
         if not documents:
             return {"matched": 0, "modified": 0, "upserted": 0}
 
-        matched = 0
-        modified = 0
-        upserted = 0
         now = datetime.utcnow()
-
+        operations = []
         for payload in documents:
             document = {**payload, "updated_at": now, "ingested_at": now}
             filter_query = {
@@ -65,6 +62,27 @@ class IndicatorDataRepository(BaseRepository):
                 "$set": document,
                 "$setOnInsert": {"created_at": now},
             }
+            operations.append((filter_query, update_doc))
+
+        bulk_write = getattr(self.collection, "bulk_write", None)
+        if callable(bulk_write):
+            result = await bulk_write(
+                [
+                    UpdateOne(filter_query, update_doc, upsert=True)
+                    for filter_query, update_doc in operations
+                ],
+                ordered=False,
+            )
+            return {
+                "matched": getattr(result, "matched_count", 0),
+                "modified": getattr(result, "modified_count", 0),
+                "upserted": getattr(result, "upserted_count", 0),
+            }
+
+        matched = 0
+        modified = 0
+        upserted = 0
+        for filter_query, update_doc in operations:
             result = await self.collection.update_one(
                 filter_query, update_doc, upsert=True
             )
@@ -94,3 +112,181 @@ class IndicatorDataRepository(BaseRepository):
             total = len(results)
 
         return results, total
+
+    async def iter_records(
+        self,
+        filters: Dict[str, Any],
+        *,
+        limit: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield matching documents batch by batch instead of materialising a list."""
+        cursor = self.collection.find(filters).sort("timestamp", DESCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        cursor = cursor.batch_size(batch_size)
+        async for document in cursor:
+            yield document
+
+    async def aggregate_industry_series(
+        self, filters: Dict[str, Any]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Group industry metric points by symbol inside MongoDB.
+
+        Returns ``{"dates": [...], "series": [...]}`` where each series already
+        has the ``symbol/code/name/points`` response shape and points are in
+        ascending time order.
+        """
+        aggregate = getattr(self.collection, "aggregate", None)
+        if not callable(aggregate):
+            documents = await (
+                self.collection.find(filters)
+                .sort("timestamp", ASCENDING)
+                .to_list(length=None)
+            )
+            return self._group_industry_series(documents)
+
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": filters},
+            {"$sort": {"timestamp": ASCENDING}},
+            {
+                "$facet": {
+                    "dates": [
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$dateToString": {
+                                        "format": "%Y-%m-%d",
+                                        "date": "$timestamp",
+                                    }
+                                }
+                            }
+                        },
+                        {"$sort": {"_id": ASCENDING}},
+                    ],
+                    "series": [
+                        {
+                            "$group": {
+                                "_id": {
+                                    "$ifNull": ["$symbol", "$payload.industry_code"]
+                                },
+                                "symbol": {"$last": "$symbol"},
+                                "code": {"$last": "$payload.industry_code"},
+                                "name": {"$last": "$payload.industry_name"},
+                                "points": {
+                                    "$push": {
+                                        "date": "$timestamp",
+                                        "momentum": "$values.momentum",
+                                        "width": "$values.width",
+                                    }
+                                },
+                            }
+                        },
+                        {"$match": {"_id": {"$nin": [None, ""]}}},
+                        {"$sort": {"_id": ASCENDING}},
+                        {
+                            "$project": {
+                                "_id": 0,
+                                "symbol": {
+                                    "$ifNull": [
+                                        "$symbol",
+                                        {"$concat": ["INDUSTRY:", "$_id"]},
+                                    ]
+                                },
+                                "code": {
+                                    "$ifNull": [
+                                        "$code",
+                                        {
+                                            "$arrayElemAt": [
+                                                {"$split": ["$_id", ":"]},
+                                                -1,
+                                            ]
+                                        },
+                                    ]
+                                },
+                                "name": {"$ifNull": ["$name", "$_id"]},
+                                "points": 1,
+                            }
+                        },
+                    ],
+                }
+            },
+        ]
+        results = await aggregate(pipeline).to_list(length=1)
+        facet = results[0] if results else {}
+        return {
+            "dates": [item["_id"] for item in facet.get("dates", [])],
+            "series": facet.get("series", []),
+        }
+
+    @staticmethod
+    def _group_industry_series(
+        documents: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Python equivalent of the aggregation pipeline for stores without it."""
+        series_map: Dict[str, Dict[str, Any]] = {}
+        dates = set()
+        for document in documents:
+            timestamp = document.get("timestamp")
+            if not isinstance(timestamp, datetime):
+                continue
+            dates.add(timestamp.strftime("%Y-%m-%d"))
+
+            payload = document.get("payload") or {}
+            values = document.get("values") or {}
+            key = document.get("symbol") or payload.get("industry_code")
+            if not key:
+                continue
+
+            entry = series_map.setdefault(key, {"points": []})
+            entry["symbol"] = document.get("symbol") or f"INDUSTRY:{key}"
+            entry["code"] = payload.get("industry_code") or key.split(":")[-1]
+            entry["name"] = payload.get("industry_name") or key
+            entry["points"].append(
+                {
+                    "date": timestamp,
+                    "momentum": values.get("momentum"),
+                    "width": values.get("width"),
+                }
+            )
+
+        return {
+            "dates": sorted(dates),
+            "series": [series_map[key] for key in sorted(series_map)],
+        }
+
+    async def find_factor_values(
+        self,
+        indicator: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        field: str = "value",
+    ) -> List[Dict[str, Any]]:
+        """Return ``symbol/timestamp/value`` rows of one indicator field.
+
+        ``field`` is ``value`` or a dotted path such as ``values.dif``.
+        """
+        filters = {
+            "indicator": indicator,
+            "timeframe": timeframe,
+            "timestamp": {"$gte": start, "$lte": end},
+        }
+        cursor = self.collection.find(
+            filters, {"_id": 0, "symbol": 1, "timestamp": 1, field: 1}
+        ).batch_size(10000)
+        path = field.split(".")
+        rows: List[Dict[str, Any]] = []
+        async for document in cursor:
+            value: Any = document
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                rows.append(
+                    {
+                        "symbol": document.get("symbol"),
+                        "timestamp": document.get("timestamp"),
+                        "value": value,
+                    }
+                )
+        return rows
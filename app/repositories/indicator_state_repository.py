@@ -0,0 +1,78 @@
+import inspect
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from .base import BaseRepository
+
+
+class IndicatorStateRepository(BaseRepository):
+    """Rolling state of incrementally maintained indicators, one per series."""
+
+    collection_name = "indicator_state"
+
+    async def ensure_indexes(self) -> None:
+        create_index = getattr(self.collection, "create_index", None)
+        if not callable(create_index):
+            return
+
+        task = create_index(
+            [
+                ("symbol", ASCENDING),
+                ("timeframe", ASCENDING),
+                ("indicator", ASCENDING),
+            ],
+            name="symbol_timeframe_indicator_unique",
+            unique=True,
+        )
+        if inspect.isawaitable(task):
+            await task
+
+    async def find_states(
+        self, symbols: Iterable[str], timeframe: str, indicators: Iterable[str]
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Load the states of many series with a single query."""
+        cursor = self.collection.find(
+            {
+                "symbol": {"$in": list(symbols)},
+                "timeframe": timeframe,
+                "indicator": {"$in": list(indicators)},
+            }
+        )
+        documents = await cursor.to_list(length=None)
+        return {
+            (document["symbol"], document["indicator"]): document
+            for document in documents
+        }
+
+    async def save_states(self, documents: List[Dict[str, Any]]) -> None:
+        if not documents:
+            return
+
+        now = datetime.utcnow()
+        operations = [
+            (
+                {
+                    "symbol": document["symbol"],
+                    "timeframe": document["timeframe"],
+                    "indicator": document["indicator"],
+                },
+                {"$set": {**document, "updated_at": now}},
+            )
+            for document in documents
+        ]
+
+        bulk_write = getattr(self.collection, "bulk_write", None)
+        if callable(bulk_write):
+            await bulk_write(
+                [
+                    UpdateOne(filter_query, update_doc, upsert=True)
+                    for filter_query, update_doc in operations
+                ],
+                ordered=False,
+            )
+            return
+
+        for filter_query, update_doc in operations:
+            await self.collection.update_one(filter_query, update_doc, upsert=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 import inspect
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pymongo import ASCENDING
 
@@ -66,3 +66,46 @@ class QlibStockDataRepository(BaseRepository):
                 upserted += 1
 
         return {"matched": matched, "modified": modified, "upserted": upserted}
+
+    async def find_limit_up_flags(
+        self, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Return ``instrument/datetime`` of daily bars flagged ``limit_up``."""
+        cursor = self.collection.find(
+            {
+                "freq": "1d",
+                "limit_status": "limit_up",
+                "datetime": {"$gte": start, "$lte": end},
+            },
+            {"_id": 0, "instrument": 1, "datetime": 1},
+        )
+        return await cursor.to_list(length=None)
+
+    async def find_closes(
+        self,
+        instruments: List[str],
+        freq: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Closes of many instruments as ``symbol/timestamp/close`` documents."""
+        filters: Dict[str, Any] = {"instrument": {"$in": list(instruments)}, "freq": freq}
+        ts_filters: Dict[str, datetime] = {}
+        if start:
+            ts_filters["$gte"] = start
+        if end:
+            ts_filters["$lte"] = end
+        if ts_filters:
+            filters["datetime"] = ts_filters
+
+        cursor = self.collection.find(
+            filters, {"_id": 0, "instrument": 1, "datetime": 1, "close": 1}
+        )
+        return [
+            {
+                "symbol": document["instrument"],
+                "timestamp": document["datetime"],
+                "close": document.get("close"),
+            }
+            for document in await cursor.to_list(length=None)
+        ]
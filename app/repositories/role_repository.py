@@ -3,7 +3,7 @@ MongoDB persistence helpers for role entities.
 """
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from bson import ObjectId
 
@@ -40,6 +40,15 @@ class RoleRepository(BaseRepository):
         result = await self.collection.delete_one({"_id": ObjectId(role_id)})
         return result.deleted_count > 0
 
+    async def find_all_permissions(self) -> Dict[str, List[str]]:
+        """Every role's permissions keyed by role name."""
+        cursor = self.collection.find({}, {"_id": 0, "name": 1, "permissions": 1})
+        return {
+            document["name"]: list(document.get("permissions") or [])
+            for document in await cursor.to_list(length=None)
+            if document.get("name")
+        }
+
     async def list_roles(self, skip: int, limit: int):
         cursor = self.collection.find().skip(skip).limit(limit)
         return cursor
@@ -1,6 +1,6 @@
 import inspect
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
 from pymongo import ASCENDING
 
@@ -51,3 +51,28 @@ class StockBasicRepository(BaseRepository):
                 upserted += 1
 
         return {"matched": matched, "modified": modified, "upserted": upserted}
+
+    async def find_industry_members(self) -> List[Dict[str, Any]]:
+        """Return ``symbol/industry`` pairs of every stock with an industry."""
+        cursor = self.collection.find(
+            {"industry": {"$nin": [None, ""]}, "status": {"$ne": "delisted"}},
+            {"_id": 0, "symbol": 1, "industry": 1, "payload.industry_code": 1},
+        )
+        return await cursor.to_list(length=None)
+
+    async def find_profiles(self) -> List[Dict[str, Any]]:
+        """Return ``symbol/name/industry`` of every stock."""
+        cursor = self.collection.find(
+            {}, {"_id": 0, "symbol": 1, "name": 1, "industry": 1}
+        )
+        return await cursor.to_list(length=None)
+
+    async def find_fields(
+        self, fields: Sequence[str], symbols: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Return ``symbol`` plus the given top-level ``fields`` of every stock
+        (or only of ``symbols``)."""
+        projection = {"_id": 0, "symbol": 1, **{field: 1 for field in fields}}
+        filters = {"symbol": {"$in": list(symbols)}} if symbols else {}
+        cursor = self.collection.find(filters, projection)
+        return await cursor.to_list(length=None)
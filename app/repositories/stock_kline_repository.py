@@ -1,6 +1,6 @@
 import inspect
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
 from pymongo import ASCENDING, DESCENDING
 
@@ -12,6 +12,17 @@ class StockKlineRepository(BaseRepository):
 
     collection_name = "stock_kline"
 
+    BAR_PROJECTION = {
+        "_id": 0,
+        "symbol": 1,
+        "timestamp": 1,
+        "open": 1,
+        "high": 1,
+        "low": 1,
+        "close": 1,
+        "volume": 1,
+    }
+
     async def ensure_indexes(self) -> None:
         create_index = getattr(self.collection, "create_index", None)
         if not callable(create_index):
@@ -70,3 +81,184 @@ class StockKlineRepository(BaseRepository):
                 upserted += 1
 
         return {"matched": matched, "modified": modified, "upserted": upserted}
+
+    async def iter_bars(
+        self,
+        filters: Dict[str, Any],
+        *,
+        limit: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield K-line documents in ascending time order batch by batch."""
+        cursor = self.collection.find(filters).sort("timestamp", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        cursor = cursor.batch_size(batch_size)
+        async for document in cursor:
+            yield document
+
+    async def find_bars(
+        self,
+        symbol: str,
+        frequency: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return OHLCV bars for one symbol in ascending time order."""
+        filters: Dict[str, Any] = {"symbol": symbol, "frequency": frequency}
+        ts_filters: Dict[str, datetime] = {}
+        if start:
+            ts_filters["$gte"] = start
+        if end:
+            ts_filters["$lte"] = end
+        if ts_filters:
+            filters["timestamp"] = ts_filters
+
+        cursor = self.collection.find(filters, self.BAR_PROJECTION).sort(
+            "timestamp", ASCENDING
+        )
+        return await cursor.to_list(length=None)
+
+    async def find_closes(
+        self,
+        symbols: List[str],
+        frequency: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return ``symbol/timestamp/close`` of many symbols with one query."""
+        filters: Dict[str, Any] = {
+            "symbol": {"$in": list(symbols)},
+            "frequency": frequency,
+        }
+        ts_filters: Dict[str, datetime] = {}
+        if start:
+            ts_filters["$gte"] = start
+        if end:
+            ts_filters["$lte"] = end
+        if ts_filters:
+            filters["timestamp"] = ts_filters
+
+        cursor = self.collection.find(
+            filters, {"_id": 0, "symbol": 1, "timestamp": 1, "close": 1}
+        )
+        return await cursor.to_list(length=None)
+
+    async def find_window(
+        self,
+        frequency: str,
+        start: datetime,
+        end: datetime,
+        fields: List[str],
+    ) -> List[Dict[str, Any]]:
+        """Return the given fields of every symbol's bars within ``[start, end]``."""
+        projection: Dict[str, Any] = {"_id": 0, "symbol": 1, "timestamp": 1}
+        projection.update({field: 1 for field in fields})
+        cursor = self.collection.find(
+            {"frequency": frequency, "timestamp": {"$gte": start, "$lte": end}},
+            projection,
+        )
+        return await cursor.to_list(length=None)
+
+    async def find_recent_closes(
+        self, symbol: str, frequency: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Return the latest ``limit`` ``timestamp/close`` pairs, oldest first."""
+        cursor = (
+            self.collection.find(
+                {"symbol": symbol, "frequency": frequency},
+                {"_id": 0, "timestamp": 1, "close": 1},
+            )
+            .sort("timestamp", DESCENDING)
+            .limit(limit)
+        )
+        documents = await cursor.to_list(length=limit)
+        documents.reverse()
+        return documents
+
+    async def find_latest_bars(
+        self,
+        symbols: Optional[List[str]],
+        frequency: str = "d",
+        fields: Sequence[str] = ("close", "pct_change"),
+    ) -> Dict[str, Dict[str, Any]]:
+        """Latest bar of each symbol with a single query, keyed by symbol.
+
+        ``symbols=None`` returns the latest bar of every symbol in the collection.
+        """
+        if symbols is not None and not symbols:
+            return {}
+        filters: Dict[str, Any] = {"frequency": frequency}
+        if symbols is not None:
+            filters["symbol"] = {"$in": list(symbols)}
+        latest: Dict[str, Dict[str, Any]] = {}
+        aggregate = getattr(self.collection, "aggregate", None)
+        if callable(aggregate):
+            group: Dict[str, Any] = {
+                "_id": "$symbol",
+                "timestamp": {"$first": "$timestamp"},
+            }
+            group.update({field: {"$first": f"${field}"} for field in fields})
+            cursor = aggregate(
+                [
+                    {"$match": filters},
+                    {"$sort": {"symbol": ASCENDING, "timestamp": DESCENDING}},
+                    {"$group": group},
+                ]
+            )
+            for document in await cursor.to_list(length=None):
+                symbol = document.pop("_id")
+                latest[symbol] = {"symbol": symbol, **document}
+            return latest
+
+        async for document in self.collection.find(filters):
+            current = latest.get(document["symbol"])
+            if current is None or document["timestamp"] > current["timestamp"]:
+                latest[document["symbol"]] = document
+        return latest
+
+    async def find_latest_quotes(
+        self,
+        fields: Sequence[str],
+        frequencies: Optional[List[str]] = None,
+        symbols: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Latest bar of every ``(symbol, frequency)`` pair with one aggregation."""
+        filters: Dict[str, Any] = {}
+        if symbols:
+            filters["symbol"] = {"$in": list(symbols)}
+        if frequencies:
+            filters["frequency"] = {"$in": list(frequencies)}
+        aggregate = getattr(self.collection, "aggregate", None)
+        if callable(aggregate):
+            group: Dict[str, Any] = {
+                "_id": {"symbol": "$symbol", "frequency": "$frequency"},
+                "timestamp": {"$first": "$timestamp"},
+            }
+            group.update({field: {"$first": f"${field}"} for field in fields})
+            cursor = aggregate(
+                [
+                    {"$match": filters},
+                    {
+                        "$sort": {
+                            "symbol": ASCENDING,
+                            "frequency": ASCENDING,
+                            "timestamp": DESCENDING,
+                        }
+                    },
+                    {"$group": group},
+                ],
+                allowDiskUse=True,
+            )
+            return [
+                {**document.pop("_id"), **document}
+                for document in await cursor.to_list(length=None)
+            ]
+
+        latest: Dict[Any, Dict[str, Any]] = {}
+        async for document in self.collection.find(filters):
+            key = (document.get("symbol"), document.get("frequency"))
+            current = latest.get(key)
+            if current is None or document["timestamp"] > current["timestamp"]:
+                latest[key] = document
+        return list(latest.values())
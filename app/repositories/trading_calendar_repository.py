@@ -0,0 +1,56 @@
+import inspect
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING
+
+from .base import BaseRepository
+
+
+class TradingCalendarRepository(BaseRepository):
+    """Trading days of the SSE/SZSE calendars, one document per exchange and date."""
+
+    collection_name = "trading_calendar"
+
+    async def ensure_indexes(self) -> None:
+        create_index = getattr(self.collection, "create_index", None)
+        if not callable(create_index):
+            return
+        task = create_index(
+            [("exchange", ASCENDING), ("date", ASCENDING)],
+            unique=True,
+            name="exchange_date_unique",
+        )
+        if inspect.isawaitable(task):
+            await task
+
+    async def upsert_days(self, exchange: str, days: Iterable[date]) -> Dict[str, int]:
+        matched = modified = upserted = 0
+        now = datetime.utcnow()
+        for day in days:
+            moment = datetime.combine(day, time.min)
+            result = await self.collection.update_one(
+                {"exchange": exchange, "date": moment},
+                {
+                    "$set": {"exchange": exchange, "date": moment, "updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            )
+            matched += getattr(result, "matched_count", 0)
+            modified += getattr(result, "modified_count", 0)
+            if getattr(result, "upserted_id", None):
+                upserted += 1
+        return {"matched": matched, "modified": modified, "upserted": upserted}
+
+    async def find_days(self, exchange: Optional[str] = None) -> List[date]:
+        filters = {"exchange": exchange} if exchange else {}
+        cursor = self.collection.find(filters, {"_id": 0, "date": 1})
+        documents = await cursor.to_list(length=None)
+        return [
+            document["date"].date()
+            if isinstance(document["date"], datetime)
+            else document["date"]
+            for document in documents
+            if document.get("date")
+        ]
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.api_keys import (
+    ApiKeyRecord,
+    ApiKeyTable,
+    api_key_table,
+    generate_api_key,
+    hash_api_key,
+)
+from app.core.data_versions import data_versions
+from app.models.api_key import ApiKey, ApiKeyCreate, ApiKeyCreated
+from app.repositories.api_key_repository import ApiKeyRepository
+from app.repositories.user_repository import UserRepository
+
+# API Key 数据版本：创建或吊销时递增，经失效总线同步到其它 worker
+API_KEYS_VERSION_KEY = ("api_keys", "all")
+
+
+class ApiKeyService:
+    """服务账号 API Key：数据库只存 HMAC 摘要，校验读取进程内的 Key 表"""
+
+    def __init__(
+        self,
+        repository: Optional[ApiKeyRepository] = None,
+        users: Optional[UserRepository] = None,
+        table: Optional[ApiKeyTable] = None,
+    ) -> None:
+        self.repository = repository or ApiKeyRepository()
+        self.users = users or UserRepository()
+        self.table = table if table is not None else api_key_table
+
+    async def create_key(
+        self, payload: ApiKeyCreate, created_by: Optional[str] = None
+    ) -> ApiKeyCreated:
+        if not await self.users.find_by_username(payload.username):
+            raise LookupError("用户不存在")
+        await self.repository.ensure_indexes()
+
+        key, prefix = generate_api_key()
+        document = {
+            "name": payload.name,
+            "prefix": prefix,
+            "key_hash": hash_api_key(key),
+            "username": payload.username,
+            "permissions": sorted(set(payload.permissions)),
+            "expires_at": payload.expires_at,
+            "created_at": datetime.utcnow(),
+            "created_by": created_by,
+        }
+        key_id = await self.repository.insert_key(document)
+        data_versions.bump(*API_KEYS_VERSION_KEY)
+        created = self._document_to_key({**document, "_id": key_id})
+        return ApiKeyCreated(**created.dict(), key=key)
+
+    async def list_keys(self) -> List[ApiKey]:
+        documents = await self.repository.find_all()
+        return [self._document_to_key(document) for document in documents]
+
+    async def revoke_key(self, key_id: str) -> bool:
+        deleted = await self.repository.delete_key(key_id)
+        if deleted:
+            data_versions.bump(*API_KEYS_VERSION_KEY)
+        return deleted
+
+    async def authenticate(self, key: str) -> Optional[ApiKeyRecord]:
+        """Record of a valid, unexpired ``key``; reloads the table only when stale."""
+        version = data_versions.get(*API_KEYS_VERSION_KEY)
+        if not self.table.is_fresh(version):
+            documents = await self.repository.find_all()
+            self.table.load(
+                (
+                    (
+                        document["key_hash"],
+                        ApiKeyRecord(
+                            id=str(document["_id"]),
+                            name=document.get("name", ""),
+                            username=document["username"],
+                            permissions=frozenset(document.get("permissions") or []),
+                            expires_at=document.get("expires_at"),
+                        ),
+                    )
+                    for document in documents
+                    if document.get("key_hash") and document.get("username")
+                ),
+                version,
+            )
+        return self.table.lookup(key)
+
+    @staticmethod
+    def _document_to_key(document: dict) -> ApiKey:
+        return ApiKey(
+            id=str(document["_id"]),
+            name=document.get("name", ""),
+            prefix=document.get("prefix", ""),
+            username=document["username"],
+            permissions=document.get("permissions") or [],
+            expires_at=document.get("expires_at"),
+            created_at=document.get("created_at") or datetime.utcnow(),
+            created_by=document.get("created_by"),
+        )
@@ -0,0 +1,229 @@
+"""
+Vectorized backtest engine.
+
+Everything here is pure NumPy and module-level so that :func:`run_backtest` can be
+shipped to worker processes; it must not import the web/database layers.
+"""
+
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from app.utils.bar_matrix import forward_fill
+
+PERIODS_PER_YEAR = 252
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Column-wise moving average; rows without a full window are ``NaN``."""
+    result = np.full_like(values, np.nan)
+    if window > values.shape[0]:
+        return result
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1, values.shape[1]))
+    sums = np.vstack([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    window_sum = sums[window:] - sums[:-window]
+    window_count = counts[window:] - counts[:-window]
+    result[window - 1 :] = np.where(
+        window_count == window, window_sum / window, np.nan
+    )
+    return result
+
+
+def _buy_and_hold(closes: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Equal capital in every symbol on its first bar, then let weights drift.
+
+    The slice reserved for a symbol that has not started trading stays in cash.
+    """
+    count = closes.shape[1]
+    first = np.argmax(~np.isnan(closes), axis=0)
+    entry = closes[first, np.arange(count)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.nan_to_num(closes / entry)
+    held = growth / count
+    cash = (growth == 0).sum(axis=1, keepdims=True) / count
+    return held / (held.sum(axis=1, keepdims=True) + cash)
+
+
+def _ma_cross(closes: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Hold ``1/N`` of capital in each symbol while its fast MA is above the slow MA."""
+    fast = int(params.get("fast", 5))
+    slow = int(params.get("slow", 20))
+    if fast < 1 or slow <= fast:
+        raise ValueError("ma_cross 需要 1 <= fast < slow")
+    with np.errstate(invalid="ignore"):
+        signal = _rolling_mean(closes, fast) > _rolling_mean(closes, slow)
+    return signal / closes.shape[1]
+
+
+def _momentum(closes: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Every ``rebalance`` bars hold the ``top_n`` best ``lookback`` performers."""
+    lookback = int(params.get("lookback", 20))
+    top_n = int(params.get("top_n", 5))
+    rebalance = int(params.get("rebalance", 5))
+    if lookback < 1 or top_n < 1 or rebalance < 1:
+        raise ValueError("momentum 的 lookback/top_n/rebalance 必须为正整数")
+
+    previous = np.full_like(closes, np.nan)
+    previous[lookback:] = closes[:-lookback]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(np.isnan(closes / previous), -np.inf, closes / previous)
+
+    rows = np.arange(lookback, closes.shape[0], rebalance)
+    weights = np.full_like(closes, np.nan)
+    weights[:lookback] = 0.0
+    if rows.size:
+        picks = min(top_n, closes.shape[1])
+        ranked = np.argsort(-score[rows], axis=1, kind="stable")[:, :picks]
+        chosen = np.zeros((rows.size, closes.shape[1]))
+        np.put_along_axis(chosen, ranked, 1.0, axis=1)
+        chosen *= np.isfinite(score[rows])
+        counts = chosen.sum(axis=1, keepdims=True)
+        weights[rows] = np.divide(
+            chosen, counts, out=np.zeros_like(chosen), where=counts > 0
+        )
+
+    # 调仓日之间沿用上一次的目标权重
+    source = np.where(np.isnan(weights[:, 0]), 0, np.arange(closes.shape[0]))
+    np.maximum.accumulate(source, out=source)
+    return weights[source]
+
+
+STRATEGIES: Dict[str, Callable[[np.ndarray, Dict[str, Any]], np.ndarray]] = {
+    "buy_and_hold": _buy_and_hold,
+    "ma_cross": _ma_cross,
+    "momentum": _momentum,
+}
+
+
+def target_weights(
+    strategy_type: str, closes: np.ndarray, params: Dict[str, Any]
+) -> np.ndarray:
+    """Target weights decided at each bar's close (``dates x symbols``)."""
+    builder = STRATEGIES.get(strategy_type)
+    if builder is None:
+        available = ", ".join(sorted(STRATEGIES))
+        raise ValueError(f"不支持的策略类型 {strategy_type}，可选: {available}")
+    weights = builder(closes, params)
+    # 无行情的标的不能持仓
+    return np.where(np.isnan(closes), 0.0, weights)
+
+
+def simulate(
+    closes: np.ndarray, weights: np.ndarray, fee_rate: float = 0.0
+) -> Dict[str, np.ndarray]:
+    """Daily portfolio returns for weights set at close ``t`` and held over ``t+1``.
+
+    Turnover is measured against the drifted pre-trade weights, so a buy-and-hold
+    book only pays for its initial purchase.
+    """
+    previous = np.vstack([closes[:1], closes[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.nan_to_num(closes / previous - 1.0, posinf=0.0, neginf=0.0)
+
+    held = np.vstack([np.zeros((1, closes.shape[1])), weights[:-1]])
+    gross = (held * returns).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drifted = np.nan_to_num(held * (1.0 + returns) / (1.0 + gross)[:, None])
+    turnover = np.abs(weights - drifted).sum(axis=1)
+    net = gross - fee_rate * turnover
+    return {"returns": net, "turnover": turnover, "exposure": weights.sum(axis=1)}
+
+
+def summarize(
+    returns: np.ndarray, turnover: np.ndarray, initial_capital: float
+) -> Dict[str, Any]:
+    """Equity curve, drawdown and headline metrics of a daily return series."""
+    equity = initial_capital * np.cumprod(1.0 + returns)
+    peak = np.maximum.accumulate(equity)
+    drawdown = equity / peak - 1.0
+    periods = max(returns.size, 1)
+    total_return = equity[-1] / initial_capital - 1.0 if equity.size else 0.0
+    volatility = (
+        float(np.std(returns) * np.sqrt(PERIODS_PER_YEAR)) if returns.size else 0.0
+    )
+    mean = float(np.mean(returns)) if returns.size else 0.0
+    annual_return = (1.0 + total_return) ** (PERIODS_PER_YEAR / periods) - 1.0
+    metrics = {
+        "total_return": float(total_return),
+        "annual_return": float(annual_return),
+        "volatility": volatility,
+        "sharpe": mean * PERIODS_PER_YEAR / volatility if volatility > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()) if drawdown.size else 0.0,
+        "win_rate": float((returns > 0).mean()) if returns.size else 0.0,
+        "turnover": float(turnover.mean()) if turnover.size else 0.0,
+        "periods": int(returns.size),
+    }
+    return {"equity": equity, "drawdown": drawdown, "metrics": metrics}
+
+
+def evaluate(
+    closes: np.ndarray,
+    strategy_type: str,
+    params: Dict[str, Any],
+    fee_rate: float = 0.0,
+    initial_capital: float = 1_000_000.0,
+) -> Dict[str, Any]:
+    """Backtest one parameter set on already forward-filled closes."""
+    weights = target_weights(strategy_type, closes, params or {})
+    simulated = simulate(closes, weights, float(fee_rate))
+    return summarize(
+        simulated["returns"], simulated["turnover"], float(initial_capital)
+    )
+
+
+def _rounded(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: round(value, 6) if isinstance(value, float) else value
+        for key, value in metrics.items()
+    }
+
+
+def run_backtest(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Process-pool entry point.
+
+    ``job`` carries ``closes`` (``dates x symbols``), ``dates`` (ISO strings),
+    ``strategy_type``, ``params``, ``fee_rate`` and ``initial_capital``.
+    """
+    # 停牌日沿用前收盘，上市前保持 NaN（不可持仓）
+    closes = forward_fill(np.asarray(job["closes"], dtype=float))
+    summary = evaluate(
+        closes,
+        job["strategy_type"],
+        job.get("params") or {},
+        job.get("fee_rate", 0.0),
+        job.get("initial_capital", 1_000_000.0),
+    )
+    curve = [
+        {"date": day, "equity": round(equity, 2), "drawdown": round(drawdown, 6)}
+        for day, equity, drawdown in zip(
+            job["dates"], summary["equity"].tolist(), summary["drawdown"].tolist()
+        )
+    ]
+    return {"metrics": _rounded(summary["metrics"]), "equity_curve": curve}
+
+
+def run_shared_backtest(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Process-pool entry point for sweeps; returns metrics only.
+
+    The forward-filled close matrix lives in the shared memory block
+    ``spec["shm_name"]`` (``shape``/``dtype``), so every run of a sweep reads the
+    same pages instead of unpickling its own copy.
+    """
+    block = shared_memory.SharedMemory(name=spec["shm_name"])
+    try:
+        closes = np.ndarray(spec["shape"], dtype=spec["dtype"], buffer=block.buf)
+        summary = evaluate(
+            closes,
+            spec["strategy_type"],
+            spec.get("params") or {},
+            spec.get("fee_rate", 0.0),
+            spec.get("initial_capital", 1_000_000.0),
+        )
+        # 关闭共享内存前必须释放对缓冲区的引用
+        del closes
+    finally:
+        block.close()
+    return {"metrics": _rounded(summary["metrics"])}
@@ -0,0 +1,398 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import math
+import random
+import time as timer
+from datetime import date, datetime, time
+from multiprocessing import shared_memory
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.core.cache import VersionedLRUCache
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions
+from app.core.executors import get_process_pool
+from app.models.backtest import (
+    BacktestBatchResponse,
+    BacktestConfig,
+    BacktestResult,
+    BacktestSweepEntry,
+    BacktestSweepProgress,
+    BacktestSweepRequest,
+)
+from app.models.strategy import Strategy
+from app.models.user import User
+from app.repositories.backtest_repository import BacktestResultRepository
+from app.repositories.qlib_data_repository import QlibStockDataRepository
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.services.backtest_engine import (
+    STRATEGIES,
+    run_backtest,
+    run_shared_backtest,
+)
+from app.services.strategy_service import StrategyService
+from app.services.trading_calendar_service import TradingCalendarService
+from app.utils.bar_matrix import forward_fill, pivot_bars
+
+logger = logging.getLogger(__name__)
+
+# 参数扫描结果缓存：键为 (策略类型, 参数, 区间与数据源) 的哈希，版本为行情数据版本
+_sweep_cache = VersionedLRUCache(maxsize=8192)
+
+
+class BacktestService:
+    """对已保存的策略做向量化回测，计算在进程池中执行"""
+
+    # 未指定开始日期时默认回看的交易日数（约三年）
+    DEFAULT_LOOKBACK_DAYS = 244 * 3
+    # 单次参数扫描的组合数上限
+    MAX_SWEEP_RUNS = 500
+
+    def __init__(
+        self,
+        strategy_service: Optional[StrategyService] = None,
+        repository: Optional[BacktestResultRepository] = None,
+        registry: Optional[DataSinkRegistry] = None,
+    ) -> None:
+        self.strategy_service = strategy_service or StrategyService()
+        self.repository = repository or BacktestResultRepository()
+        self.registry = registry or data_sink_registry
+
+    async def run(self, strategy_id: str, user: User) -> BacktestResult:
+        strategy = await self._load_strategy(strategy_id, user)
+        job, context = await self._prepare(strategy)
+        output = await self._submit(job)
+        return await self._save(context, output)
+
+    async def run_many(
+        self, strategy_ids: List[str], user: User
+    ) -> BacktestBatchResponse:
+        """Load every strategy's data, then run all backtests concurrently."""
+        response = BacktestBatchResponse()
+        prepared: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        for strategy_id in dict.fromkeys(strategy_ids):
+            try:
+                strategy = await self._load_strategy(strategy_id, user)
+                prepared.append(await self._prepare(strategy))
+            except (ValueError, LookupError) as exc:
+                response.errors[strategy_id] = str(exc)
+
+        outputs = await asyncio.gather(
+            *(self._submit(job) for job, _ in prepared), return_exceptions=True
+        )
+        for (_, context), output in zip(prepared, outputs):
+            strategy_id = context["strategy_id"]
+            if isinstance(output, ValueError):
+                response.errors[strategy_id] = str(output)
+            elif isinstance(output, BaseException):
+                logger.exception("Backtest of %s failed", strategy_id, exc_info=output)
+                response.errors[strategy_id] = "回测执行失败"
+            else:
+                response.results.append(await self._save(context, output))
+        return response
+
+    async def sweep(
+        self, strategy_id: str, request: BacktestSweepRequest, user: User
+    ) -> AsyncIterator[BacktestSweepProgress]:
+        """Validate a parameter sweep and return its stream of progress events.
+
+        Each combination is cached by ``(strategy_type, parameters)`` under the
+        current version of the price data, so an unchanged sweep is answered from
+        the cache without loading any bars.
+        """
+        strategy = await self._load_strategy(strategy_id, user)
+        config, start_day, end_day = await self._resolve(strategy)
+        dataset, version_key = self._data_version_key(config)
+        version = data_versions.get(dataset, version_key)
+
+        cached: List[BacktestSweepEntry] = []
+        pending: List[Tuple[Dict[str, Any], Dict[str, Any], str]] = []
+        for combination in self._combinations(request):
+            parameters = {**strategy.parameters, **combination}
+            cache_key = self._sweep_cache_key(
+                strategy.strategy_type,
+                parameters,
+                (start_day, end_day, dataset, version_key),
+            )
+            metrics = _sweep_cache.get(cache_key, version)
+            if metrics is not None:
+                cached.append(
+                    BacktestSweepEntry(
+                        parameters=combination, metrics=metrics, cached=True
+                    )
+                )
+            else:
+                pending.append((combination, parameters, cache_key))
+
+        closes = None
+        if pending:
+            documents = await self._load_closes(config, start_day, end_day)
+            dates, _, matrices = pivot_bars(documents, ["close"], config.universe)
+            if dates.size < 2:
+                raise ValueError("回测区间内的行情数据不足")
+            closes = forward_fill(matrices["close"])
+
+        return self._stream_sweep(
+            strategy.strategy_type, config, request, cached, pending, closes, version
+        )
+
+    async def _stream_sweep(
+        self,
+        strategy_type: str,
+        config: BacktestConfig,
+        request: BacktestSweepRequest,
+        entries: List[BacktestSweepEntry],
+        pending: List[Tuple[Dict[str, Any], Dict[str, Any], str]],
+        closes: Optional[np.ndarray],
+        version: int,
+    ) -> AsyncIterator[BacktestSweepProgress]:
+        started = timer.perf_counter()
+        progress = BacktestSweepProgress(
+            total=len(entries) + len(pending),
+            completed=len(entries),
+            cached=len(entries),
+        )
+
+        def snapshot() -> BacktestSweepProgress:
+            progress.leaderboard = sorted(
+                entries,
+                key=lambda entry: getattr(entry.metrics, request.sort_by),
+                reverse=True,
+            )[: request.top]
+            return progress.copy()
+
+        errors: List[Dict[str, Any]] = []
+        if entries:
+            yield snapshot()
+
+        if pending and closes is not None:
+            # 价格矩阵只放入共享内存一次，所有组合的子进程直接映射读取
+            block = shared_memory.SharedMemory(create=True, size=max(closes.nbytes, 1))
+            loop = asyncio.get_running_loop()
+            pool = get_process_pool()
+
+            async def run_one(
+                combination: Dict[str, Any], parameters: Dict[str, Any], key: str
+            ) -> Tuple[Dict[str, Any], str, Any]:
+                spec = {
+                    "shm_name": block.name,
+                    "shape": closes.shape,
+                    "dtype": closes.dtype.str,
+                    "strategy_type": strategy_type,
+                    "params": self._strategy_params(parameters),
+                    "fee_rate": config.fee_rate,
+                    "initial_capital": config.initial_capital,
+                }
+                try:
+                    output = await loop.run_in_executor(
+                        pool, run_shared_backtest, spec
+                    )
+                except Exception as exc:  # 单个组合失败不影响整个扫描
+                    return combination, key, exc
+                return combination, key, output
+
+            tasks: List[asyncio.Task] = []
+            try:
+                shared = np.ndarray(closes.shape, dtype=closes.dtype, buffer=block.buf)
+                shared[:] = closes
+                del shared
+                tasks = [
+                    asyncio.ensure_future(run_one(*item)) for item in pending
+                ]
+                for finished in asyncio.as_completed(tasks):
+                    combination, key, output = await finished
+                    progress.completed += 1
+                    if isinstance(output, BaseException):
+                        progress.failed += 1
+                        if not isinstance(output, ValueError):
+                            logger.error(
+                                "Sweep run %s failed", combination, exc_info=output
+                            )
+                        message = (
+                            str(output)
+                            if isinstance(output, ValueError)
+                            else "回测执行失败"
+                        )
+                        errors.append({"parameters": combination, "error": message})
+                    else:
+                        _sweep_cache.set(key, version, output["metrics"])
+                        entries.append(
+                            BacktestSweepEntry(
+                                parameters=combination, metrics=output["metrics"]
+                            )
+                        )
+                    yield snapshot()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                block.close()
+                block.unlink()
+
+        progress.event = "done"
+        progress.errors = errors
+        progress.elapsed_ms = round((timer.perf_counter() - started) * 1000, 2)
+        yield snapshot()
+
+    def _combinations(self, request: BacktestSweepRequest) -> List[Dict[str, Any]]:
+        keys = list(request.grid)
+        sizes = [len(request.grid[key]) for key in keys]
+        total = math.prod(sizes)
+
+        if request.mode == "grid":
+            if total > self.MAX_SWEEP_RUNS:
+                raise ValueError(
+                    f"参数组合数 {total} 超过上限 {self.MAX_SWEEP_RUNS}，"
+                    "请缩小 grid 或改用 random 模式"
+                )
+            indices: List[Tuple[int, ...]] = list(
+                itertools.product(*(range(size) for size in sizes))
+            )
+        elif total <= request.samples:
+            indices = list(itertools.product(*(range(size) for size in sizes)))
+        else:
+            # 在全组合空间中按下标无放回抽样，不展开全部组合
+            rng = random.Random(request.seed)
+            chosen: Dict[Tuple[int, ...], None] = {}
+            while len(chosen) < request.samples:
+                chosen[tuple(rng.randrange(size) for size in sizes)] = None
+            indices = list(chosen)
+
+        return [
+            {key: request.grid[key][index] for key, index in zip(keys, combination)}
+            for combination in indices
+        ]
+
+    @staticmethod
+    def _data_version_key(config: BacktestConfig) -> Tuple[str, str]:
+        if config.source == "qlib":
+            return "qlib_stock_data", "primary"
+        return "stock_kline", config.target
+
+    @staticmethod
+    def _sweep_cache_key(
+        strategy_type: str, parameters: Dict[str, Any], scope: Tuple[Any, ...]
+    ) -> str:
+        payload = json.dumps(
+            [strategy_type, parameters, scope], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_latest(
+        self, strategy_id: str, user: User
+    ) -> Optional[BacktestResult]:
+        await self._load_strategy(strategy_id, user)
+        document = await self.repository.find_by_strategy(strategy_id)
+        if not document:
+            return None
+        document.pop("_id", None)
+        return BacktestResult(**document)
+
+    async def _load_strategy(self, strategy_id: str, user: User) -> Strategy:
+        strategy = await self.strategy_service.get_strategy_by_id(strategy_id)
+        if not strategy:
+            raise LookupError("策略不存在")
+        if not (strategy.is_public or strategy.user_id == user.id or user.is_superuser):
+            raise LookupError("策略不存在")
+        return strategy
+
+    async def _resolve(
+        self, strategy: Strategy
+    ) -> Tuple[BacktestConfig, date, date]:
+        if strategy.strategy_type not in STRATEGIES:
+            available = ", ".join(sorted(STRATEGIES))
+            raise ValueError(
+                f"不支持的策略类型 {strategy.strategy_type}，可选: {available}"
+            )
+        try:
+            config = BacktestConfig(**strategy.parameters)
+        except ValidationError as exc:
+            raise ValueError(f"策略回测参数无效: {exc}") from exc
+
+        end_day = config.end or datetime.utcnow().date()
+        start_day = config.start
+        if start_day is None:
+            calendar = await TradingCalendarService(
+                registry=self.registry
+            ).ensure_loaded()
+            start_day = calendar.shift(end_day, -(self.DEFAULT_LOOKBACK_DAYS - 1))
+        if start_day > end_day:
+            raise ValueError("回测开始日期不能晚于结束日期")
+        return config, start_day, end_day
+
+    async def _prepare(
+        self, strategy: Strategy
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        config, start_day, end_day = await self._resolve(strategy)
+        documents = await self._load_closes(config, start_day, end_day)
+        dates, symbols, matrices = pivot_bars(documents, ["close"], config.universe)
+        if dates.size < 2:
+            raise ValueError("回测区间内的行情数据不足")
+
+        job = {
+            "closes": matrices["close"],
+            "dates": [str(day) for day in dates.tolist()],
+            "strategy_type": strategy.strategy_type,
+            "params": self._strategy_params(strategy.parameters),
+            "fee_rate": config.fee_rate,
+            "initial_capital": config.initial_capital,
+        }
+        context = {
+            "strategy_id": strategy.id,
+            "strategy_type": strategy.strategy_type,
+            "symbols": symbols,
+            "source": config.source,
+            "start": job["dates"][0],
+            "end": job["dates"][-1],
+            "parameters": strategy.parameters,
+        }
+        return job, context
+
+    @staticmethod
+    def _strategy_params(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Strategy-specific parameters, i.e. everything except ``BacktestConfig``."""
+        return {
+            key: value
+            for key, value in parameters.items()
+            if key not in BacktestConfig.__fields__
+        }
+
+    async def _load_closes(
+        self, config: BacktestConfig, start_day: date, end_day: date
+    ) -> List[Dict[str, Any]]:
+        start = datetime.combine(start_day, time.min)
+        end = datetime.combine(end_day, time.max)
+        if config.source == "qlib":
+            return await QlibStockDataRepository().find_closes(
+                config.universe, "1d", start, end
+            )
+        repository = StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", config.target)
+        )
+        return await repository.find_closes(config.universe, "d", start, end)
+
+    @staticmethod
+    async def _submit(job: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = timer.perf_counter()
+        output = await loop.run_in_executor(get_process_pool(), run_backtest, job)
+        output["elapsed_ms"] = round((timer.perf_counter() - started) * 1000, 2)
+        return output
+
+    async def _save(
+        self, context: Dict[str, Any], output: Dict[str, Any]
+    ) -> BacktestResult:
+        result = BacktestResult(
+            **context,
+            metrics=output["metrics"],
+            equity_curve=output["equity_curve"],
+            elapsed_ms=output["elapsed_ms"],
+            created_at=datetime.utcnow(),
+        )
+        await self.repository.ensure_indexes()
+        await self.repository.save_result(result.dict())
+        return result
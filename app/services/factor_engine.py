@@ -0,0 +1,175 @@
+"""
+Vectorized factor evaluation over ``dates x symbols`` matrices.
+
+All statistics are computed row-wise (one cross-section per trading day) with
+NaN marking missing factor values or returns, so no Python loop runs per date.
+"""
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+
+def forward_returns(closes: np.ndarray, horizon: int) -> np.ndarray:
+    """Return from the close of row ``t`` to the close of row ``t + horizon``."""
+    result = np.full_like(closes, np.nan)
+    if horizon < closes.shape[0]:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[:-horizon] = closes[horizon:] / closes[:-horizon] - 1.0
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def rank_rows(values: np.ndarray) -> np.ndarray:
+    """Row-wise 1-based ranks with ties averaged; ``NaN`` stays ``NaN``."""
+    rows, columns = values.shape
+    if columns == 0:
+        return values.copy()
+    order = np.argsort(values, axis=1, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=1)
+    positions = np.broadcast_to(np.arange(columns), (rows, columns))
+
+    # 相同取值构成一段，段内取首尾位置的平均作为名次
+    differs = ordered[:, 1:] != ordered[:, :-1]
+    starts_run = np.hstack([np.ones((rows, 1), dtype=bool), differs])
+    ends_run = np.hstack([differs, np.ones((rows, 1), dtype=bool)])
+    first = np.maximum.accumulate(np.where(starts_run, positions, 0), axis=1)
+    last = np.minimum.accumulate(
+        np.where(ends_run, positions, columns)[:, ::-1], axis=1
+    )[:, ::-1]
+
+    ranks = np.empty_like(values, dtype=float)
+    np.put_along_axis(ranks, order, (first + last) / 2.0 + 1.0, axis=1)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def row_correlation(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Pearson correlation of each row pair over the columns valid in both."""
+    valid = ~(np.isnan(left) | np.isnan(right))
+    count = valid.sum(axis=1)
+    x = np.where(valid, left, 0.0)
+    y = np.where(valid, right, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = x.sum(axis=1) / count
+        y_mean = y.sum(axis=1) / count
+        x_dev = np.where(valid, x - x_mean[:, None], 0.0)
+        y_dev = np.where(valid, y - y_mean[:, None], 0.0)
+        covariance = (x_dev * y_dev).sum(axis=1)
+        scale = np.sqrt((x_dev**2).sum(axis=1) * (y_dev**2).sum(axis=1))
+        correlation = covariance / scale
+    correlation[(count < 3) | ~np.isfinite(correlation)] = np.nan
+    return correlation
+
+
+def quantile_buckets(factor: np.ndarray, quantiles: int) -> np.ndarray:
+    """Row-wise quantile index ``0..quantiles-1`` (``-1`` where factor is NaN)."""
+    ranks = rank_rows(factor)
+    count = (~np.isnan(factor)).sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        buckets = np.floor((ranks - 1.0) * quantiles / count)
+    return np.where(np.isnan(buckets), -1, np.clip(buckets, 0, quantiles - 1)).astype(
+        np.int64
+    )
+
+
+def quantile_returns(
+    buckets: np.ndarray, returns: np.ndarray, quantiles: int
+) -> np.ndarray:
+    """Mean return of each quantile per row (``dates x quantiles``)."""
+    rows = buckets.shape[0]
+    valid = (buckets >= 0) & ~np.isnan(returns)
+    slot = (np.arange(rows)[:, None] * quantiles + buckets)[valid]
+    totals = np.bincount(slot, weights=returns[valid], minlength=rows * quantiles)
+    counts = np.bincount(slot, minlength=rows * quantiles)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = totals / counts
+    return means.reshape(rows, quantiles)
+
+
+def quantile_turnover(buckets: np.ndarray, quantiles: int) -> np.ndarray:
+    """Share of each quantile's members that were not in it the row before."""
+    turnover = np.full((buckets.shape[0], quantiles), np.nan)
+    if buckets.shape[0] < 2:
+        return turnover
+    for quantile in range(quantiles):
+        members = buckets == quantile
+        size = members[1:].sum(axis=1)
+        stayed = (members[1:] & members[:-1]).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            turnover[1:, quantile] = np.where(size > 0, 1.0 - stayed / size, np.nan)
+    return turnover
+
+
+def _column_means(matrix: np.ndarray) -> np.ndarray:
+    """Column means ignoring NaN; all-NaN columns give NaN without warnings."""
+    counts = (~np.isnan(matrix)).sum(axis=0)
+    totals = np.nansum(matrix, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def _series_stats(series: np.ndarray) -> Tuple[float, float, float, float]:
+    """``(mean, std, mean/std, share positive)`` ignoring NaN."""
+    values = series[~np.isnan(series)]
+    if values.size == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if values.size > 1 else np.nan
+    ratio = mean / std if std and np.isfinite(std) and std > 0 else np.nan
+    return mean, std, ratio, float((values > 0).mean())
+
+
+def evaluate_factor(
+    factor: np.ndarray, closes: np.ndarray, horizon: int, quantiles: int
+) -> Dict[str, Any]:
+    """IC, rank IC, quantile returns and turnover of ``factor`` against closes.
+
+    ``factor`` and ``closes`` are aligned ``dates x symbols``; the factor value
+    known at the close of row ``t`` is scored against the return to row
+    ``t + horizon``.  Returns per-row arrays and headline statistics.
+    """
+    returns = forward_returns(closes, horizon)
+    joint = ~(np.isnan(factor) | np.isnan(returns))
+    factor_joint = np.where(joint, factor, np.nan)
+    returns_joint = np.where(joint, returns, np.nan)
+
+    ic = row_correlation(factor_joint, returns_joint)
+    rank_ic = row_correlation(rank_rows(factor_joint), rank_rows(returns_joint))
+
+    buckets = quantile_buckets(factor, quantiles)
+    by_quantile = quantile_returns(buckets, returns, quantiles)
+    long_short = by_quantile[:, -1] - by_quantile[:, 0]
+    turnover = quantile_turnover(buckets, quantiles)
+
+    # 持有期大于 1 时收益区间重叠，累计收益只取不重叠的行
+    periods = by_quantile[::horizon]
+    cumulative = np.nanprod(1.0 + periods, axis=0) - 1.0
+    mean_by_quantile = _column_means(by_quantile)
+    turnover_by_quantile = _column_means(turnover)
+
+    ic_stats = _series_stats(ic)
+    rank_stats = _series_stats(rank_ic)
+    long_short_stats = _series_stats(long_short)
+    return {
+        "ic": ic,
+        "rank_ic": rank_ic,
+        "long_short": long_short,
+        "coverage": joint.sum(axis=1),
+        "top_turnover": turnover[:, -1],
+        "quantile_mean": mean_by_quantile,
+        "quantile_cumulative": cumulative,
+        "quantile_turnover": turnover_by_quantile,
+        "summary": {
+            "ic_mean": ic_stats[0],
+            "ic_std": ic_stats[1],
+            "icir": ic_stats[2],
+            "ic_positive_ratio": ic_stats[3],
+            "rank_ic_mean": rank_stats[0],
+            "rank_ic_std": rank_stats[1],
+            "rank_icir": rank_stats[2],
+            "rank_ic_positive_ratio": rank_stats[3],
+            "long_short_mean": long_short_stats[0],
+            "top_turnover_mean": float(turnover_by_quantile[-1]),
+        },
+    }
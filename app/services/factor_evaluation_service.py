@@ -0,0 +1,207 @@
+import asyncio
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import VersionedLRUCache
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions, indicator_version_key
+from app.models.analytics import (
+    FactorDailyPoint,
+    FactorEvaluationResponse,
+    FactorEvaluationSummary,
+    FactorQuantileStat,
+)
+from app.repositories.indicator_repository import IndicatorDataRepository
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.services.factor_engine import evaluate_factor
+from app.services.trading_calendar_service import TradingCalendarService
+from app.utils.bar_matrix import pivot_bars
+
+# 中间矩阵与评估结果按数据版本缓存；矩阵体积较大，只保留少量条目
+_factor_matrices = VersionedLRUCache(maxsize=4)
+_close_matrices = VersionedLRUCache(maxsize=4)
+_results = VersionedLRUCache(maxsize=64)
+
+Matrix = Tuple[np.ndarray, List[str], np.ndarray]
+
+
+def _optional(value: Any) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), 6)
+
+
+class FactorEvaluationService:
+    """因子评估：基于 indicator_data 因子值与日 K 线计算 IC / Rank IC / 分位收益"""
+
+    # 最长评估区间（自然日）
+    MAX_RANGE_DAYS = 366 * 10
+
+    def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
+        self.registry = registry or data_sink_registry
+
+    async def evaluate(
+        self,
+        indicator: str,
+        *,
+        start: date,
+        end: date,
+        horizon: int = 1,
+        quantiles: int = 5,
+        field: str = "value",
+        timeframe: str = "1d",
+        target: str = "primary",
+        source_target: str = "primary",
+    ) -> FactorEvaluationResponse:
+        indicator = indicator.strip().lower()
+        if not indicator:
+            raise ValueError("indicator 不能为空")
+        if start > end:
+            raise ValueError("start 不能晚于 end")
+        if (end - start).days > self.MAX_RANGE_DAYS:
+            raise ValueError(f"评估区间不能超过 {self.MAX_RANGE_DAYS} 天")
+
+        factor_version = data_versions.get(
+            "indicator", indicator_version_key(target, indicator)
+        )
+        close_version = data_versions.get("stock_kline", source_target)
+        result_key = (
+            indicator,
+            field,
+            timeframe,
+            target,
+            source_target,
+            start,
+            end,
+            horizon,
+            quantiles,
+        )
+        versions = (factor_version, close_version)
+        cached = _results.get(result_key, versions)
+        if cached is not None:
+            return cached
+
+        factor_dates, symbols, factor = await self._factor_matrix(
+            indicator, field, timeframe, target, start, end, factor_version
+        )
+        if factor_dates.size == 0:
+            raise ValueError("指定区间内没有该指标的因子数据")
+
+        close_dates, closes = await self._close_matrix(
+            source_target, symbols, start, end, horizon, close_version
+        )
+        if close_dates.size == 0:
+            raise ValueError("指定区间内没有对应股票的日 K 线数据")
+
+        # 因子按交易日对齐到 K 线矩阵的行，非交易日的因子值被丢弃
+        aligned = np.full(closes.shape, np.nan)
+        rows = np.searchsorted(close_dates, factor_dates)
+        matched = rows < close_dates.size
+        matched[matched] &= close_dates[rows[matched]] == factor_dates[matched]
+        aligned[rows[matched]] = factor[matched]
+
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(
+            None, evaluate_factor, aligned, closes, horizon, quantiles
+        )
+
+        in_range = (close_dates >= np.datetime64(start, "D")) & (
+            close_dates <= np.datetime64(end, "D")
+        )
+        response = FactorEvaluationResponse(
+            indicator=indicator,
+            target=target,
+            source_target=source_target,
+            field=field,
+            start=start,
+            end=end,
+            horizon=horizon,
+            quantiles=quantiles,
+            symbols=len(symbols),
+            summary=FactorEvaluationSummary(
+                **{key: _optional(value) for key, value in stats["summary"].items()}
+            ),
+            quantile_stats=[
+                FactorQuantileStat(
+                    quantile=index + 1,
+                    mean_return=_optional(stats["quantile_mean"][index]),
+                    cumulative_return=_optional(stats["quantile_cumulative"][index]),
+                    turnover=_optional(stats["quantile_turnover"][index]),
+                )
+                for index in range(quantiles)
+            ],
+            daily=[
+                FactorDailyPoint(
+                    date=str(close_dates[row]),
+                    ic=_optional(stats["ic"][row]),
+                    rank_ic=_optional(stats["rank_ic"][row]),
+                    long_short=_optional(stats["long_short"][row]),
+                    top_turnover=_optional(stats["top_turnover"][row]),
+                    coverage=int(stats["coverage"][row]),
+                )
+                for row in np.flatnonzero(in_range)
+            ],
+        )
+        _results.set(result_key, versions, response)
+        return response
+
+    async def _factor_matrix(
+        self,
+        indicator: str,
+        field: str,
+        timeframe: str,
+        target: str,
+        start: date,
+        end: date,
+        version: int,
+    ) -> Matrix:
+        key = (target, indicator, field, timeframe, start, end)
+        cached = _factor_matrices.get(key, version)
+        if cached is not None:
+            return cached
+
+        repository = IndicatorDataRepository(
+            collection=self.registry.get_collection("indicator", target)
+        )
+        documents = await repository.find_factor_values(
+            indicator,
+            timeframe,
+            datetime.combine(start, time.min),
+            datetime.combine(end, time.max),
+            field,
+        )
+        dates, symbols, matrices = pivot_bars(documents, ["value"])
+        matrix = (dates, symbols, matrices["value"])
+        _factor_matrices.set(key, version, matrix)
+        return matrix
+
+    async def _close_matrix(
+        self,
+        source_target: str,
+        symbols: List[str],
+        start: date,
+        end: date,
+        horizon: int,
+        version: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # 远期收益需要区间结束后的 horizon 个交易日，按交易日历精确取到
+        calendar = await TradingCalendarService(registry=self.registry).ensure_loaded()
+        window_end = calendar.shift(end, horizon)
+        key = (source_target, tuple(symbols), start, window_end)
+        cached = _close_matrices.get(key, version)
+        if cached is not None:
+            return cached
+
+        repository = StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", source_target)
+        )
+        documents = await repository.find_closes(
+            symbols,
+            "d",
+            start=datetime.combine(start, time.min),
+            end=datetime.combine(window_end, time.max),
+        )
+        dates, _, matrices = pivot_bars(documents, ["close"], symbols)
+        matrix = (dates, matrices["close"])
+        _close_matrices.set(key, version, matrix)
+        return matrix
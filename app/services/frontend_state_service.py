@@ -1,15 +1,33 @@
+import asyncio
 import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
+from pymongo import DESCENDING
+
+from app.config import settings
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.market_buffer import MarketCloseBuffer, market_close_buffer
 from app.db import db_manager
 from app.models.account import AccountProfile, AccountProfileUpdate, PasswordChangeRequest
-from app.models.limitup import LimitUpOverview
+from app.models.limitup import (
+    LimitUpOverview,
+    LimitUpRebuildRequest,
+    LimitUpRebuildSummary,
+)
 from app.models.market import MarketDataResponse
 from app.models.portfolio import PortfolioOverview
 from app.models.settings import SettingsData
 from app.models.subscription import StrategySubscriptionState
 from app.models.user import User
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.services.limitup_engine import LimitUpEngine
+from app.services.portfolio_valuation import value_portfolios
+from app.services.quote_service import QuoteService
+from app.services.trading_calendar_service import TradingCalendarService
 from app.services.user_service import UserService
+from app.utils.symbols import code_to_symbol
+from app.utils.templates import validate_template
 
 
 def _now_iso() -> str:
@@ -67,6 +85,12 @@ class SettingsService(BaseCollectionService):
         return SettingsData.parse_obj(payload)
 
     async def save_settings(self, username: str, data: SettingsData) -> None:
+        for template in data.notificationTemplates:
+            try:
+                validate_template(template.subject)
+                validate_template(template.content)
+            except ValueError as exc:
+                raise ValueError(f"通知模板「{template.name}」无效: {exc}") from exc
         await self.collection.update_one(
             {"username": username},
             {
@@ -79,7 +103,9 @@ class SettingsService(BaseCollectionService):
         )
 
 
-class MarketDataService(BaseCollectionService):
+class MarketDataService:
+    """指数行情面板：最近收盘价来自 stock_kline 日线的内存环形缓冲区"""
+
     DEFAULT_DATA: Dict[str, Dict] = {
         "shanghaiIndex": {
             "current": 3700.25,
@@ -103,53 +129,67 @@ class MarketDataService(BaseCollectionService):
         },
     }
 
-    def __init__(self) -> None:
-        super().__init__("market_data")
+    # 行情面板读取的 K 线数据目标
+    SOURCE_TARGET = "primary"
 
-    async def _ensure_seeded(self) -> None:
-        count = await self.collection.count_documents({})
-        if count > 0:
-            return
-        for symbol, data in self.DEFAULT_DATA.items():
-            await self.collection.insert_one(
-                {
-                    "symbol": symbol,
-                    "current": data["current"],
-                    "change": data["change"],
-                    "history": data["history"],
-                    "updated_at": datetime.datetime.utcnow(),
-                }
-            )
+    def __init__(
+        self,
+        registry: Optional[DataSinkRegistry] = None,
+        buffer: Optional[MarketCloseBuffer] = None,
+    ) -> None:
+        self.registry = registry or data_sink_registry
+        self.buffer = buffer or market_close_buffer
+        self.index_symbols: Dict[str, str] = settings.market_index_symbols
 
     async def get_market_data(
         self, symbols: Optional[List[str]], history_days: int
     ) -> MarketDataResponse:
-        await self._ensure_seeded()
-        cursor = self.collection.find({} if not symbols else {"symbol": {"$in": symbols}})
-        docs = await cursor.to_list(length=None)
+        names = symbols or list(
+            dict.fromkeys([*self.index_symbols, *self.DEFAULT_DATA])
+        )
+        await self._warm(
+            [self.index_symbols[name] for name in names if name in self.index_symbols]
+        )
 
         result: Dict[str, Dict] = {}
-        for doc in docs:
-            history = list(doc.get("history", []))
-            history_slice = history[-history_days:] if history_days else history
-            result[doc["symbol"]] = {
-                "current": float(doc.get("current", 0)),
-                "change": float(doc.get("change", 0)),
-                "history": history_slice,
-            }
-        # If specific symbols requested but missing, fill from defaults.
-        if symbols:
-            for symbol in symbols:
-                if symbol not in result and symbol in self.DEFAULT_DATA:
-                    default = self.DEFAULT_DATA[symbol]
-                    result[symbol] = {
-                        "current": default["current"],
-                        "change": default["change"],
-                        "history": default["history"][-history_days:],
-                    }
+        for name in names:
+            symbol = self.index_symbols.get(name)
+            closes = self.buffer.closes(symbol) if symbol else None
+            if closes is not None and closes.size:
+                previous = closes[-2] if closes.size > 1 else closes[-1]
+                change = (closes[-1] / previous - 1.0) * 100.0
+                result[name] = {
+                    "current": round(float(closes[-1]), 2),
+                    "change": round(float(change), 2),
+                    "history": np.round(closes[-history_days:], 2).tolist(),
+                }
+            elif name in self.DEFAULT_DATA:
+                default = self.DEFAULT_DATA[name]
+                result[name] = {
+                    "current": default["current"],
+                    "change": default["change"],
+                    "history": default["history"][-history_days:],
+                }
 
         return MarketDataResponse.parse_obj(result or self.DEFAULT_DATA)
 
+    async def _warm(self, symbols: List[str]) -> None:
+        """Load buffers from stock_kline the first time a symbol is requested."""
+        missing = [symbol for symbol in symbols if not self.buffer.is_warm(symbol)]
+        if not missing:
+            return
+        repository = StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", self.SOURCE_TARGET)
+        )
+        histories = await asyncio.gather(
+            *[
+                repository.find_recent_closes(symbol, "d", self.buffer.capacity)
+                for symbol in missing
+            ]
+        )
+        for symbol, bars in zip(missing, histories):
+            self.buffer.load(symbol, bars)
+
 
 class LimitUpService(BaseCollectionService):
     DEFAULT_OVERVIEW = {
@@ -258,24 +298,57 @@ class LimitUpService(BaseCollectionService):
         ],
     }
 
-    def __init__(self) -> None:
+    def __init__(self, engine: Optional[LimitUpEngine] = None) -> None:
         super().__init__("limitup_overview")
+        self.engine = engine or LimitUpEngine()
 
-    async def _ensure_seeded(self) -> None:
-        if await self.collection.count_documents({}) > 0:
-            return
-        await self.collection.insert_one(
-            {**self.DEFAULT_OVERVIEW, "updated_at": datetime.datetime.utcnow()}
-        )
+    async def _ensure_indexes(self) -> None:
+        create_index = getattr(self.collection, "create_index", None)
+        if callable(create_index):
+            await create_index(
+                [("date", DESCENDING)], unique=True, name="date_unique"
+            )
 
     async def get_overview(self, date: Optional[str]) -> LimitUpOverview:
-        await self._ensure_seeded()
-        target_date = date or _now_iso()
-        doc = await self.collection.find_one({"date": target_date})
+        doc = None
+        if date:
+            doc = await self.collection.find_one({"date": date})
         if not doc:
-            doc = await self.collection.find_one({}) or self.DEFAULT_OVERVIEW
+            latest = (
+                await self.collection.find({})
+                .sort("date", DESCENDING)
+                .limit(1)
+                .to_list(length=1)
+            )
+            doc = latest[0] if latest else self.DEFAULT_OVERVIEW
         return LimitUpOverview.parse_obj(self._strip_id(doc))
 
+    async def has_overview(self, day: datetime.date) -> bool:
+        return await self.collection.find_one({"date": day.isoformat()}) is not None
+
+    async def rebuild(self, payload: LimitUpRebuildRequest) -> LimitUpRebuildSummary:
+        """按交易日预计算涨停梯队，每个交易日一条文档"""
+        end = payload.end or datetime.datetime.utcnow().date()
+        start = payload.start or end
+        if start > end:
+            raise ValueError("start 不能晚于 end")
+        if (end - start).days > 366:
+            raise ValueError("单次最多重建一年的数据")
+
+        overviews = await self.engine.build(start, end, payload.source_target)
+        await self._ensure_indexes()
+        now = datetime.datetime.utcnow()
+        for overview in overviews:
+            await self.collection.update_one(
+                {"date": overview["date"]},
+                {"$set": {**overview, "updated_at": now}},
+                upsert=True,
+            )
+        return LimitUpRebuildSummary(
+            dates=[overview["date"] for overview in overviews],
+            limit_up=sum(overview["limit_up"] for overview in overviews),
+        )
+
 
 class PortfolioService(BaseCollectionService):
     DEFAULT_OVERVIEW = {
@@ -324,8 +397,10 @@ class PortfolioService(BaseCollectionService):
         "todayPendingRebalance": 3,
     }
 
-    def __init__(self) -> None:
+    def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
         super().__init__("portfolio_overview")
+        self.registry = registry or data_sink_registry
+        self.quotes = QuoteService(registry=self.registry)
 
     async def _ensure_seeded(self) -> None:
         if await self.collection.count_documents({}) > 0:
@@ -335,9 +410,28 @@ class PortfolioService(BaseCollectionService):
         )
 
     async def get_overview(self) -> PortfolioOverview:
+        """按最新收盘价对全部策略持仓做盯市估值"""
         await self._ensure_seeded()
-        doc = await self.collection.find_one({}) or self.DEFAULT_OVERVIEW
-        return PortfolioOverview.parse_obj(self._strip_id(doc))
+        doc = self._strip_id(
+            await self.collection.find_one({}) or self.DEFAULT_OVERVIEW
+        )
+        strategies = doc.get("strategies") or []
+        symbols = sorted(
+            {
+                code_to_symbol(str(item.get("code", "")))
+                for strategy in strategies
+                for item in strategy.get("items") or []
+                if item.get("code")
+            }
+        )
+        quotes = await self.quotes.get_latest(symbols, "d")
+        calendar = await TradingCalendarService(registry=self.registry).ensure_loaded()
+        # 当前交易日：今天，或非交易日时之前的最后一个交易日
+        as_of = calendar.shift(datetime.datetime.utcnow().date(), 0)
+        valued, today_pnl, total_pnl = value_portfolios(strategies, quotes, as_of)
+        return PortfolioOverview.parse_obj(
+            {**doc, "strategies": valued, "todayPnL": today_pnl, "totalPnL": total_pnl}
+        )
 
 
 class StrategySubscriptionService(BaseCollectionService):
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions, indicator_version_key
+from app.core.realtime import realtime_hub
 from app.models.indicator import (
     IndicatorPushRequest,
     IndicatorQueryItem,
@@ -17,6 +19,7 @@ class IndicatorService:
 
     DEFAULT_LIMIT = 100
     MAX_LIMIT = 500
+    STREAM_BATCH_SIZE = 1000
 
     def __init__(
         self,
@@ -36,6 +39,11 @@ class IndicatorService:
             for record in payload.records
         ]
         stats = await repository.upsert_many(documents)
+        for indicator in {document["indicator"] for document in documents}:
+            data_versions.bump(
+                "indicator", indicator_version_key(payload.target, indicator)
+            )
+        realtime_hub.publish("indicator", payload.target, documents)
         return IndicatorWriteSummary(
             total=len(documents),
             matched=stats.get("matched", 0),
@@ -56,6 +64,56 @@ class IndicatorService:
         target: str = "primary",
     ) -> IndicatorQueryResponse:
         """根据条件查询指标结果"""
+        filters = self._build_filters(indicator, symbol, timeframe, start, end, tags)
+        safe_limit = self._normalize_limit(limit)
+        safe_skip = self._normalize_skip(skip)
+
+        repository = self._get_repository(target)
+        records, total = await repository.find_records(
+            filters, safe_skip, safe_limit
+        )
+        items = [self._document_to_model(document) for document in records]
+        return IndicatorQueryResponse(total=total, data=items)
+
+    def stream(
+        self,
+        indicator: str,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        target: str = "primary",
+    ) -> AsyncIterator[IndicatorQueryItem]:
+        """按条件逐批读取指标结果，适用于长区间导出
+
+        参数校验在调用时立即完成，返回的异步迭代器只负责逐批读取游标。
+        """
+        filters = self._build_filters(indicator, symbol, timeframe, start, end, tags)
+        repository = self._get_repository(target)
+        documents = repository.iter_records(
+            filters,
+            limit=max(0, limit or 0),
+            batch_size=self.STREAM_BATCH_SIZE,
+        )
+        return self._iter_models(documents)
+
+    async def _iter_models(
+        self, documents: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[IndicatorQueryItem]:
+        async for document in documents:
+            yield self._document_to_model(document)
+
+    def _build_filters(
+        self,
+        indicator: str,
+        symbol: Optional[str],
+        timeframe: Optional[str],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        tags: Optional[List[str]],
+    ) -> Dict[str, Any]:
         if not indicator:
             raise ValueError("indicator 为必填参数")
 
@@ -80,15 +138,7 @@ class IndicatorService:
             if normalized_tags:
                 filters["tags"] = {"$all": normalized_tags}
 
-        safe_limit = self._normalize_limit(limit)
-        safe_skip = self._normalize_skip(skip)
-
-        repository = self._get_repository(target)
-        records, total = await repository.find_records(
-            filters, safe_skip, safe_limit
-        )
-        items = [self._document_to_model(document) for document in records]
-        return IndicatorQueryResponse(total=total, data=items)
+        return filters
 
     def _record_to_document(
         self, provider: str, record: IndicatorRecord
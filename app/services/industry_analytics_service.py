@@ -1,9 +1,18 @@
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from datetime import datetime, time, timezone
+from typing import Dict, Optional
 
+from app.core.cache import VersionedLRUCache
 from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions, indicator_version_key
+from app.core.trading_calendar import TradingCalendar
 from app.models.analytics import IndustryMetricResponse, IndustryMetricSeries
 from app.repositories.indicator_repository import IndicatorDataRepository
+from app.services.trading_calendar_service import TradingCalendarService
+
+
+# 服务按请求实例化，结果缓存与种子标记需跨请求共享
+_result_cache = VersionedLRUCache(maxsize=256)
+_seeded: Dict[str, bool] = {}
 
 
 class IndustryAnalyticsService:
@@ -12,7 +21,8 @@ class IndustryAnalyticsService:
     def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
         self.registry = registry or data_sink_registry
         self._repositories: Dict[str, IndicatorDataRepository] = {}
-        self._seeded: Dict[str, bool] = {}
+        self._seeded = _seeded
+        self._cache = _result_cache
 
     async def get_industry_metrics(
         self,
@@ -25,8 +35,12 @@ class IndustryAnalyticsService:
     ) -> IndustryMetricResponse:
         repository = self._get_repository(target)
         bounded_days = max(1, min(days, 120))
-        end_time = self._normalize_timestamp(end or datetime.utcnow())
-        start_time = end_time - timedelta(days=bounded_days - 1)
+        calendar = await TradingCalendarService(registry=self.registry).ensure_loaded()
+        # 按交易日对齐区间：向前取 days 个交易日，节假日不占用名额
+        end_day = self._normalize_timestamp(end or datetime.utcnow()).date()
+        start_day = calendar.shift(end_day, -(bounded_days - 1))
+        end_time = datetime.combine(end_day, time.max)
+        start_time = datetime.combine(start_day, time.min)
 
         filters: Dict[str, object] = {
             "indicator": indicator.lower(),
@@ -34,66 +48,28 @@ class IndustryAnalyticsService:
             "timestamp": {"$gte": start_time, "$lte": end_time},
         }
 
-        # Fetch a generous amount of records to cover all industries.
-        limit = bounded_days * 64
-        await self._ensure_seed_data(repository, indicator)
-        records, _ = await repository.find_records(filters, skip=0, limit=limit)
-
-        series_map: Dict[str, Dict[str, object]] = {}
-        date_values: set[str] = set()
-
-        for document in records:
-            timestamp = document.get("timestamp")
-            if not isinstance(timestamp, datetime):
-                continue
-            ts = self._normalize_timestamp(timestamp)
-            date_label = ts.strftime("%Y-%m-%d")
-            date_values.add(date_label)
-
-            symbol = document.get("symbol", "")
-            payload = document.get("payload") or {}
-            values = document.get("values") or {}
-            key = symbol or payload.get("industry_code", "")
-            if not key:
-                continue
-
-            entry = series_map.setdefault(
-                key,
-                {
-                    "symbol": symbol or f"INDUSTRY:{payload.get('industry_code', key)}",
-                    "code": payload.get("industry_code") or key.split(":")[-1],
-                    "name": payload.get("industry_name") or key,
-                    "points": [],
-                },
-            )
-            entry["points"].append(
-                {
-                    "date": ts,
-                    "momentum": values.get("momentum"),
-                    "width": values.get("width"),
-                }
-            )
-
-        dates = sorted(date_values)[-bounded_days:]
-        series = []
-        for meta in series_map.values():
-            points = [
-                point
-                for point in sorted(
-                    meta["points"], key=lambda item: item["date"]
-                )
-                if point["date"].strftime("%Y-%m-%d") in dates
-            ]
-            series.append(
-                IndustryMetricSeries(
-                    symbol=meta["symbol"],
-                    code=meta["code"],
-                    name=meta["name"],
-                    points=points,
-                )
-            )
+        await self._ensure_seed_data(repository, indicator, target, calendar)
+        cache_key = (
+            filters["indicator"],
+            (target or "primary").lower(),
+            filters["timeframe"],
+            start_day,
+            end_day,
+        )
+        version = data_versions.get(
+            "indicator", indicator_version_key(target, indicator)
+        )
+        cached = self._cache.get(cache_key, version)
+        if cached is not None:
+            return cached
+
+        aggregated = await repository.aggregate_industry_series(filters)
+        series = [
+            IndustryMetricSeries(**entry) for entry in aggregated["series"]
+        ]
+        dates = aggregated["dates"]
 
-        return IndustryMetricResponse(
+        response = IndustryMetricResponse(
             indicator=indicator,
             target=target,
             start=start_time,
@@ -101,6 +77,8 @@ class IndustryAnalyticsService:
             dates=dates,
             series=series,
         )
+        self._cache.set(cache_key, version, response)
+        return response
 
     def _get_repository(self, target: str) -> IndicatorDataRepository:
         key = target or "primary"
@@ -116,10 +94,14 @@ class IndustryAnalyticsService:
         return value
 
     async def _ensure_seed_data(
-        self, repository: IndicatorDataRepository, indicator: str
+        self,
+        repository: IndicatorDataRepository,
+        indicator: str,
+        target: str,
+        calendar: TradingCalendar,
     ) -> None:
         """Seed a small slice of industry metrics when the collection is empty."""
-        indicator_key = f"{repository.collection_name}:{indicator}"
+        indicator_key = indicator_version_key(target, indicator)
         if self._seeded.get(indicator_key):
             return
 
@@ -131,7 +113,7 @@ class IndustryAnalyticsService:
                 return
 
         today = datetime.utcnow().date()
-        dates = [today - timedelta(days=idx) for idx in range(5)][::-1]
+        dates = [calendar.shift(today, -idx) for idx in range(5)][::-1]
         sample_series = [
             ("INDUSTRY:801010", "801010", "银行", 0.71, 13.5),
             ("INDUSTRY:801020", "801020", "采掘", 1.04, 15.1),
@@ -158,4 +140,5 @@ class IndustryAnalyticsService:
 
         if documents:
             await repository.upsert_many(documents)
+            data_versions.bump("indicator", indicator_key)
         self._seeded[indicator_key] = True
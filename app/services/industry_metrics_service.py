@@ -0,0 +1,221 @@
+from datetime import datetime, time, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions, indicator_version_key
+from app.core.realtime import realtime_hub
+from app.models.analytics import (
+    IndustryMetricsComputeRequest,
+    IndustryMetricsComputeSummary,
+)
+from app.repositories.indicator_repository import IndicatorDataRepository
+from app.repositories.stock_basic_repository import StockBasicRepository
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.services.trading_calendar_service import TradingCalendarService
+from app.utils.bar_matrix import (
+    dates_to_datetimes,
+    forward_fill,
+    pivot_bars,
+    shift_rows,
+)
+
+
+def momentum_and_breadth(
+    closes: np.ndarray,
+    membership: np.ndarray,
+    momentum_window: int,
+    ma_window: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Industry momentum (mean N-day return, %) and breadth (% above MA).
+
+    ``closes`` is ``dates x symbols`` and ``membership`` is the ``symbols x
+    industries`` 0/1 matrix, so every industry is reduced by one matrix product.
+    Returns ``(momentum, width, members)`` each shaped ``dates x industries``.
+    """
+    total_rows = closes.shape[0]
+    valid = ~np.isnan(closes)
+
+    previous = shift_rows(closes, momentum_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = closes / previous - 1.0
+    has_return = np.isfinite(returns)
+
+    zeros = np.zeros((1, closes.shape[1]))
+    sums = np.vstack([zeros, np.cumsum(np.where(valid, closes, 0.0), axis=0)])
+    counts = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    moving = np.full_like(closes, np.nan)
+    if ma_window <= total_rows:
+        window_sum = sums[ma_window:] - sums[:-ma_window]
+        window_count = counts[ma_window:] - counts[:-ma_window]
+        moving[ma_window - 1 :] = np.where(
+            window_count == ma_window, window_sum / ma_window, np.nan
+        )
+    has_ma = valid & ~np.isnan(moving)
+    above = has_ma & (closes > np.where(has_ma, moving, np.inf))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        momentum = (
+            np.where(has_return, returns, 0.0) @ membership
+        ) / (has_return @ membership) * 100.0
+        width = (above @ membership) / (has_ma @ membership) * 100.0
+    members = valid @ membership
+    return momentum, width, members
+
+
+class IndustryMetricsService:
+    """基于 stock_basic 行业分组与日 K 线，批量计算行业动量与宽度"""
+
+    INDUSTRY_PREFIX = "INDUSTRY:"
+
+    def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
+        self.registry = registry or data_sink_registry
+
+    async def compute_and_store(
+        self, request: IndustryMetricsComputeRequest
+    ) -> IndustryMetricsComputeSummary:
+        end_day = self._normalize_timestamp(request.end or datetime.utcnow()).date()
+        end_time = datetime.combine(end_day, time.max)
+        lookback = request.days + max(request.momentum_window, request.ma_window)
+        # 按交易日历精确回溯 lookback 个交易日，不再按自然日估算余量
+        calendar = await TradingCalendarService(registry=self.registry).ensure_loaded()
+        start_time = datetime.combine(calendar.shift(end_day, -lookback), time.min)
+
+        source = request.source_target
+        basics = StockBasicRepository(
+            collection=self.registry.get_collection("stock_basic", source)
+        )
+        industries, symbols, membership = self._group_members(
+            await basics.find_industry_members()
+        )
+        if not industries:
+            raise ValueError("stock_basic 中没有可用的行业分组数据")
+
+        klines = StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", source)
+        )
+        documents = await klines.find_closes(
+            symbols, "d", start=start_time, end=end_time
+        )
+        dates, _, matrices = pivot_bars(documents, ["close"], symbols)
+        if dates.size == 0:
+            raise ValueError("指定区间内没有日 K 线数据")
+
+        momentum, width, members = momentum_and_breadth(
+            forward_fill(matrices["close"]),
+            membership,
+            request.momentum_window,
+            request.ma_window,
+        )
+
+        keep = slice(max(0, dates.size - request.days), dates.size)
+        points = self._to_documents(
+            request,
+            industries,
+            dates[keep],
+            momentum[keep],
+            width[keep],
+            members[keep],
+        )
+
+        repository = IndicatorDataRepository(
+            collection=self.registry.get_collection("indicator", request.target)
+        )
+        await repository.ensure_indexes()
+        stats = await repository.upsert_many(points)
+        if points:
+            data_versions.bump(
+                "indicator", indicator_version_key(request.target, request.indicator)
+            )
+            realtime_hub.publish("indicator", request.target, points)
+
+        return IndustryMetricsComputeSummary(
+            industries=len(industries),
+            symbols=len(symbols),
+            dates=dates[keep].size,
+            total=len(points),
+            matched=stats.get("matched", 0),
+            modified=stats.get("modified", 0),
+            upserted=stats.get("upserted", 0),
+        )
+
+    @staticmethod
+    def _group_members(
+        documents: Sequence[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[str, str]], List[str], np.ndarray]:
+        """Return ``[(code, name)]``, member symbols and the membership matrix."""
+        industry_of: Dict[str, str] = {}
+        codes: Dict[str, str] = {}
+        for document in documents:
+            symbol = document.get("symbol")
+            name = (document.get("industry") or "").strip()
+            if not symbol or not name:
+                continue
+            industry_of[symbol] = name
+            code = (document.get("payload") or {}).get("industry_code")
+            if code:
+                codes[name] = str(code)
+
+        names = sorted(set(industry_of.values()))
+        symbols = sorted(industry_of)
+        column_of = {name: index for index, name in enumerate(names)}
+        membership = np.zeros((len(symbols), len(names)))
+        membership[
+            np.arange(len(symbols)),
+            [column_of[industry_of[symbol]] for symbol in symbols],
+        ] = 1.0
+        industries = [(codes.get(name, name), name) for name in names]
+        return industries, symbols, membership
+
+    def _to_documents(
+        self,
+        request: IndustryMetricsComputeRequest,
+        industries: Sequence[Tuple[str, str]],
+        dates: np.ndarray,
+        momentum: np.ndarray,
+        width: np.ndarray,
+        members: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        documents: List[Dict[str, Any]] = []
+        timestamps = dates_to_datetimes(dates)
+        for column, (code, name) in enumerate(industries):
+            for row, timestamp in enumerate(timestamps):
+                momentum_value = momentum[row, column]
+                width_value = width[row, column]
+                if np.isnan(momentum_value) and np.isnan(width_value):
+                    continue
+                values = {
+                    "momentum": self._round(momentum_value),
+                    "width": self._round(width_value),
+                    "members": int(members[row, column]),
+                }
+                documents.append(
+                    {
+                        "indicator": request.indicator,
+                        "symbol": f"{self.INDUSTRY_PREFIX}{code}",
+                        "timeframe": "1d",
+                        "timestamp": timestamp,
+                        "value": values["momentum"],
+                        "values": values,
+                        "payload": {
+                            "industry_code": code,
+                            "industry_name": name,
+                            "momentum_window": request.momentum_window,
+                            "ma_window": request.ma_window,
+                        },
+                        "tags": ["builtin"],
+                        "provider": "builtin",
+                    }
+                )
+        return documents
+
+    @staticmethod
+    def _round(value: float) -> Optional[float]:
+        return None if np.isnan(value) else round(float(value), 4)
+
+    @staticmethod
+    def _normalize_timestamp(value: datetime) -> datetime:
+        if value.tzinfo:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
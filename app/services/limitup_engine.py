@@ -0,0 +1,252 @@
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.repositories.qlib_data_repository import QlibStockDataRepository
+from app.repositories.stock_basic_repository import StockBasicRepository
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.services.trading_calendar_service import TradingCalendarService
+from app.utils.bar_matrix import forward_fill, pivot_bars, shift_rows
+from app.utils.symbols import price_limit_ratio, symbol_to_code
+
+BAR_FIELDS = [
+    "high",
+    "close",
+    "volume",
+    "amount",
+    "turnover_rate",
+    "pe_ttm",
+    "pb_mrq",
+]
+
+# 价格比较容差，涨停价保留两位小数
+PRICE_TOLERANCE = 1e-3
+
+
+def limit_up_prices(previous_close: np.ndarray, ratios: np.ndarray) -> np.ndarray:
+    """Exchange limit-up price: ``prev_close * (1 + ratio)`` rounded half-up to 0.01."""
+    return np.floor(previous_close * (1.0 + ratios) * 100.0 + 0.5) / 100.0
+
+
+def consecutive_counts(flags: np.ndarray) -> np.ndarray:
+    """Length of the run of ``True`` ending at each row, column-wise.
+
+    Run-length encoding without a Python loop: for every cell take the index of
+    the most recent ``False`` in its column (``maximum.accumulate``) and subtract.
+    """
+    rows = np.arange(flags.shape[0])[:, None]
+    last_break = np.where(flags, -1, rows)
+    np.maximum.accumulate(last_break, axis=0, out=last_break)
+    return np.where(flags, rows - last_break, 0)
+
+
+def mark_flags(
+    flags: Sequence[Dict[str, Any]], dates: np.ndarray, symbols: Sequence[str]
+) -> np.ndarray:
+    """Boolean ``dates x symbols`` matrix of bars flagged ``limit_up`` by a feed."""
+    row_of = {day: index for index, day in enumerate(dates.tolist())}
+    column_of = {symbol: index for index, symbol in enumerate(symbols)}
+    flagged = np.zeros((dates.size, len(symbols)), dtype=bool)
+    for flag in flags:
+        timestamp = flag.get("datetime")
+        if not isinstance(timestamp, datetime):
+            continue
+        row = row_of.get(timestamp.date())
+        column = column_of.get(flag.get("instrument"))
+        if row is not None and column is not None:
+            flagged[row, column] = True
+    return flagged
+
+
+def _ratio(value: float, divisor: float = 1.0) -> float:
+    return 0.0 if not np.isfinite(value) else round(float(value) / divisor, 2)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), 2)
+
+
+def build_overviews(
+    dates: np.ndarray,
+    symbols: Sequence[str],
+    matrices: Dict[str, np.ndarray],
+    profiles: Dict[str, Dict[str, Any]],
+    flagged: Optional[np.ndarray] = None,
+    since: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """Derive one ``limitup_overview`` document per trading day.
+
+    ``matrices`` are ``dates x symbols`` bar fields from :func:`pivot_bars`;
+    ``flagged`` optionally marks bars a feed already reported as limit-up
+    (``qlib_stock_data.limit_status``).  Level ``n`` means ``n`` consecutive
+    limit-up closes; level ``0`` holds stocks that touched the limit intraday but
+    failed to close there.  Only days on or after ``since`` are emitted.
+    """
+    close = matrices["close"]
+    previous_close = shift_rows(forward_fill(close), 1)
+    previous_amount = shift_rows(matrices["amount"], 1)
+    previous_volume = shift_rows(matrices["volume"], 1)
+
+    ratios = np.array(
+        [
+            price_limit_ratio(symbol, (profiles.get(symbol) or {}).get("name"))
+            for symbol in symbols
+        ]
+    )
+    limit_price = limit_up_prices(previous_close, ratios)
+    with np.errstate(invalid="ignore"):
+        closed_up = close >= limit_price - PRICE_TOLERANCE
+        touched = matrices["high"] >= limit_price - PRICE_TOLERANCE
+    if flagged is not None:
+        closed_up |= flagged & ~np.isnan(close)
+    broken = touched & ~closed_up
+    levels = consecutive_counts(closed_up)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (close / previous_close - 1.0) * 100.0
+        volume_ratio = matrices["volume"] / previous_volume
+
+    industries = [
+        (profiles.get(symbol) or {}).get("industry") or "其他" for symbol in symbols
+    ]
+    sector_names, sector_of = np.unique(np.array(industries), return_inverse=True)
+    amount = np.nan_to_num(matrices["amount"])
+
+    first_row = 0
+    if since is not None:
+        first_row = int(np.searchsorted(dates, np.datetime64(since, "D")))
+
+    overviews: List[Dict[str, Any]] = []
+    for row in range(first_row, dates.size):
+        up_columns = np.flatnonzero(closed_up[row])
+        counts = np.bincount(sector_of[up_columns], minlength=sector_names.size)
+        values = np.bincount(
+            sector_of[up_columns],
+            weights=amount[row, up_columns],
+            minlength=sector_names.size,
+        )
+        order = np.lexsort((-values, -counts))
+        sectors = [
+            {
+                "name": str(sector_names[index]),
+                "count": int(counts[index]),
+                "value": round(float(values[index]) / 1e8, 2),
+            }
+            for index in order
+            if counts[index] > 0
+        ]
+
+        def stock_item(column: int) -> Dict[str, Any]:
+            symbol = symbols[column]
+            profile = profiles.get(symbol) or {}
+            code = symbol_to_code(symbol)
+            return {
+                "name": profile.get("name") or code,
+                "code": code,
+                "time": "--",
+                "price": _ratio(close[row, column]),
+                "changePercent": _ratio(change[row, column]),
+                "volume1": _ratio(matrices["amount"][row, column], 1e8),
+                "volume2": _ratio(previous_amount[row, column], 1e8),
+                "ratio1": _ratio(matrices["turnover_rate"][row, column]),
+                "ratio2": _ratio(volume_ratio[row, column]),
+                "sectors": [industries[column]] if profile.get("industry") else [],
+                "marketCap": None,
+                "pe": _optional(matrices["pe_ttm"][row, column]),
+                "pb": _optional(matrices["pb_mrq"][row, column]),
+            }
+
+        ladders = []
+        row_levels = levels[row]
+        for level in np.unique(row_levels[up_columns])[::-1]:
+            columns = up_columns[row_levels[up_columns] == level]
+            columns = columns[np.argsort(-amount[row, columns], kind="stable")]
+            ladders.append(
+                {
+                    "level": int(level),
+                    "count": int(columns.size),
+                    "stocks": [stock_item(column) for column in columns],
+                }
+            )
+        broken_columns = np.flatnonzero(broken[row])
+        if broken_columns.size:
+            broken_columns = broken_columns[
+                np.argsort(-amount[row, broken_columns], kind="stable")
+            ]
+            ladders.append(
+                {
+                    "level": 0,
+                    "count": int(broken_columns.size),
+                    "stocks": [stock_item(column) for column in broken_columns],
+                }
+            )
+
+        overviews.append(
+            {
+                "date": str(dates[row]),
+                "sectors": sectors,
+                "ladders": ladders,
+                "limit_up": int(up_columns.size),
+            }
+        )
+    return overviews
+
+
+class LimitUpEngine:
+    """从日 K 线（及 qlib 涨跌停标记）批量推导每日涨停梯队"""
+
+    # 连板高度统计的回看交易日数
+    LOOKBACK_DAYS = 60
+
+    def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
+        self.registry = registry or data_sink_registry
+
+    async def build(
+        self, start: date, end: date, source_target: str = "primary"
+    ) -> List[Dict[str, Any]]:
+        calendar = await TradingCalendarService(registry=self.registry).ensure_loaded()
+        window_start = datetime.combine(
+            calendar.shift(start, -self.LOOKBACK_DAYS), time.min
+        )
+        window_end = datetime.combine(end, time.max)
+
+        klines = StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", source_target)
+        )
+        documents = await klines.find_window(
+            "d", window_start, window_end, BAR_FIELDS
+        )
+        dates, symbols, matrices = pivot_bars(documents, BAR_FIELDS)
+        if dates.size == 0:
+            return []
+
+        basics = StockBasicRepository(
+            collection=self.registry.get_collection("stock_basic", source_target)
+        )
+        profiles = {
+            profile["symbol"]: profile
+            for profile in await basics.find_profiles()
+            if profile.get("symbol")
+        }
+
+        flags_repository = self._flags_repository(source_target)
+        flags = (
+            await flags_repository.find_limit_up_flags(window_start, window_end)
+            if flags_repository is not None
+            else []
+        )
+        flagged = mark_flags(flags, dates, symbols) if flags else None
+        return build_overviews(dates, symbols, matrices, profiles, flagged, start)
+
+    def _flags_repository(
+        self, source_target: str
+    ) -> Optional[QlibStockDataRepository]:
+        """Qlib bars of the same data target as the K-lines, if it has any."""
+        try:
+            collection = self.registry.get_collection("qlib_stock_data", source_target)
+        except ValueError:
+            # DATA_TARGETS 未登记 qlib 数据集时，Qlib 数据只写入默认库，对应 primary
+            return QlibStockDataRepository() if source_target == "primary" else None
+        return QlibStockDataRepository(collection=collection)
@@ -0,0 +1,98 @@
+"""
+涨停梯队每日预计算
+
+每天 ``LIMITUP_REBUILD_TIME``（UTC）重建当天的涨停梯队；非交易日或当天已有结果时
+跳过，所以多 worker 部署或重启后重复触发也只是一次按日期的查询。
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from app.config import settings
+from app.models.limitup import LimitUpRebuildRequest, LimitUpRebuildSummary
+from app.services.frontend_state_service import LimitUpService
+from app.services.trading_calendar_service import TradingCalendarService
+
+logger = logging.getLogger(__name__)
+
+
+def parse_rebuild_time(raw: str) -> Optional[time]:
+    """``"HH:MM"`` → time; an empty value disables the schedule."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(raw, "%H:%M").time()
+    except ValueError as exc:
+        raise ValueError(f"LIMITUP_REBUILD_TIME 应为 HH:MM 格式: {raw}") from exc
+
+
+def seconds_until(at: time, now: datetime) -> float:
+    """Seconds from ``now`` to the next occurrence of ``at`` (same clock)."""
+    target = datetime.combine(now.date(), at)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class LimitUpScheduler:
+    """Background task rebuilding the day's limit-up overview once per trading day."""
+
+    def __init__(self, at: Optional[time] = None) -> None:
+        self.at = at
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self.at is None or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="limitup-rebuild")
+        logger.info("Scheduled daily limit-up rebuild at %s UTC", self.at)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(
+        self, day: Optional[date] = None
+    ) -> Optional[LimitUpRebuildSummary]:
+        """Rebuild ``day`` (default today, UTC) unless skipped; returns the summary."""
+        day = day or datetime.utcnow().date()
+        calendar = await TradingCalendarService().ensure_loaded()
+        if not calendar.is_trading_day(day):
+            return None
+        service = LimitUpService()
+        if await service.has_overview(day):
+            return None
+        summary = await service.rebuild(LimitUpRebuildRequest(start=day, end=day))
+        logger.info(
+            "Rebuilt limit-up overview for %s (%s limit-ups)", day, summary.limit_up
+        )
+        return summary
+
+    async def _run(self) -> None:
+        # 启动时已过当天的预计算时间则先补算一次
+        if datetime.utcnow().time() >= self.at:
+            await self._rebuild()
+        while True:
+            await asyncio.sleep(seconds_until(self.at, datetime.utcnow()))
+            await self._rebuild()
+
+    async def _rebuild(self) -> None:
+        try:
+            await self.run_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled limit-up rebuild failed")
+
+
+limitup_scheduler = LimitUpScheduler(parse_rebuild_time(settings.limitup_rebuild_time))
@@ -0,0 +1,179 @@
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.notifications import (
+    Notification,
+    NotificationDispatcher,
+    notification_dispatcher,
+)
+from app.db import db_manager
+from app.models.notification import NotificationDispatchSummary, StrategySignal
+from app.models.settings import NotificationTemplate, SettingsData
+from app.models.subscription import SubscriptionStrategy
+from app.utils.symbols import code_to_symbol, symbol_to_code
+from app.utils.templates import get_template
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Tuple[str, SubscriptionStrategy, Set[str]]
+
+
+def _stock_code(value: str) -> str:
+    return symbol_to_code(code_to_symbol(value))
+
+
+class NotificationService:
+    """策略信号通知：按订阅关系与用户设置生成通知，交给后台分发器异步发送"""
+
+    def __init__(self, dispatcher: Optional[NotificationDispatcher] = None) -> None:
+        self.dispatcher = dispatcher or notification_dispatcher
+        self.subscriptions = db_manager.get_mongodb_collection("strategy_subscriptions")
+        self.settings = db_manager.get_mongodb_collection("settings_data")
+
+    async def publish_signal(
+        self, strategy_id: str, signal: StrategySignal
+    ) -> NotificationDispatchSummary:
+        subscribers = await self._subscribers(strategy_id)
+        user_settings = await self._user_settings(
+            [username for username, _, _ in subscribers]
+        )
+
+        messages: List[Notification] = []
+        seen: Set[Tuple[str, str, str, str]] = set()
+        # 模板与过滤后的委托相同的订阅者共享同一份渲染结果
+        rendered: Dict[Tuple[Any, ...], Optional[Tuple[str, str]]] = {}
+        codes = [_stock_code(order.stock) for order in signal.orders]
+        skipped = 0
+        for username, strategy, blacklist in subscribers:
+            kept = tuple(
+                index for index, code in enumerate(codes) if code not in blacklist
+            )
+            data = user_settings.get(username)
+            template = self._template(data, signal.templateId) if data else None
+            channels = [
+                channel
+                for channel in strategy.channels
+                if channel in self.dispatcher.channels
+            ]
+            if not kept or template is None or not channels:
+                skipped += 1
+                continue
+
+            render_key = (
+                template.id,
+                template.subject,
+                template.content,
+                strategy.name,
+                kept,
+            )
+            if render_key not in rendered:
+                orders = [signal.orders[index] for index in kept]
+                try:
+                    rendered[render_key] = self._render(
+                        template, self._context(strategy, signal, orders)
+                    )
+                except ValueError as exc:
+                    # 模板无效只影响使用它的订阅者
+                    logger.warning(
+                        "Skipping notification for %s: template %s is invalid (%s)",
+                        username,
+                        template.id,
+                        exc,
+                    )
+                    rendered[render_key] = None
+            if rendered[render_key] is None:
+                skipped += 1
+                continue
+            subject, body = rendered[render_key]
+            produced = False
+            for channel in channels:
+                for recipient in self._recipients(channel, data):
+                    key = (channel, recipient, subject, body)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    messages.append(Notification(channel, recipient, subject, body))
+                    produced = True
+            if not produced:
+                skipped += 1
+
+        queued = self.dispatcher.submit(messages) if messages else 0
+        return NotificationDispatchSummary(
+            strategy_id=strategy_id,
+            subscribers=len(subscribers),
+            queued=queued,
+            skipped=skipped,
+        )
+
+    async def _subscribers(self, strategy_id: str) -> List[Subscriber]:
+        cursor = self.subscriptions.find(
+            {
+                "state.strategies": {
+                    "$elemMatch": {"id": strategy_id, "subscribed": True}
+                }
+            },
+            {"_id": 0, "username": 1, "state": 1},
+        )
+        subscribers: List[Subscriber] = []
+        async for document in cursor:
+            state = document.get("state") or {}
+            for item in state.get("strategies") or []:
+                if item.get("id") == strategy_id and item.get("subscribed"):
+                    blacklist = {
+                        _stock_code(code) for code in state.get("blacklist") or []
+                    }
+                    subscribers.append(
+                        (
+                            document["username"],
+                            SubscriptionStrategy.parse_obj(item),
+                            blacklist,
+                        )
+                    )
+                    break
+        return subscribers
+
+    async def _user_settings(self, usernames: List[str]) -> Dict[str, SettingsData]:
+        if not usernames:
+            return {}
+        cursor = self.settings.find(
+            {"username": {"$in": usernames}}, {"_id": 0, "username": 1, "data": 1}
+        )
+        return {
+            document["username"]: SettingsData.parse_obj(document.get("data") or {})
+            for document in await cursor.to_list(length=None)
+        }
+
+    @staticmethod
+    def _template(
+        data: SettingsData, template_id: Optional[str]
+    ) -> Optional[NotificationTemplate]:
+        for template in data.notificationTemplates:
+            if template.enabled and (template_id is None or template.id == template_id):
+                return template
+        return None
+
+    @staticmethod
+    def _render(
+        template: NotificationTemplate, context: Dict[str, Any]
+    ) -> Tuple[str, str]:
+        subject = get_template(template.id, template.subject).render(context)
+        body = get_template(template.id, template.content).render(context)
+        # 模板正文以字面量 "\\n" 表示换行
+        return subject, body.replace("\\n", "\n")
+
+    @staticmethod
+    def _recipients(channel: str, data: SettingsData) -> List[str]:
+        if channel == "email":
+            return [config.email for config in data.emailConfigs if config.enabled]
+        return []
+
+    @staticmethod
+    def _context(
+        strategy: SubscriptionStrategy, signal: StrategySignal, orders: List[Any]
+    ) -> Dict[str, Any]:
+        return {
+            "date": signal.orderTime.strftime("%Y-%m-%d"),
+            "strategyName": signal.strategyName or strategy.name,
+            "orderTime": signal.orderTime.strftime("%Y-%m-%d %H:%M"),
+            "orders": [order.dict() for order in orders],
+        }
@@ -0,0 +1,133 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.symbols import code_to_symbol
+
+
+def _bar_day(bar: Dict[str, Any]) -> Optional[date]:
+    timestamp = bar.get("timestamp")
+    return timestamp.date() if isinstance(timestamp, datetime) else None
+
+
+def value_portfolios(
+    strategies: Sequence[Dict[str, Any]],
+    quotes: Dict[str, Dict[str, Any]],
+    as_of: Optional[date] = None,
+) -> Tuple[List[Dict[str, Any]], float, float]:
+    """Mark every strategy's positions to the latest quotes in one vectorized pass.
+
+    ``quotes`` maps symbols (``SH600519``) to their latest bar (``close`` and
+    optionally ``pct_change``).  Per position the cost is ``costPrice`` or, when
+    absent, the stored ``price``.  Positions without a quote keep their stored
+    price.  A strategy's ``totalValue`` is its stored value moved by the
+    revaluation of its positions, and each position's ``currentWeight`` is its
+    market value as a percentage of that total.  Only bars dated ``as_of``
+    (the current trading day) count towards today's PnL.
+    Returns ``(strategies, today_pnl, total_pnl)``.
+    """
+    items = [
+        (index, item)
+        for index, strategy in enumerate(strategies)
+        for item in strategy.get("items") or []
+    ]
+    count = len(strategies)
+    fields = np.array(
+        [
+            (
+                index,
+                item.get("quantity") or 0.0,
+                item.get("price") or 0.0,
+                item.get("costPrice") or item.get("price") or 0.0,
+            )
+            for index, item in items
+        ],
+        dtype=float,
+    ).reshape(-1, 4)
+    owner = fields[:, 0].astype(np.int64)
+    quantity, stored, cost = fields[:, 1], fields[:, 2], fields[:, 3]
+
+    # 行情按去重后的代码查找，再广播回每个持仓
+    code_index: Dict[str, int] = {}
+    position_code = np.fromiter(
+        (
+            code_index.setdefault(str(item.get("code", "")), len(code_index))
+            for _, item in items
+        ),
+        dtype=np.int64,
+        count=len(items),
+    )
+    codes = list(code_index)
+    bars = [quotes.get(code_to_symbol(code)) or {} for code in codes]
+    close = np.array(
+        [np.nan if bar.get("close") is None else bar["close"] for bar in bars],
+        dtype=float,
+    )[position_code]
+    # 早于当前交易日的 K 线（停牌或当日尚未推送）的涨跌幅不计入当日盈亏
+    change = np.array(
+        [
+            (bar.get("pct_change") or 0.0)
+            if as_of is None or _bar_day(bar) == as_of
+            else 0.0
+            for bar in bars
+        ],
+        dtype=float,
+    )[position_code]
+
+    price = np.where(np.isnan(close), stored, close)
+    previous = price / (1.0 + change / 100.0)
+    market_value = quantity * price
+    today = quantity * (price - previous)
+    total = quantity * (price - cost)
+
+    stored_value = np.array(
+        [strategy.get("totalValue") or 0.0 for strategy in strategies], dtype=float
+    )
+    revaluation = np.bincount(
+        owner, weights=quantity * (price - stored), minlength=count
+    )
+    total_value = stored_value + revaluation
+    owner_value = total_value[owner]
+    weight = np.divide(
+        market_value * 100.0,
+        owner_value,
+        out=np.zeros_like(market_value),
+        where=owner_value != 0,
+    )
+    weight_by_strategy = np.bincount(owner, weights=weight, minlength=count)
+    today_by_strategy = np.bincount(owner, weights=today, minlength=count)
+    total_by_strategy = np.bincount(owner, weights=total, minlength=count)
+
+    summary = np.round(
+        np.column_stack(
+            [total_value, weight_by_strategy, today_by_strategy, total_by_strategy]
+        ),
+        2,
+    ).tolist()
+    valued: List[Dict[str, Any]] = [
+        {
+            **strategy,
+            "items": [],
+            "totalValue": row[0],
+            "totalWeight": row[1],
+            "todayPnL": row[2],
+            "totalPnL": row[3],
+        }
+        for strategy, row in zip(strategies, summary)
+    ]
+    prices = np.round(price, 4).tolist()
+    values = np.round(market_value, 2).tolist()
+    weights = np.round(weight, 2).tolist()
+    for (index, item), item_price, item_value, item_weight in zip(
+        items, prices, values, weights
+    ):
+        valued[index]["items"].append(
+            {
+                **item,
+                "price": item_price,
+                "marketValue": item_value,
+                "currentWeight": item_weight,
+            }
+        )
+    return valued, round(float(today.sum()), 2), round(float(total.sum()), 2)
@@ -1,5 +1,6 @@
 from typing import Dict, Optional
 
+from app.core.data_versions import data_versions
 from app.models.qlib import QlibIngestSummary, QlibStockBatch, QlibStockRecord
 from app.repositories.qlib_data_repository import QlibStockDataRepository
 
@@ -16,6 +17,8 @@ class QlibDataIngestionService:
         await self.repository.ensure_indexes()
         documents = [self._record_to_document(batch, record) for record in batch.records]
         stats = await self.repository.upsert_many(documents)
+        if documents:
+            data_versions.bump("qlib_stock_data", "primary")
         return QlibIngestSummary(
             total=len(documents),
             matched=stats.get("matched", 0),
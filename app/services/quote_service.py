@@ -0,0 +1,87 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.quote_store import QUOTE_FIELDS, LatestQuoteStore, latest_quotes
+from app.models.stock_data import StockQuotesResponse
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.utils.symbols import code_to_symbol
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteService:
+    """最新行情：读取进程内的 (symbol, frequency) 最新 K 线缓存"""
+
+    # 缓存对应的 K 线数据目标，与写入时的增量更新保持一致
+    SOURCE_TARGET = "primary"
+
+    def __init__(
+        self,
+        registry: Optional[DataSinkRegistry] = None,
+        store: Optional[LatestQuoteStore] = None,
+    ) -> None:
+        self.registry = registry or data_sink_registry
+        self.store = store if store is not None else latest_quotes
+
+    def _repository(self) -> StockKlineRepository:
+        return StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", self.SOURCE_TARGET)
+        )
+
+    async def warm(self) -> int:
+        """Load the latest bar of every symbol and frequency with one aggregation."""
+        # 全量预热覆盖此前标记的待刷新 symbol；预热期间新标记的留到下次读取
+        self.store.take_stale()
+        documents = await self._repository().find_latest_quotes(QUOTE_FIELDS)
+        self.store.load(documents)
+        logger.info("Warmed latest-quote cache with %s quotes", len(documents))
+        return len(documents)
+
+    async def refresh(self, symbols: Sequence[str]) -> int:
+        """Re-query the latest bars of ``symbols`` written by other workers."""
+        try:
+            documents = await self._repository().find_latest_quotes(
+                QUOTE_FIELDS, symbols=symbols
+            )
+        except BaseException:
+            self.store.mark_stale(symbols)
+            raise
+        return self.store.update(documents)
+
+    async def ensure_warm(self) -> None:
+        if self.store.is_warm and not self.store.has_stale:
+            return
+        # 并发读取者只触发一次重新加载
+        async with self.store.reload_lock.get():
+            if not self.store.is_warm:
+                await self.warm()
+            elif self.store.has_stale:
+                await self.refresh(self.store.take_stale())
+
+    async def get_latest(
+        self, symbols: Sequence[str], frequency: str = "d"
+    ) -> Dict[str, Dict[str, Any]]:
+        """Latest quotes keyed by symbol; symbols without data are omitted."""
+        await self.ensure_warm()
+        return self.store.get_many(symbols, frequency)
+
+    async def all_latest(self, frequency: str = "d") -> List[Dict[str, Any]]:
+        await self.ensure_warm()
+        return self.store.all(frequency)
+
+    async def get_quotes(
+        self, symbols: Sequence[str], frequency: str = "d"
+    ) -> StockQuotesResponse:
+        normalized = list(
+            dict.fromkeys(code_to_symbol(symbol) for symbol in symbols if symbol.strip())
+        )
+        if not normalized:
+            raise ValueError("symbols 不能为空")
+        found = await self.get_latest(normalized, frequency)
+        # 缓存中的行情已是规范化数据，跳过逐条校验
+        return StockQuotesResponse.construct(
+            frequency=frequency,
+            quotes=[found[symbol] for symbol in normalized if symbol in found],
+            missing=[symbol for symbol in normalized if symbol not in found],
+        )
@@ -1,13 +1,24 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 
+from app.core.data_versions import data_versions
+from app.core.permissions import RolePermissionCache, role_permissions
 from app.models.role import Role, RoleCreate, RoleUpdate
+from app.models.user import User
 from app.repositories.role_repository import RoleRepository
 
+# 角色数据版本：角色增删改时递增，经失效总线同步到其它 worker
+ROLES_VERSION_KEY = ("roles", "all")
+
 
 class RoleService:
-    def __init__(self, repository: Optional[RoleRepository] = None) -> None:
+    def __init__(
+        self,
+        repository: Optional[RoleRepository] = None,
+        cache: Optional[RolePermissionCache] = None,
+    ) -> None:
         self.repository = repository or RoleRepository()
+        self.cache = cache if cache is not None else role_permissions
 
     async def create_role(self, role_create: RoleCreate) -> Role:
         if await self.repository.find_by_name(role_create.name):
@@ -23,6 +34,7 @@ class RoleService:
         }
 
         role_id = await self.repository.insert_role(role_doc)
+        self._roles_changed()
         return await self.get_role_by_id(role_id)
 
     async def get_role_by_id(self, role_id: str) -> Optional[Role]:
@@ -50,10 +62,25 @@ class RoleService:
         update_data["updated_at"] = datetime.utcnow()
         if not await self.repository.update_role(role_id, update_data):
             return None
+        self._roles_changed()
         return await self.get_role_by_id(role_id)
 
     async def delete_role(self, role_id: str) -> bool:
-        return await self.repository.delete_role(role_id)
+        deleted = await self.repository.delete_role(role_id)
+        if deleted:
+            self._roles_changed()
+        return deleted
+
+    async def get_effective_permissions(self, user: User) -> FrozenSet[str]:
+        """User's direct permissions merged with those of its roles (cached)."""
+        version = data_versions.get(*ROLES_VERSION_KEY)
+        if not self.cache.is_fresh(version):
+            self.cache.load(await self.repository.find_all_permissions(), version)
+        return self.cache.resolve(user.roles or (), user.permissions or ())
+
+    @staticmethod
+    def _roles_changed() -> None:
+        data_versions.bump(*ROLES_VERSION_KEY)
 
     @staticmethod
     def _document_to_role(document: dict) -> Role:
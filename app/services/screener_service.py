@@ -0,0 +1,153 @@
+import asyncio
+import time as timer
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.stock_snapshot import (
+    NUMERIC_FIELDS,
+    TEXT_FIELDS,
+    StockSnapshot,
+    stock_snapshot,
+)
+from app.models.stock_data import StockScreenRequest, StockScreenResponse
+from app.repositories.stock_basic_repository import StockBasicRepository
+from app.services.quote_service import QuoteService
+from app.utils.expressions import evaluate_mask
+
+OUTPUT_FIELDS = ["symbol", "code", "trade_date", *TEXT_FIELDS, *NUMERIC_FIELDS]
+
+
+class ScreenerService:
+    """选股：在内存列式快照上对条件表达式整列求值，不访问数据库"""
+
+    # 快照读取的数据目标，与行情写入时的增量更新保持一致
+    SOURCE_TARGET = "primary"
+
+    def __init__(
+        self,
+        registry: Optional[DataSinkRegistry] = None,
+        snapshot: Optional[StockSnapshot] = None,
+    ) -> None:
+        self.registry = registry or data_sink_registry
+        self.snapshot = snapshot if snapshot is not None else stock_snapshot
+
+    async def screen(self, request: StockScreenRequest) -> StockScreenResponse:
+        await self.ensure_warm()
+
+        started = timer.perf_counter()
+        columns = self.snapshot.columns()
+        total = len(columns["symbol"])
+        fields = self._output_fields(request.fields)
+
+        if request.expression and request.expression.strip():
+            # 整列求值放到线程池，避免大快照上的表达式阻塞事件循环
+            loop = asyncio.get_running_loop()
+            mask = await loop.run_in_executor(
+                None, evaluate_mask, request.expression, columns, total
+            )
+            rows = np.flatnonzero(mask)
+        else:
+            rows = np.arange(total)
+
+        if request.sort_by:
+            rows = self._sort(rows, columns, request.sort_by, request.ascending)
+        top = rows[: request.limit]
+
+        return StockScreenResponse(
+            total=total,
+            matched=int(rows.size),
+            as_of=self.snapshot.latest_timestamp(),
+            items=self._items(top, columns, fields),
+            elapsed_ms=round((timer.perf_counter() - started) * 1000, 3),
+        )
+
+    async def ensure_warm(self) -> None:
+        if self.snapshot.is_warm and not self.snapshot.has_stale:
+            return
+        # 并发选股只触发一次重建
+        async with self.snapshot.reload_lock.get():
+            if not self.snapshot.is_warm:
+                await self.warm()
+            elif self.snapshot.has_stale:
+                await self.refresh(self.snapshot.take_stale())
+
+    def _basics(self) -> StockBasicRepository:
+        return StockBasicRepository(
+            collection=self.registry.get_collection("stock_basic", self.SOURCE_TARGET)
+        )
+
+    async def warm(self) -> None:
+        """Load ``stock_basic`` plus the latest daily bars from the quote cache."""
+        self.snapshot.take_stale()
+        profiles = await self._basics().find_fields(TEXT_FIELDS)
+        bars = await QuoteService(registry=self.registry).all_latest("d")
+        self.snapshot.load(profiles, bars)
+
+    async def refresh(self, symbols: List[str]) -> None:
+        """Re-read the rows of ``symbols`` written by other workers."""
+        try:
+            profiles = await self._basics().find_fields(TEXT_FIELDS, symbols)
+            bars = await QuoteService(registry=self.registry).get_latest(symbols, "d")
+        except BaseException:
+            self.snapshot.mark_stale(symbols)
+            raise
+        self.snapshot.observe_basics(profiles)
+        self.snapshot.observe_bars(bars.values())
+
+    @staticmethod
+    def _output_fields(requested: Optional[List[str]]) -> List[str]:
+        if not requested:
+            return OUTPUT_FIELDS
+        unknown = [field for field in requested if field not in OUTPUT_FIELDS]
+        if unknown:
+            raise ValueError(f"未知字段: {', '.join(unknown)}")
+        return list(dict.fromkeys(["symbol", *requested]))
+
+    @staticmethod
+    def _sort(
+        rows: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        sort_by: str,
+        ascending: bool,
+    ) -> np.ndarray:
+        key = "timestamp" if sort_by == "trade_date" else sort_by
+        if key not in columns:
+            raise ValueError(f"未知排序字段: {sort_by}")
+        values = columns[key][rows]
+        if key in NUMERIC_FIELDS:
+            # 缺失值无论升降序都排在最后
+            missing = np.isnan(values)
+            order = np.lexsort((values if ascending else -values, missing))
+        elif key == "timestamp":
+            missing = np.isnat(values)
+            ranks = values.astype("int64")
+            order = np.lexsort((ranks if ascending else -ranks, missing))
+        else:
+            order = np.argsort(values.astype(str), kind="stable")
+            if not ascending:
+                order = order[::-1]
+        return rows[order]
+
+    @staticmethod
+    def _items(
+        rows: np.ndarray, columns: Dict[str, np.ndarray], fields: List[str]
+    ) -> List[Dict[str, Any]]:
+        values: Dict[str, List[Any]] = {}
+        for field in fields:
+            if field == "trade_date":
+                dates = columns["timestamp"][rows].astype("datetime64[D]")
+                values[field] = [
+                    None if np.isnat(day) else str(day) for day in dates
+                ]
+            elif field in NUMERIC_FIELDS:
+                column = columns[field][rows]
+                values[field] = np.where(
+                    np.isnan(column), None, column.round(4)
+                ).tolist()
+            elif field in TEXT_FIELDS:
+                values[field] = [value or None for value in columns[field][rows]]
+            else:
+                values[field] = columns[field][rows].tolist()
+        return [dict(zip(fields, item)) for item in zip(*values.values())]
@@ -1,7 +1,15 @@
-from datetime import date, datetime
-from typing import Dict, List, Optional
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+from app.config import settings
 from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions
+from app.core.market_buffer import market_close_buffer
+from app.core.quote_store import latest_quotes
+from app.core.realtime import realtime_hub
+from app.core.stock_snapshot import stock_snapshot
+from app.core.trading_calendar import trading_calendar
 from app.models.indicator import IndicatorPushRequest
 from app.models.stock_data import (
     DataPushConfigResponse,
@@ -14,13 +22,26 @@ from app.models.stock_data import (
 )
 from app.repositories.stock_basic_repository import StockBasicRepository
 from app.repositories.stock_kline_repository import StockKlineRepository
+from app.services.technical_indicator_service import IncrementalIndicatorService
+
+logger = logging.getLogger(__name__)
 
 
 class StockDataService:
     """Business logic around pushing stock basics and K-line data."""
 
-    def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
+    KLINE_FREQUENCIES = {"d", "w", "m", "15", "30", "60"}
+    STREAM_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        registry: Optional[DataSinkRegistry] = None,
+        indicator_updater: Optional[IncrementalIndicatorService] = None,
+    ) -> None:
         self.registry = registry or data_sink_registry
+        self.indicator_updater = indicator_updater or IncrementalIndicatorService(
+            registry=self.registry
+        )
         self._basic_repositories: Dict[str, StockBasicRepository] = {}
         self._kline_repositories: Dict[str, StockKlineRepository] = {}
 
@@ -54,6 +75,14 @@ class StockDataService:
             for record in payload.items
         ]
         stats = await repository.upsert_many(documents)
+        if documents:
+            data_versions.bump(
+                "stock_basic",
+                payload.target,
+                [document["symbol"] for document in documents],
+            )
+        if payload.target == "primary":
+            stock_snapshot.observe_basics(documents)
         return DataWriteSummary(
             total=len(documents),
             matched=stats.get("matched", 0),
@@ -69,13 +98,93 @@ class StockDataService:
             for record in payload.items
         ]
         stats = await repository.upsert_many(documents)
+        if documents:
+            data_versions.bump(
+                "stock_kline",
+                payload.target,
+                [document["symbol"] for document in documents],
+            )
+            realtime_hub.publish("stock_kline", payload.target, documents)
+        indicator_points = 0
+        if payload.target == "primary":
+            market_close_buffer.observe(
+                documents, set(settings.market_index_symbols.values())
+            )
+            latest_quotes.update(documents)
+            stock_snapshot.observe_bars(documents)
+            trading_calendar.observe(documents, settings.trading_calendar_symbol)
+            # 指标滚动状态只对应主库 K 线，其它目标的写入不参与增量计算
+            indicator_points = await self._update_indicators(documents)
         return DataWriteSummary(
             total=len(documents),
             matched=stats.get("matched", 0),
             modified=stats.get("modified", 0),
             upserted=stats.get("upserted", 0),
+            indicator_points=indicator_points,
         )
 
+    async def _update_indicators(self, documents: List[Dict[str, object]]) -> int:
+        """Fold freshly written bars into the incrementally maintained indicators.
+
+        The bars are already persisted at this point, so a failure here is logged
+        instead of failing the whole push.
+        """
+        if not self.indicator_updater.enabled:
+            return 0
+        try:
+            summary = await self.indicator_updater.on_kline_ingested(documents)
+        except Exception:
+            logger.exception("Incremental indicator update failed")
+            return 0
+        return summary.total
+
+    def stream_kline(
+        self,
+        symbol: str,
+        frequency: str = "d",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        target: str = "primary",
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream stored K-line bars in ascending order without buffering them."""
+        normalized_symbol = (symbol or "").strip().upper().replace(".", "")
+        if not normalized_symbol:
+            raise ValueError("symbol 不能为空")
+        normalized_frequency = (frequency or "").strip().lower()
+        if normalized_frequency not in self.KLINE_FREQUENCIES:
+            raise ValueError(
+                "frequency 仅支持 " + "/".join(sorted(self.KLINE_FREQUENCIES))
+            )
+
+        filters: Dict[str, Any] = {
+            "symbol": normalized_symbol,
+            "frequency": normalized_frequency,
+        }
+        ts_filters: Dict[str, datetime] = {}
+        if start:
+            ts_filters["$gte"] = self._normalize_timestamp(start)
+        if end:
+            ts_filters["$lte"] = self._normalize_timestamp(end)
+        if ts_filters:
+            filters["timestamp"] = ts_filters
+
+        repository = self._get_kline_repository(target)
+        documents = repository.iter_bars(
+            filters,
+            limit=max(0, limit or 0),
+            batch_size=self.STREAM_BATCH_SIZE,
+        )
+        return self._iter_kline_payloads(documents)
+
+    async def _iter_kline_payloads(
+        self, documents: AsyncIterator[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async for document in documents:
+            payload = dict(document)
+            payload.pop("_id", None)
+            yield payload
+
     def _get_basic_repository(self, target: str) -> StockBasicRepository:
         key = target or "primary"
         if key not in self._basic_repositories:
@@ -138,6 +247,12 @@ class StockDataService:
         }
         return {key: value for key, value in payload.items() if value is not None}
 
+    @staticmethod
+    def _normalize_timestamp(value: datetime) -> datetime:
+        if value.tzinfo:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
     @staticmethod
     def _date_to_datetime(value: Optional[date]) -> Optional[datetime]:
         if value is None:
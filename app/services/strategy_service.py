@@ -99,12 +99,23 @@ class StrategyService:
     async def get_user_subscriptions(
         self, user_id: str
     ) -> List[StrategySubscriptionResponse]:
-        subscriptions: List[StrategySubscriptionResponse] = []
         cursor = await self.repository.list_subscriptions(user_id)
-        async for document in cursor:
-            strategy = await self.get_strategy_by_id(document["strategy_id"])
-            subscriptions.append(self._document_to_subscription(document, strategy))
-        return subscriptions
+        documents = await cursor.to_list(length=None)
+        # 一次 $in 查询取回全部订阅的策略，避免逐条 find_one
+        strategies = {
+            strategy_id: self._document_to_strategy(document)
+            for strategy_id, document in (
+                await self.repository.find_by_ids(
+                    document["strategy_id"] for document in documents
+                )
+            ).items()
+        }
+        return [
+            self._document_to_subscription(
+                document, strategies.get(document["strategy_id"])
+            )
+            for document in documents
+        ]
 
     async def get_all_strategies(
         self, skip: int = 0, limit: int = 100
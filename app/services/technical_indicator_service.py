@@ -0,0 +1,597 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.config import settings
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions, indicator_version_key
+from app.core.realtime import realtime_hub
+from app.models.indicator import (
+    IndicatorComputeRequest,
+    IndicatorComputeResponse,
+    IndicatorRecord,
+    IndicatorWriteSummary,
+)
+from app.repositories.indicator_repository import IndicatorDataRepository
+from app.repositories.indicator_state_repository import IndicatorStateRepository
+from app.repositories.stock_kline_repository import StockKlineRepository
+
+Bars = Dict[str, np.ndarray]
+KernelResult = Tuple[Dict[str, np.ndarray], Dict[str, Any]]
+
+
+def _ewm(values: np.ndarray, alpha: float, seed: Optional[float] = None) -> np.ndarray:
+    """Exponential smoothing ``y = alpha * x + (1 - alpha) * y_prev``.
+
+    The recursion is evaluated block by block in closed form so that the inner
+    loop stays inside NumPy; the block length keeps ``decay ** -block`` far away
+    from overflow.  Without ``seed`` the series starts from its first value.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.empty_like(values)
+    if values.size == 0:
+        return result
+    if alpha >= 1.0:
+        result[:] = values
+        return result
+
+    decay = 1.0 - alpha
+    block = int(max(1, min(256, 200.0 / -np.log10(decay))))
+    powers = decay ** np.arange(1, block + 1)
+    previous = float(values[0]) if seed is None else float(seed)
+    for offset in range(0, values.size, block):
+        chunk = values[offset : offset + block]
+        scale = powers[: chunk.size]
+        result[offset : offset + chunk.size] = scale * (
+            previous + alpha * np.cumsum(chunk / scale)
+        )
+        previous = float(result[offset + chunk.size - 1])
+    return result
+
+
+def _with_tail(values: np.ndarray, tail: Optional[Sequence[float]]) -> np.ndarray:
+    if not tail:
+        return values
+    return np.concatenate([np.asarray(tail, dtype=float), values])
+
+
+def _rolling(
+    values: np.ndarray,
+    window: int,
+    tail: Optional[Sequence[float]],
+    reducer: Callable[..., np.ndarray],
+) -> Tuple[np.ndarray, List[float]]:
+    """Apply ``reducer`` over full windows and return the tail for the next call."""
+    extended = _with_tail(values, tail)
+    result = np.full(values.size, np.nan)
+    if extended.size >= window:
+        reduced = reducer(sliding_window_view(extended, window), axis=-1)
+        count = min(values.size, reduced.size)
+        if count:
+            result[values.size - count :] = reduced[reduced.size - count :]
+    next_tail = extended[extended.size - (window - 1) :] if window > 1 else []
+    return result, [float(item) for item in next_tail]
+
+
+def _warmup_mask(size: int, seen: int, warmup: int) -> np.ndarray:
+    """Mask positions that still belong to the first ``warmup`` observations."""
+    return (seen + np.arange(1, size + 1)) < warmup
+
+
+def _window(params: Dict[str, float], key: str = "window") -> int:
+    value = int(params[key])
+    if value < 1:
+        raise ValueError(f"{key} 必须为正整数")
+    return value
+
+
+def _previous(values: np.ndarray, previous_value: Optional[float]) -> np.ndarray:
+    """Series shifted by one bar, seeded with the last value of the prior call."""
+    head = np.nan if previous_value is None else previous_value
+    return np.concatenate([[head], values[:-1]])
+
+
+def _last(values: np.ndarray, fallback: Optional[float]) -> Optional[float]:
+    return float(values[-1]) if values.size else fallback
+
+
+def _sma(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    window = _window(params)
+    mean, tail = _rolling(bars["close"], window, state.get("tail"), np.mean)
+    return {"value": mean}, {"tail": tail}
+
+
+def _ema(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    window = _window(params)
+    close = bars["close"]
+    seen = int(state.get("count", 0))
+    ema = _ewm(close, 2.0 / (window + 1), state.get("ema"))
+    value = np.where(_warmup_mask(close.size, seen, window), np.nan, ema)
+    return {"value": value}, {
+        "ema": _last(ema, state.get("ema")),
+        "count": seen + close.size,
+    }
+
+
+def _rsi(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    window = _window(params)
+    close = bars["close"]
+    previous_close = state.get("prev_close")
+    value = np.full(close.size, np.nan)
+    if close.size == 0:
+        return {"value": value}, dict(state)
+
+    previous = _previous(close, previous_close)
+    start = 1 if previous_close is None else 0
+    diff = (close - previous)[start:]
+    seen = int(state.get("count", 0))
+    gain = _ewm(np.maximum(diff, 0.0), 1.0 / window, state.get("gain"))
+    loss = _ewm(np.maximum(-diff, 0.0), 1.0 / window, state.get("loss"))
+    total = gain + loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(total > 0, gain / total * 100.0, 50.0)
+    rsi[_warmup_mask(diff.size, seen, window)] = np.nan
+    value[start:] = rsi
+    return {"value": value}, {
+        "prev_close": float(close[-1]),
+        "gain": _last(gain, state.get("gain")),
+        "loss": _last(loss, state.get("loss")),
+        "count": seen + diff.size,
+    }
+
+
+def _macd(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    fast = _window(params, "fast")
+    slow = _window(params, "slow")
+    signal = _window(params, "signal")
+    close = bars["close"]
+    seen = int(state.get("count", 0))
+    fast_ema = _ewm(close, 2.0 / (fast + 1), state.get("fast"))
+    slow_ema = _ewm(close, 2.0 / (slow + 1), state.get("slow"))
+    dif = fast_ema - slow_ema
+    dea = _ewm(dif, 2.0 / (signal + 1), state.get("dea"))
+    histogram = 2.0 * (dif - dea)
+    mask = _warmup_mask(close.size, seen, slow)
+    outputs = {
+        "value": np.where(mask, np.nan, histogram),
+        "dif": np.where(mask, np.nan, dif),
+        "dea": np.where(mask, np.nan, dea),
+        "macd": np.where(mask, np.nan, histogram),
+    }
+    return outputs, {
+        "fast": _last(fast_ema, state.get("fast")),
+        "slow": _last(slow_ema, state.get("slow")),
+        "dea": _last(dea, state.get("dea")),
+        "count": seen + close.size,
+    }
+
+
+def _boll(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    window = _window(params)
+    width = float(params["k"])
+    close = bars["close"]
+    mid, tail = _rolling(close, window, state.get("tail"), np.mean)
+    std, _ = _rolling(close, window, state.get("tail"), np.std)
+    outputs = {
+        "value": mid,
+        "mid": mid,
+        "upper": mid + width * std,
+        "lower": mid - width * std,
+    }
+    return outputs, {"tail": tail}
+
+
+def _atr(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    window = _window(params)
+    high, low, close = bars["high"], bars["low"], bars["close"]
+    if close.size == 0:
+        return {"value": np.full(0, np.nan)}, dict(state)
+    previous = _previous(close, state.get("prev_close"))
+    true_range = np.fmax(
+        high - low, np.fmax(np.abs(high - previous), np.abs(low - previous))
+    )
+    atr, tail = _rolling(true_range, window, state.get("tail"), np.mean)
+    return {"value": atr}, {"prev_close": float(close[-1]), "tail": tail}
+
+
+def _kdj(bars: Bars, params: Dict[str, float], state: Dict[str, Any]) -> KernelResult:
+    window = _window(params)
+    k_smooth = _window(params, "k_smooth")
+    d_smooth = _window(params, "d_smooth")
+    close = bars["close"]
+    highest, high_tail = _rolling(bars["high"], window, state.get("high_tail"), np.max)
+    lowest, low_tail = _rolling(bars["low"], window, state.get("low_tail"), np.min)
+    spread = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = np.where(spread > 0, (close - lowest) / spread * 100.0, 50.0)
+    rsv[np.isnan(highest)] = np.nan
+
+    k_line = np.full(close.size, np.nan)
+    d_line = np.full(close.size, np.nan)
+    valid = np.flatnonzero(~np.isnan(rsv))
+    if valid.size:
+        first = int(valid[0])
+        k_line[first:] = _ewm(rsv[first:], 1.0 / k_smooth, state.get("k", 50.0))
+        d_line[first:] = _ewm(k_line[first:], 1.0 / d_smooth, state.get("d", 50.0))
+    j_line = 3.0 * k_line - 2.0 * d_line
+    outputs = {"value": k_line, "k": k_line, "d": d_line, "j": j_line}
+    return outputs, {
+        "high_tail": high_tail,
+        "low_tail": low_tail,
+        "k": float(k_line[-1]) if valid.size else state.get("k", 50.0),
+        "d": float(d_line[-1]) if valid.size else state.get("d", 50.0),
+    }
+
+
+KERNELS: Dict[str, Tuple[Callable[..., KernelResult], Dict[str, float]]] = {
+    "sma": (_sma, {"window": 20}),
+    "ema": (_ema, {"window": 20}),
+    "rsi": (_rsi, {"window": 14}),
+    "macd": (_macd, {"fast": 12, "slow": 26, "signal": 9}),
+    "boll": (_boll, {"window": 20, "k": 2}),
+    "atr": (_atr, {"window": 14}),
+    "kdj": (_kdj, {"window": 9, "k_smooth": 3, "d_smooth": 3}),
+}
+
+KLINE_TIMEFRAMES = {
+    "d": "1d",
+    "w": "1w",
+    "m": "1mo",
+    "15": "15m",
+    "30": "30m",
+    "60": "60m",
+}
+
+
+def resolve_params(name: str, params: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Merge user parameters with the kernel defaults, rejecting unknown keys."""
+    if name not in KERNELS:
+        raise ValueError(f"不支持的指标: {name}")
+    defaults = KERNELS[name][1]
+    unknown = set(params or {}) - set(defaults)
+    if unknown:
+        raise ValueError(f"指标 {name} 不支持参数: {', '.join(sorted(unknown))}")
+    return {**defaults, **(params or {})}
+
+
+def indicator_key(name: str, params: Dict[str, float]) -> str:
+    """Stable identifier stored in ``indicator_data.indicator``, e.g. ``rsi14``."""
+    defaults = KERNELS[name][1]
+    if set(defaults) == {"window"}:
+        return f"{name}{int(params['window'])}"
+    if all(params[key] == value for key, value in defaults.items()):
+        return name
+    return "_".join([name] + [f"{params[key]:g}" for key in defaults])
+
+
+def run_kernel(
+    name: str,
+    params: Dict[str, float],
+    bars: Bars,
+    state: Optional[Dict[str, Any]] = None,
+) -> KernelResult:
+    """Evaluate one indicator, optionally continuing from a previous state."""
+    kernel = KERNELS[name][0]
+    return kernel(bars, params, dict(state or {}))
+
+
+def documents_to_bars(documents: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, Bars]:
+    """Turn K-line documents into timestamp and OHLC column arrays."""
+    timestamps = np.array(
+        [document["timestamp"] for document in documents], dtype=object
+    )
+    bars = {
+        field: np.array(
+            [float(document.get(field, document["close"])) for document in documents],
+            dtype=float,
+        )
+        for field in ("open", "high", "low", "close")
+    }
+    return timestamps, bars
+
+
+class TechnicalIndicatorService:
+    """Compute common technical indicators next to the stored K-line data."""
+
+    MAX_SYMBOLS = 200
+
+    def __init__(self, registry: Optional[DataSinkRegistry] = None) -> None:
+        self.registry = registry or data_sink_registry
+        self._kline_repositories: Dict[str, StockKlineRepository] = {}
+        self._indicator_repositories: Dict[str, IndicatorDataRepository] = {}
+
+    async def compute(
+        self, request: IndicatorComputeRequest
+    ) -> IndicatorComputeResponse:
+        """计算指标并直接返回，不落库"""
+        records = await self._compute_records(request)
+        return IndicatorComputeResponse(total=len(records), data=records)
+
+    async def compute_and_store(
+        self, request: IndicatorComputeRequest
+    ) -> IndicatorWriteSummary:
+        """计算指标并按 indicator_data 的结构写入"""
+        records = await self._compute_records(request)
+        repository = self._get_indicator_repository(request.target)
+        await repository.ensure_indexes()
+        documents = [
+            self.record_to_document(request.provider, record) for record in records
+        ]
+        stats = await repository.upsert_many(documents)
+        self._notify_written(request.target, documents)
+        return IndicatorWriteSummary(
+            total=len(documents),
+            matched=stats.get("matched", 0),
+            modified=stats.get("modified", 0),
+            upserted=stats.get("upserted", 0),
+        )
+
+    @staticmethod
+    def _notify_written(target: str, documents: List[Dict[str, Any]]) -> None:
+        """Invalidate cached reads of the written indicators and notify subscribers."""
+        for indicator in {document["indicator"] for document in documents}:
+            data_versions.bump("indicator", indicator_version_key(target, indicator))
+        realtime_hub.publish("indicator", target, documents)
+
+    async def _compute_records(
+        self, request: IndicatorComputeRequest
+    ) -> List[IndicatorRecord]:
+        if len(request.symbols) > self.MAX_SYMBOLS:
+            raise ValueError(f"单次最多计算 {self.MAX_SYMBOLS} 只股票")
+
+        specs = [
+            (spec.name, resolve_params(spec.name, spec.params))
+            for spec in request.indicators
+        ]
+        start = self._normalize_timestamp(request.start) if request.start else None
+        end = self._normalize_timestamp(request.end) if request.end else None
+        timeframe = KLINE_TIMEFRAMES[request.frequency]
+
+        # Warm-up history matters for the recursive indicators, so bars are read
+        # from the beginning and only the output is clipped to [start, end].
+        repository = self._get_kline_repository(request.source_target)
+        histories = await asyncio.gather(
+            *[
+                repository.find_bars(symbol, request.frequency, end=end)
+                for symbol in request.symbols
+            ]
+        )
+
+        records: List[IndicatorRecord] = []
+        for symbol, documents in zip(request.symbols, histories):
+            if not documents:
+                continue
+            timestamps, bars = documents_to_bars(documents)
+            keep = np.ones(timestamps.size, dtype=bool)
+            if start:
+                keep &= np.array([ts >= start for ts in timestamps], dtype=bool)
+            for name, params in specs:
+                outputs, _ = run_kernel(name, params, bars)
+                records.extend(
+                    self.outputs_to_records(
+                        symbol, timeframe, name, params, timestamps, outputs, keep
+                    )
+                )
+        return records
+
+    @staticmethod
+    def outputs_to_records(
+        symbol: str,
+        timeframe: str,
+        name: str,
+        params: Dict[str, float],
+        timestamps: np.ndarray,
+        outputs: Dict[str, np.ndarray],
+        keep: Optional[np.ndarray] = None,
+    ) -> List[IndicatorRecord]:
+        """Convert kernel output columns into indicator records (NaN rows skipped)."""
+        key = indicator_key(name, params)
+        value = outputs["value"]
+        mask = np.isfinite(value)
+        if keep is not None:
+            mask &= keep
+        extra = {field: column for field, column in outputs.items() if field != "value"}
+        records = []
+        for index in np.flatnonzero(mask):
+            records.append(
+                IndicatorRecord(
+                    symbol=symbol,
+                    indicator=key,
+                    timeframe=timeframe,
+                    timestamp=timestamps[index],
+                    value=round(float(value[index]), 6),
+                    values={
+                        field: round(float(column[index]), 6)
+                        for field, column in extra.items()
+                        if np.isfinite(column[index])
+                    },
+                    payload={"name": name, "params": params},
+                    tags=["builtin"],
+                )
+            )
+        return records
+
+    @staticmethod
+    def record_to_document(provider: str, record: IndicatorRecord) -> Dict[str, Any]:
+        return {
+            "indicator": record.indicator,
+            "symbol": record.symbol,
+            "timeframe": record.timeframe,
+            "timestamp": IndicatorRecord.normalize_timestamp(record.timestamp),
+            "value": record.value,
+            "values": record.values,
+            "payload": record.payload,
+            "tags": sorted(set(record.tags)),
+            "provider": provider,
+        }
+
+    def _get_kline_repository(self, target: str) -> StockKlineRepository:
+        key = target or "primary"
+        if key not in self._kline_repositories:
+            collection = self.registry.get_collection("stock_kline", key)
+            self._kline_repositories[key] = StockKlineRepository(collection=collection)
+        return self._kline_repositories[key]
+
+    def _get_indicator_repository(self, target: str) -> IndicatorDataRepository:
+        key = target or "primary"
+        if key not in self._indicator_repositories:
+            collection = self.registry.get_collection("indicator", key)
+            self._indicator_repositories[key] = IndicatorDataRepository(
+                collection=collection
+            )
+        return self._indicator_repositories[key]
+
+    @staticmethod
+    def _normalize_timestamp(value: datetime) -> datetime:
+        if value.tzinfo:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+def parse_indicator_list(raw: str) -> List[Tuple[str, Dict[str, float]]]:
+    """Parse ``"sma20,rsi14,macd"`` into (name, params) pairs."""
+    specs: List[Tuple[str, Dict[str, float]]] = []
+    for token in (raw or "").split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        match = re.fullmatch(r"([a-z]+)(\d+)?", token)
+        if not match:
+            raise ValueError(f"无法解析的指标配置: {token}")
+        name, window = match.groups()
+        params = {"window": float(window)} if window else {}
+        specs.append((name, resolve_params(name, params)))
+    return specs
+
+
+def _configured_specs() -> List[Tuple[str, Dict[str, float]]]:
+    try:
+        return parse_indicator_list(settings.incremental_indicators)
+    except ValueError as exc:
+        raise ValueError(f"INCREMENTAL_INDICATORS 配置无效: {exc}") from exc
+
+
+# 启动时解析一次，配置错误直接阻止服务启动，而不是让每次写入/读取失败
+INCREMENTAL_SPECS = _configured_specs()
+
+
+class IncrementalIndicatorService(TechnicalIndicatorService):
+    """Keep configured indicators up to date as new K-line bars are ingested.
+
+    Each (symbol, timeframe, indicator) series keeps its rolling state (EMA seeds,
+    RSI averages, window tails) in ``indicator_state``.  Bars newer than the
+    stored state are folded in directly; a series without state, or a batch that
+    restates already processed bars, is rebuilt from the stored history once.
+    Only bars written to ``SOURCE_TARGET`` are followed, since the state is not
+    keyed by K-line target.
+    """
+
+    # 滚动状态与输出对应的 K 线数据目标
+    SOURCE_TARGET = "primary"
+
+    def __init__(
+        self,
+        specs: Optional[List[Tuple[str, Dict[str, float]]]] = None,
+        registry: Optional[DataSinkRegistry] = None,
+        target: Optional[str] = None,
+    ) -> None:
+        super().__init__(registry=registry)
+        self.specs = specs if specs is not None else INCREMENTAL_SPECS
+        self.target = target or settings.incremental_indicator_target
+        self._states: Optional[IndicatorStateRepository] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.specs)
+
+    async def on_kline_ingested(
+        self, documents: Sequence[Dict[str, Any]]
+    ) -> IndicatorWriteSummary:
+        """Update indicator points for the symbols that just received bars."""
+        if not self.enabled or not documents:
+            return IndicatorWriteSummary(total=0, matched=0, modified=0, upserted=0)
+
+        grouped: Dict[str, Dict[str, Dict[Any, Dict[str, Any]]]] = {}
+        for document in documents:
+            by_symbol = grouped.setdefault(document["frequency"], {})
+            bars = by_symbol.setdefault(document["symbol"], {})
+            bars[document["timestamp"]] = document
+
+        states = self._get_state_repository()
+        await states.ensure_indexes()
+        keys = {
+            indicator_key(name, params): (name, params) for name, params in self.specs
+        }
+        kline_repository = self._get_kline_repository(self.SOURCE_TARGET)
+
+        points: List[Dict[str, Any]] = []
+        new_states: List[Dict[str, Any]] = []
+        for frequency, symbols in grouped.items():
+            timeframe = KLINE_TIMEFRAMES.get(frequency, frequency)
+            stored = await states.find_states(symbols.keys(), timeframe, keys.keys())
+            for symbol, by_timestamp in symbols.items():
+                fresh = [by_timestamp[ts] for ts in sorted(by_timestamp)]
+                first_new = fresh[0]["timestamp"]
+                history: Optional[Tuple[np.ndarray, Bars]] = None
+                for key, (name, params) in keys.items():
+                    state_doc = stored.get((symbol, key))
+                    keep: Optional[np.ndarray] = None
+                    if state_doc and state_doc["last_timestamp"] < first_new:
+                        timestamps, bars = documents_to_bars(fresh)
+                        outputs, state = run_kernel(
+                            name, params, bars, state_doc.get("state")
+                        )
+                    else:
+                        if history is None:
+                            history = documents_to_bars(
+                                await kline_repository.find_bars(symbol, frequency)
+                            )
+                        timestamps, bars = history
+                        if not timestamps.size:
+                            continue
+                        outputs, state = run_kernel(name, params, bars)
+                        if state_doc:
+                            keep = np.array(
+                                [ts >= first_new for ts in timestamps], dtype=bool
+                            )
+
+                    records = self.outputs_to_records(
+                        symbol, timeframe, name, params, timestamps, outputs, keep
+                    )
+                    points.extend(
+                        self.record_to_document("builtin", record)
+                        for record in records
+                    )
+                    new_states.append(
+                        {
+                            "symbol": symbol,
+                            "timeframe": timeframe,
+                            "indicator": key,
+                            "name": name,
+                            "params": params,
+                            "last_timestamp": timestamps[-1],
+                            "state": state,
+                        }
+                    )
+
+        repository = self._get_indicator_repository(self.target)
+        await repository.ensure_indexes()
+        stats = await repository.upsert_many(points)
+        await states.save_states(new_states)
+        self._notify_written(self.target, points)
+        return IndicatorWriteSummary(
+            total=len(points),
+            matched=stats.get("matched", 0),
+            modified=stats.get("modified", 0),
+            upserted=stats.get("upserted", 0),
+        )
+
+    def _get_state_repository(self) -> IndicatorStateRepository:
+        if self._states is None:
+            sink = self.registry.resolve("indicator", self.target)
+            self._states = IndicatorStateRepository(database_name=sink.database)
+        return self._states
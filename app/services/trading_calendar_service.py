@@ -0,0 +1,82 @@
+import logging
+from datetime import date
+from typing import Optional
+
+from app.config import settings
+from app.core.data_sinks import DataSinkRegistry, data_sink_registry
+from app.core.data_versions import data_versions
+from app.core.trading_calendar import TradingCalendar, trading_calendar
+from app.models.stock_data import (
+    DataWriteSummary,
+    TradingCalendarBatch,
+    TradingCalendarResponse,
+)
+from app.repositories.stock_kline_repository import StockKlineRepository
+from app.repositories.trading_calendar_repository import TradingCalendarRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TradingCalendarService:
+    """交易日历：合并推送的交易日与基准指数日 K 线，供区间计算按交易日取数"""
+
+    # 推导交易日使用的 K 线数据目标
+    SOURCE_TARGET = "primary"
+    MAX_RANGE_DAYS = 366 * 30
+
+    def __init__(
+        self,
+        registry: Optional[DataSinkRegistry] = None,
+        repository: Optional[TradingCalendarRepository] = None,
+        calendar: Optional[TradingCalendar] = None,
+    ) -> None:
+        self.registry = registry or data_sink_registry
+        self.repository = repository or TradingCalendarRepository()
+        self.calendar = calendar if calendar is not None else trading_calendar
+
+    async def load(self) -> TradingCalendar:
+        """Reload from the pushed calendar plus the reference symbol's daily bars."""
+        pushed = await self.repository.find_days()
+        bars = StockKlineRepository(
+            collection=self.registry.get_collection("stock_kline", self.SOURCE_TARGET)
+        )
+        documents = await bars.find_closes([settings.trading_calendar_symbol], "d")
+        derived = [document["timestamp"] for document in documents]
+        self.calendar.load([*pushed, *derived])
+        logger.info(
+            "Loaded trading calendar with %s days (%s pushed, %s from %s)",
+            len(self.calendar),
+            len(pushed),
+            len(derived),
+            settings.trading_calendar_symbol,
+        )
+        return self.calendar
+
+    async def ensure_loaded(self) -> TradingCalendar:
+        if not self.calendar.is_loaded:
+            await self.load()
+        return self.calendar
+
+    async def ingest(self, payload: TradingCalendarBatch) -> DataWriteSummary:
+        await self.repository.ensure_indexes()
+        days = sorted(set(payload.dates))
+        stats = await self.repository.upsert_days(payload.exchange, days)
+        await self.ensure_loaded()
+        self.calendar.extend(days)
+        if days:
+            data_versions.bump("trading_calendar", payload.exchange)
+        return DataWriteSummary(
+            total=len(days),
+            matched=stats.get("matched", 0),
+            modified=stats.get("modified", 0),
+            upserted=stats.get("upserted", 0),
+        )
+
+    async def get_range(self, start: date, end: date) -> TradingCalendarResponse:
+        if start > end:
+            raise ValueError("start 不能晚于 end")
+        if (end - start).days > self.MAX_RANGE_DAYS:
+            raise ValueError(f"查询区间不能超过 {self.MAX_RANGE_DAYS} 天")
+        calendar = await self.ensure_loaded()
+        days = calendar.range(start, end)
+        return TradingCalendarResponse(start=start, end=end, days=days, total=len(days))
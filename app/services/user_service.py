@@ -1,10 +1,77 @@
+import asyncio
 from datetime import datetime
 from typing import List, Optional
 
-from app.core.security import get_password_hash, verify_password
+from app.config import settings
+from app.core.cache import TTLLRUCache
+from app.core.data_versions import data_versions
+from app.core.invalidation import ALL, InvalidationEvent, invalidation_bus
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models.user import User, UserCreate, UserInDB, UserUpdate
 from app.repositories.user_repository import UserRepository
 
+DEFAULT_ADMIN_USERNAME = "admin"
+DEFAULT_ADMIN_PASSWORD = "123456"
+
+
+class DefaultAdminCache:
+    """The provisioned demo admin, served to anonymous requests without a query."""
+
+    def __init__(self) -> None:
+        self.user: Optional[User] = None
+        self.lock = asyncio.Lock()
+
+    def sync(self, user_id: str, user: Optional[User]) -> None:
+        """Replace the cached admin after it was changed (``None`` when deleted)."""
+        if self.user is not None and self.user.id == user_id:
+            self.user = user
+
+
+default_admin_cache = DefaultAdminCache()
+
+
+class AuthenticatedUserCache:
+    """Short-TTL ``username → User`` cache for token authentication."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0) -> None:
+        self._entries = TTLLRUCache(maxsize=maxsize, ttl=ttl)
+        # 每次失效递增；查询期间发生过变更的结果不写入缓存
+        self.generation = 0
+
+    def get(self, username: str) -> Optional[User]:
+        return self._entries.get(username)
+
+    def set(self, username: str, user: User, generation: int) -> None:
+        if generation == self.generation:
+            self._entries.set(username, user)
+
+    def invalidate(self, user_id: str) -> None:
+        self.generation += 1
+        if user_id == ALL:
+            self._entries.clear()
+        else:
+            self._entries.discard_where(lambda user: user.id == user_id)
+
+    def clear(self) -> None:
+        self.invalidate(ALL)
+
+
+user_cache = AuthenticatedUserCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl
+)
+
+
+def _on_user_invalidation(event: InvalidationEvent) -> None:
+    # 事件 key 为用户 ID，本进程与其它 worker 的用户变更都会清除缓存
+    user_cache.invalidate(event.key)
+    if event.remote:
+        default_admin_cache.sync(event.key, None)
+        if event.key == ALL:
+            default_admin_cache.user = None
+
+
+invalidation_bus.subscribe("users", _on_user_invalidation)
+
 
 class UserService:
     def __init__(self, repository: Optional[UserRepository] = None) -> None:
@@ -25,7 +92,7 @@ class UserService:
         user_data.setdefault("isReal", True)
         user_doc = UserInDB(
             **user_data,
-            hashed_password=get_password_hash(user_create.password),
+            hashed_password=await get_password_hash_async(user_create.password),
             created_at=now,
             updated_at=now,
         )
@@ -43,6 +110,17 @@ class UserService:
         document = await self.repository.find_by_username(username)
         return self._document_to_user(document) if document else None
 
+    async def get_cached_user_by_username(self, username: str) -> Optional[User]:
+        """``get_user_by_username`` through the authenticated-user cache."""
+        user = user_cache.get(username)
+        if user is not None:
+            return user
+        generation = user_cache.generation
+        user = await self.get_user_by_username(username)
+        if user is not None:
+            user_cache.set(username, user, generation)
+        return user
+
     async def get_user_by_email(self, email: str) -> Optional[User]:
         document = await self.repository.find_by_email(email)
         return self._document_to_user(document) if document else None
@@ -53,7 +131,7 @@ class UserService:
             return None
 
         user_in_db = UserInDB(**self._normalize_document(document))
-        if not verify_password(password, user_in_db.hashed_password):
+        if not await verify_password_async(password, user_in_db.hashed_password):
             return None
 
         return self._document_to_user(document)
@@ -76,41 +154,51 @@ class UserService:
                 raise ValueError("邮箱已存在")
 
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(
+            update_data["hashed_password"] = await get_password_hash_async(
                 update_data.pop("password")
             )
 
         update_data["updated_at"] = datetime.utcnow()
         if not await self.repository.update_user(user_id, update_data):
             return None
-        return await self.get_user_by_id(user_id)
+        return await self._refreshed(user_id)
 
     async def add_roles(self, user_id: str, roles: List[str]) -> Optional[User]:
         if not await self.repository.add_to_set(user_id, "roles", roles):
             return None
-        return await self.get_user_by_id(user_id)
+        return await self._refreshed(user_id)
 
     async def remove_roles(self, user_id: str, roles: List[str]) -> Optional[User]:
         if not await self.repository.pull_from_set(user_id, "roles", roles):
             return None
-        return await self.get_user_by_id(user_id)
+        return await self._refreshed(user_id)
 
     async def add_permissions(
         self, user_id: str, permissions: List[str]
     ) -> Optional[User]:
         if not await self.repository.add_to_set(user_id, "permissions", permissions):
             return None
-        return await self.get_user_by_id(user_id)
+        return await self._refreshed(user_id)
 
     async def remove_permissions(
         self, user_id: str, permissions: List[str]
     ) -> Optional[User]:
         if not await self.repository.pull_from_set(user_id, "permissions", permissions):
             return None
-        return await self.get_user_by_id(user_id)
+        return await self._refreshed(user_id)
 
     async def delete_user(self, user_id: str) -> bool:
-        return await self.repository.delete_user(user_id)
+        deleted = await self.repository.delete_user(user_id)
+        if deleted:
+            data_versions.bump("users", user_id)
+            default_admin_cache.sync(user_id, None)
+        return deleted
+
+    async def _refreshed(self, user_id: str) -> Optional[User]:
+        data_versions.bump("users", user_id)
+        user = await self.get_user_by_id(user_id)
+        default_admin_cache.sync(user_id, user)
+        return user
 
     async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         users: List[User] = []
@@ -141,36 +229,56 @@ class UserService:
         return await self.get_user_by_id(user.id)
 
     async def ensure_default_admin(self) -> User:
-        """Ensure a demo admin user exists for the front-end integration."""
-        default_password = "123456"
-        existing = await self.repository.find_by_username("admin")
-        now = datetime.utcnow()
+        """Provision the demo admin user once (at startup) and cache it.
 
-        if existing:
-            await self.repository.update_user(
-                str(existing["_id"]),
-                {
-                    "email": existing.get("email") or "admin@example.com",
-                    "display_name": existing.get("display_name") or "系统管理员",
-                    "avatar_url": existing.get("avatar_url")
-                    or self._default_avatar("admin"),
-                    "remark": existing.get("remark") or "系统默认管理员",
-                    "is_superuser": True,
-                    "roles": list(set(existing.get("roles") or []) | {"admin"}),
-                    "hashed_password": get_password_hash(default_password),
-                    "updated_at": now,
-                },
+        A missing admin is created with the default password; an existing one
+        keeps its password and only gets the superuser flag, the ``admin`` role
+        and any missing profile fields.
+        """
+        existing = await self.repository.find_by_username(DEFAULT_ADMIN_USERNAME)
+        if existing is None:
+            user = await self.create_superuser(
+                username=DEFAULT_ADMIN_USERNAME,
+                email="admin@example.com",
+                password=DEFAULT_ADMIN_PASSWORD,
+                full_name="系统管理员",
             )
-            refreshed = await self.get_user_by_username("admin")
-            if refreshed:
-                return refreshed
+            default_admin_cache.user = user
+            return user
 
-        return await self.create_superuser(
-            username="admin",
-            email="admin@example.com",
-            password=default_password,
-            full_name="系统管理员",
-        )
+        defaults = {
+            "email": "admin@example.com",
+            "display_name": "系统管理员",
+            "avatar_url": self._default_avatar(DEFAULT_ADMIN_USERNAME),
+            "remark": "系统默认管理员",
+        }
+        updates = {
+            field: value for field, value in defaults.items() if not existing.get(field)
+        }
+        if not existing.get("is_superuser"):
+            updates["is_superuser"] = True
+        if "admin" not in (existing.get("roles") or []):
+            updates["roles"] = [*(existing.get("roles") or []), "admin"]
+        if not existing.get("hashed_password"):
+            updates["hashed_password"] = await get_password_hash_async(
+                DEFAULT_ADMIN_PASSWORD
+            )
+        if updates:
+            updates["updated_at"] = datetime.utcnow()
+            await self.repository.update_user(str(existing["_id"]), updates)
+            existing = await self.repository.find_by_username(DEFAULT_ADMIN_USERNAME)
+        user = self._document_to_user(existing)
+        default_admin_cache.user = user
+        return user
+
+    async def get_default_admin(self) -> User:
+        """Cached default admin; provisions it if startup did not."""
+        cache = default_admin_cache
+        if cache.user is None:
+            async with cache.lock:
+                if cache.user is None:
+                    await self.ensure_default_admin()
+        return cache.user
 
     @staticmethod
     def _document_to_user(document: dict) -> User:
@@ -0,0 +1,88 @@
+"""
+把 K 线文档透视成“交易日 × 股票”矩阵的工具函数
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def pivot_bars(
+    documents: Sequence[Dict[str, Any]],
+    fields: Sequence[str],
+    symbols: Optional[Sequence[str]] = None,
+) -> Tuple[np.ndarray, list, Dict[str, np.ndarray]]:
+    """Pivot bar documents into ``dates x symbols`` matrices, one per field.
+
+    Bars are bucketed by calendar day so feeds stamping daily bars at different
+    times of day still line up; missing values are ``NaN``.  When ``symbols`` is
+    omitted the columns are the sorted symbols present in ``documents``.
+    Returns ``(dates, symbols, {field: matrix})`` with ``datetime64[D]`` dates.
+    """
+    if symbols is None:
+        symbols = sorted({document.get("symbol") for document in documents} - {None})
+    symbols = list(symbols)
+    column_of = {symbol: index for index, symbol in enumerate(symbols)}
+    rows = [
+        document
+        for document in documents
+        if document.get("symbol") in column_of
+        and isinstance(document.get("timestamp"), datetime)
+    ]
+    if not rows:
+        return (
+            np.empty(0, dtype="datetime64[D]"),
+            symbols,
+            {field: np.empty((0, len(symbols))) for field in fields},
+        )
+
+    # 先对去重后的时间戳求日期，避免逐条转换 datetime
+    timestamps = [document["timestamp"] for document in rows]
+    day_of = {value: value.toordinal() for value in set(timestamps)}
+    ordinals = np.fromiter(
+        (day_of[value] for value in timestamps), dtype=np.int64, count=len(rows)
+    )
+    unique_days, row_index = np.unique(ordinals, return_inverse=True)
+    columns = np.fromiter(
+        (column_of[document["symbol"]] for document in rows),
+        dtype=np.int64,
+        count=len(rows),
+    )
+
+    matrices: Dict[str, np.ndarray] = {}
+    for field in fields:
+        values = np.array(
+            [document.get(field) for document in rows], dtype=float
+        )
+        matrix = np.full((unique_days.size, len(symbols)), np.nan)
+        matrix[row_index, columns] = values
+        matrices[field] = matrix
+
+    dates = (unique_days - _EPOCH_ORDINAL).astype("datetime64[D]")
+    return dates, symbols, matrices
+
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Carry the last value forward over missing rows (column-wise)."""
+    if matrix.size == 0:
+        return matrix
+    rows = np.arange(matrix.shape[0])[:, None]
+    source = np.where(np.isnan(matrix), 0, rows)
+    np.maximum.accumulate(source, axis=0, out=source)
+    return matrix[source, np.arange(matrix.shape[1])]
+
+
+def shift_rows(matrix: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shift a matrix down by ``periods`` rows, padding with ``NaN``."""
+    shifted = np.full_like(matrix, np.nan, dtype=float)
+    if 0 < periods < matrix.shape[0]:
+        shifted[periods:] = matrix[:-periods]
+    return shifted
+
+
+def dates_to_datetimes(dates: np.ndarray) -> list:
+    """``datetime64[D]`` array -> list of naive midnight ``datetime``."""
+    return dates.astype("datetime64[us]").tolist()
@@ -0,0 +1,180 @@
+"""
+选股条件表达式的安全求值
+
+表达式用 Python 语法书写（如 ``pe_ttm < 20 and pct_change > 3 and industry in ("银行", "证券")``），
+经 ``ast`` 解析后只允许比较、布尔运算、四则运算、字段名与常量，编译成对整列
+NumPy 数组求值的闭包；不会调用 ``eval``，也无法访问属性、函数或内置对象。
+四则运算只接受数值常量与数值字段，文本不能参与运算（避免 ``"a" * 10**8`` 之类的
+表达式构造超大字符串）。
+"""
+
+import ast
+import operator
+from functools import lru_cache
+from typing import AbstractSet, Any, Callable, FrozenSet, Mapping
+
+import numpy as np
+
+Columns = Mapping[str, np.ndarray]
+Evaluator = Callable[[Columns], Any]
+
+MAX_EXPRESSION_LENGTH = 1000
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_LOGICAL = {ast.BitAnd: np.logical_and, ast.BitOr: np.logical_or}
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+def _constant_values(node: ast.AST) -> list:
+    if not isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        raise ValueError("in / not in 右侧必须是常量列表，如 (\"银行\", \"证券\")")
+    values = []
+    for element in node.elts:
+        if not isinstance(element, ast.Constant):
+            raise ValueError("in / not in 列表中只能包含常量")
+        values.append(element.value)
+    return values
+
+
+def _check_numeric(node: ast.AST, text_names: AbstractSet[str]) -> None:
+    """Reject text constants and text columns as arithmetic operands."""
+    if isinstance(node, ast.Constant) and not isinstance(
+        node.value, (bool, int, float)
+    ):
+        raise ValueError("四则运算只能用于数值字段和数值常量")
+    if isinstance(node, ast.Name) and node.id in text_names:
+        raise ValueError(f"文本字段 {node.id} 不能参与四则运算")
+
+
+def _compile(
+    node: ast.AST, names: FrozenSet[str], text_names: FrozenSet[str] = frozenset()
+) -> Evaluator:
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, names, text_names)
+
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (bool, int, float, str)):
+            raise ValueError(f"不支持的常量: {node.value!r}")
+        value = node.value
+        return lambda columns: value
+
+    if isinstance(node, ast.Name):
+        if node.id not in names:
+            raise ValueError(f"未知字段: {node.id}")
+        name = node.id
+        return lambda columns: columns[name]
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(value, names, text_names) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda columns: combine.reduce([part(columns) for part in parts])
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, names, text_names)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return lambda columns: np.logical_not(operand(columns))
+        _check_numeric(node.operand, text_names)
+        if isinstance(node.op, ast.USub):
+            return lambda columns: -operand(columns)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise ValueError("不支持的一元运算")
+
+    if isinstance(node, ast.BinOp):
+        left = _compile(node.left, names, text_names)
+        right = _compile(node.right, names, text_names)
+        apply = _ARITHMETIC.get(type(node.op))
+        if apply is not None:
+            _check_numeric(node.left, text_names)
+            _check_numeric(node.right, text_names)
+        else:
+            apply = _LOGICAL.get(type(node.op))
+        if apply is None:
+            raise ValueError("只支持 + - * / 以及 & | ~ 运算")
+        return lambda columns: apply(left(columns), right(columns))
+
+    if isinstance(node, ast.Compare):
+        # a < b < c 等价于 (a < b) and (b < c)
+        operands = [node.left, *node.comparators]
+        checks = []
+        for op, left_node, right_node in zip(node.ops, operands, operands[1:]):
+            left = _compile(left_node, names, text_names)
+            if isinstance(op, (ast.In, ast.NotIn)):
+                values = _constant_values(right_node)
+                invert = isinstance(op, ast.NotIn)
+                checks.append(
+                    lambda columns, left=left, values=values, invert=invert: np.isin(
+                        left(columns), values, invert=invert
+                    )
+                )
+                continue
+            compare = _COMPARISONS.get(type(op))
+            if compare is None:
+                raise ValueError("不支持的比较运算")
+            right = _compile(right_node, names, text_names)
+            checks.append(
+                lambda columns, left=left, right=right, compare=compare: compare(
+                    left(columns), right(columns)
+                )
+            )
+        if len(checks) == 1:
+            return checks[0]
+        return lambda columns: np.logical_and.reduce(
+            [check(columns) for check in checks]
+        )
+
+    raise ValueError(f"表达式中不允许使用 {type(node).__name__}")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(
+    expression: str, names: FrozenSet[str], text_names: FrozenSet[str] = frozenset()
+) -> Evaluator:
+    """Parse and compile ``expression`` against the allowed column ``names``.
+
+    ``text_names`` are the non-numeric columns, which may only be compared.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"表达式长度不能超过 {MAX_EXPRESSION_LENGTH} 个字符")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"表达式语法错误: {exc.msg}") from exc
+    return _compile(tree, names, text_names)
+
+
+def evaluate_mask(expression: str, columns: Columns, size: int) -> np.ndarray:
+    """Evaluate a filter expression to a boolean mask of length ``size``.
+
+    CPU-bound on large snapshots; async callers should run it in an executor.
+    """
+    text_names = frozenset(
+        name for name, column in columns.items() if column.dtype.kind not in "biuf"
+    )
+    evaluator = compile_expression(expression, frozenset(columns), text_names)
+    try:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = evaluator(columns)
+        mask = np.asarray(result)
+    except TypeError as exc:
+        raise ValueError("表达式中存在类型不匹配的运算（如文本字段与数字比较）") from exc
+    except ValueError as exc:
+        raise ValueError("表达式无法求值，请检查 and / or 两侧是否都是条件判断") from exc
+    if mask.dtype != bool:
+        raise ValueError("表达式的结果必须是条件判断（布尔值）")
+    try:
+        return np.broadcast_to(mask, (size,))
+    except ValueError as exc:
+        raise ValueError("表达式的结果必须是逐只股票的条件判断") from exc
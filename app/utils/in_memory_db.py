@@ -5,20 +5,63 @@ from typing import Any, Dict, Iterable, List, Optional
 from bson import ObjectId
 
 
+_COMPARISONS = {
+    "$gt": lambda value, bound: value > bound,
+    "$gte": lambda value, bound: value >= bound,
+    "$lt": lambda value, bound: value < bound,
+    "$lte": lambda value, bound: value <= bound,
+}
+
+
+def _matches_operators(value: Any, expected: Dict[str, Any]) -> bool:
+    for operator, operand in expected.items():
+        if operator == "$in":
+            if value not in operand:
+                return False
+        elif operator == "$nin":
+            if value in operand:
+                return False
+        elif operator == "$ne":
+            if value == operand:
+                return False
+        elif operator == "$all":
+            if not isinstance(value, list) or not all(item in value for item in operand):
+                return False
+        elif operator == "$elemMatch":
+            if not isinstance(value, list) or not any(
+                isinstance(item, dict) and _matches(item, operand) for item in value
+            ):
+                return False
+        elif operator in _COMPARISONS:
+            if value is None or not _COMPARISONS[operator](value, operand):
+                return False
+        else:
+            return value == expected
+    return True
+
+
+def _lookup(document: Dict[str, Any], field: str) -> Any:
+    """Resolve a dotted path through nested documents."""
+    value: Any = document
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
 def _matches(document: Dict[str, Any], filter_query: Dict[str, Any]) -> bool:
     if not filter_query:
         return True
 
     for field, expected in filter_query.items():
-        if isinstance(expected, dict):
-            if "$in" in expected:
-                if document.get(field) not in expected["$in"]:
-                    return False
-            else:
-                if document.get(field) != expected:
-                    return False
+        if isinstance(expected, dict) and expected and all(
+            key.startswith("$") for key in expected
+        ):
+            if not _matches_operators(_lookup(document, field), expected):
+                return False
         else:
-            if document.get(field) != expected:
+            if _lookup(document, field) != expected:
                 return False
     return True
 
@@ -65,6 +108,9 @@ class InMemoryCursor:
         self._sort = (key, direction)
         return self
 
+    def batch_size(self, size: int) -> "InMemoryCursor":
+        return self
+
     async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
         limit = length if length is not None else self._limit
         results = self._prepare_results(limit)
@@ -218,7 +264,11 @@ class InMemoryCollection:
         await asyncio.sleep(0)
         return count
 
-    def find(self, filter_query: Optional[Dict[str, Any]] = None) -> InMemoryCursor:
+    def find(
+        self,
+        filter_query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> InMemoryCursor:
         return InMemoryCursor(self, filter_query or {})
 
     def _clone_document(self, document: Dict[str, Any]) -> Dict[str, Any]:
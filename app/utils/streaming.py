@@ -0,0 +1,57 @@
+"""
+Helpers for newline-delimited JSON (NDJSON) and Server-Sent Events responses.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, List
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError(f"无法序列化类型 {type(value).__name__}")
+
+
+def encode_json(item: Any) -> str:
+    """Serialize ``item`` without FastAPI's per-field response re-encoding.
+
+    Models are expanded shallowly; nested models and datetimes go through
+    ``_json_default``, so large payloads of plain dicts serialize in one pass.
+    """
+    if isinstance(item, BaseModel):
+        item = dict(item)
+    return json.dumps(item, ensure_ascii=False, default=_json_default)
+
+
+def encode_ndjson_line(item: Any) -> str:
+    return encode_json(item) + "\n"
+
+
+def encode_sse_event(event: str, item: Any) -> bytes:
+    """One Server-Sent Events message carrying ``item`` as JSON."""
+    return f"event: {event}\ndata: {encode_json(item)}\n\n".encode("utf-8")
+
+
+async def iter_ndjson(
+    items: AsyncIterable[Any], chunk_size: int = 200
+) -> AsyncIterator[bytes]:
+    """Encode items as NDJSON, flushing every ``chunk_size`` lines."""
+    buffer: List[str] = []
+    async for item in items:
+        buffer.append(encode_ndjson_line(item))
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
@@ -21,6 +21,7 @@ API_TAGS: List[Dict[str, str]] = [
     {"name": "指标数据", "description": "技术指标查询与推送"},
     {"name": "数据接入", "description": "股票基础/K线/行情推送接口"},
     {"name": "行业分析", "description": "行业动量与行业宽度等衍生指标"},
+    {"name": "实时推送", "description": "新写入 K 线与指标的 SSE 订阅"},
     {"name": "系统监控", "description": "服务状态与健康检查"},
 ]
 
@@ -30,7 +31,13 @@ SECURITY_SCHEMES: Dict[str, Any] = {
         "scheme": "bearer",
         "bearerFormat": "JWT",
         "description": "在 Authorization 请求头中携带 Bearer {token}",
-    }
+    },
+    "ApiKeyAuth": {
+        "type": "apiKey",
+        "in": "header",
+        "name": "X-API-Key",
+        "description": "服务账号 API Key，可替代 Bearer 令牌访问按权限校验的接口",
+    },
 }
 
 SERVERS: List[Dict[str, str]] = [
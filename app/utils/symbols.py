@@ -0,0 +1,47 @@
+"""
+股票代码与板块规则工具函数
+
+平台内统一使用 ``SH600519`` 形式的 symbol，前端展示使用 6 位数字代码。
+"""
+
+from typing import Optional
+
+_EXCHANGES = ("SH", "SZ", "BJ")
+
+
+def symbol_to_code(symbol: str) -> str:
+    """``SH600519`` -> ``600519``."""
+    normalized = (symbol or "").strip().upper()
+    if normalized[:2] in _EXCHANGES:
+        return normalized[2:]
+    return normalized
+
+
+def code_to_symbol(code: str) -> str:
+    """``600519`` -> ``SH600519``; symbols with an exchange prefix pass through."""
+    normalized = (code or "").strip().upper().replace(".", "")
+    if normalized[:2] in _EXCHANGES:
+        return normalized
+    if normalized[-2:] in _EXCHANGES:
+        return normalized[-2:] + normalized[:-2]
+    if normalized.startswith(("6", "9")) and not normalized.startswith("92"):
+        return f"SH{normalized}"
+    if normalized.startswith(("4", "8", "92")):
+        return f"BJ{normalized}"
+    return f"SZ{normalized}"
+
+
+def price_limit_ratio(symbol: str, name: Optional[str] = None) -> float:
+    """Daily price limit of a stock as a ratio (0.1 == 10%).
+
+    北交所 30%，创业板（300/301）与科创板（688/689）20%，ST 股 5%，其余主板 10%。
+    """
+    normalized = code_to_symbol(symbol)
+    code = normalized[2:]
+    if normalized.startswith("BJ"):
+        return 0.30
+    if code.startswith(("300", "301", "688", "689")):
+        return 0.20
+    if name and "ST" in name.upper():
+        return 0.05
+    return 0.10
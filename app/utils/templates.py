@@ -0,0 +1,237 @@
+"""
+通知模板渲染（Mustache 子集）
+
+模板先解析为节点树，再生成并编译一个 Python 渲染函数，渲染时只做字典查找与
+字符串拼接。支持：
+
+- ``{{name}}`` / ``{{a.b}}`` 变量，按上下文栈由内向外查找，缺失时为空字符串
+- ``{{#name}}...{{/name}}`` 区块：列表逐项展开，字典压栈，其它真值渲染一次
+- ``{{^name}}...{{/name}}`` 反向区块：值为空或假时渲染
+- ``{{! 注释 }}``
+
+通知是纯文本，变量不做 HTML 转义。编译结果按 (模板 ID, 内容哈希) 缓存，模板内容
+变化即视为新版本。
+"""
+
+import hashlib
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from app.core.cache import VersionedLRUCache
+
+Render = Callable[[Dict[str, Any]], str]
+Node = Tuple[Any, ...]
+
+_TAG = re.compile(r"\{\{\s*([#^/!]?)\s*(.*?)\s*\}\}", re.S)
+_NAME = re.compile(r"^[A-Za-z_][\w]*(\.[A-Za-z_][\w]*)*$")
+# 区块最大嵌套层数；每层生成一个 for 循环，Python 限制静态嵌套块不超过 20 层
+MAX_SECTION_DEPTH = 10
+_MISSING = object()
+_EMPTY: Dict[str, Any] = {}
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _dig(value: Any, path: Tuple[str, ...]) -> Any:
+    for part in path:
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _frames(value: Any) -> List[Dict[str, Any]]:
+    """Context frames a truthy section value expands to."""
+    if isinstance(value, (list, tuple)):
+        return [item if isinstance(item, dict) else _EMPTY for item in value]
+    return [value if isinstance(value, dict) else _EMPTY]
+
+
+def parse_template(source: str) -> List[Node]:
+    """Parse ``source`` into ``("text", str)`` / ``("var", name)`` /
+    ``("section", name, inverted, children)`` nodes."""
+    root: List[Node] = []
+    # 未闭合区块栈：(名称, 是否反向, 外层节点列表)
+    open_sections: List[Tuple[str, bool, List[Node]]] = []
+    current = root
+    position = 0
+    for match in _TAG.finditer(source):
+        if match.start() > position:
+            current.append(("text", source[position : match.start()]))
+        position = match.end()
+        kind, name = match.group(1), match.group(2)
+        if kind == "!":
+            continue
+        if not _NAME.match(name):
+            raise ValueError(f"模板标签无效: {match.group(0)}")
+        if kind in ("#", "^"):
+            if len(open_sections) >= MAX_SECTION_DEPTH:
+                raise ValueError(f"模板区块嵌套超过 {MAX_SECTION_DEPTH} 层")
+            open_sections.append((name, kind == "^", current))
+            current = []
+        elif kind == "/":
+            if not open_sections or open_sections[-1][0] != name:
+                raise ValueError(f"模板区块未正确闭合: {{{{/{name}}}}}")
+            section_name, inverted, parent = open_sections.pop()
+            parent.append(("section", section_name, inverted, current))
+            current = parent
+        else:
+            current.append(("var", name))
+    if open_sections:
+        raise ValueError(f"模板区块缺少结束标签: {{{{#{open_sections[-1][0]}}}}}")
+    if position < len(source):
+        current.append(("text", source[position:]))
+    return root
+
+
+class _CodeGenerator:
+    """Translate parsed nodes into the source of one Python render function.
+
+    Context frames live in locals ``c0``..``cN`` (innermost last), so a lookup
+    is a chain of ``dict.get`` calls without any per-render parsing.  Names are
+    validated by ``_NAME`` and text is emitted through ``repr``.
+    """
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.counter = 0
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def temp(self) -> str:
+        self.counter += 1
+        return f"v{self.counter}"
+
+    def lookup(self, name: str, depth: int) -> str:
+        head, *rest = name.split(".")
+        expression = f"c0.get({head!r})"
+        for level in range(1, depth + 1):
+            temp = self.temp()
+            expression = (
+                f"({temp} if ({temp} := c{level}.get({head!r}, _MISSING)) "
+                f"is not _MISSING else {expression})"
+            )
+        if rest:
+            expression = f"_dig({expression}, {tuple(rest)!r})"
+        return expression
+
+    def nodes(self, nodes: List[Node], indent: int, depth: int) -> None:
+        if not nodes:
+            self.emit(indent, "pass")
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                self.emit(indent, f"append({node[1]!r})")
+            elif kind == "var":
+                value = self.temp()
+                self.emit(indent, f"{value} = {self.lookup(node[1], depth)}")
+                # 字符串值（最常见）跳过格式化调用
+                self.emit(
+                    indent,
+                    f"append({value} if {value}.__class__ is str "
+                    f"else _format({value}))",
+                )
+            else:
+                _, name, inverted, children = node
+                value = self.temp()
+                self.emit(indent, f"{value} = {self.lookup(name, depth)}")
+                if inverted:
+                    self.emit(indent, f"if not {value}:")
+                    self.nodes(children, indent + 1, depth)
+                else:
+                    self.emit(indent, f"if {value}:")
+                    self.emit(indent + 1, f"for c{depth + 1} in _frames({value}):")
+                    self.nodes(children, indent + 2, depth + 1)
+
+    def build(self, nodes: List[Node]) -> str:
+        self.emit(0, "def render(c0):")
+        self.emit(1, "parts = []")
+        self.emit(1, "append = parts.append")
+        self.nodes(nodes, 1, 0)
+        self.emit(1, "return ''.join(parts)")
+        return "\n".join(self.lines)
+
+
+def compile_template(source: str) -> Render:
+    """Parse ``source`` once into a render function taking a context dict.
+
+    Raises ``ValueError`` for invalid markup.
+    """
+    generator = _CodeGenerator()
+    code = generator.build(parse_template(source))
+    namespace: Dict[str, Any] = {
+        "_MISSING": _MISSING,
+        "_dig": _dig,
+        "_format": _format,
+        "_frames": _frames,
+    }
+    exec(compile(code, "<template>", "exec"), namespace)
+    return namespace["render"]
+
+
+class CompiledTemplate:
+    """A compiled template rendering one context or a batch of contexts."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._render = compile_template(source)
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        return self._render(context if isinstance(context, dict) else dict(context))
+
+    def render_many(self, contexts: Iterable[Mapping[str, Any]]) -> List[str]:
+        render = self._render
+        return [
+            render(context if isinstance(context, dict) else dict(context))
+            for context in contexts
+        ]
+
+
+# 编译结果缓存：各用户的模板 ID 可能相同，键同时包含 ID 与内容哈希
+_compiled = VersionedLRUCache(maxsize=1024)
+
+
+def template_version(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def get_template(template_id: Optional[str], source: str) -> CompiledTemplate:
+    """Compiled template for ``(template_id, version of source)``."""
+    version = template_version(source)
+    key = (template_id or "", version)
+    compiled = _compiled.get(key, version)
+    if compiled is None:
+        compiled = CompiledTemplate(source)
+        _compiled.set(key, version, compiled)
+    return compiled
+
+
+def validate_template(source: str) -> None:
+    """Raise ``ValueError`` when ``source`` cannot be compiled."""
+    compile_template(source)
+
+
+def render_template(template: str, context: Mapping[str, Any]) -> str:
+    """Render an ad-hoc template (compiled and cached by content)."""
+    return get_template(None, template).render(context)
+
+
+def render_batch(
+    template_id: Optional[str], source: str, contexts: Sequence[Mapping[str, Any]]
+) -> List[str]:
+    return get_template(template_id, source).render_many(contexts)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""通知模板渲染基准：对比逐次正则替换与编译后批量渲染 10k 个上下文。"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.frontend_state_service import SettingsService
+from app.utils.templates import compile_template, get_template
+
+_SECTION = re.compile(r"\{\{#(\w+)\}\}(.*?)\{\{/\1\}\}", re.S)
+_VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+
+
+def naive_render(template, context):
+    """按字符串替换逐次解析渲染，作为对照。"""
+
+    def expand(match):
+        return "".join(
+            naive_render(match.group(2), {**context, **item})
+            for item in context.get(match.group(1)) or []
+        )
+
+    text = _SECTION.sub(expand, template)
+    return _VARIABLE.sub(lambda match: str(context.get(match.group(1), "")), text)
+
+
+def build_contexts(count, orders):
+    return [
+        {
+            "date": "2025-01-15",
+            "strategyName": f"策略{index % 50}",
+            "orderTime": "2025-01-15 14:55",
+            "orders": [
+                {
+                    "stock": f"{600000 + (index + row) % 900:06d}",
+                    "quantity": 100 * (row + 1),
+                    "orderType": "限价",
+                    "price": 10.5 + row,
+                    "action": "买入" if row % 2 else "卖出",
+                    "position": 5 * row,
+                }
+                for row in range(orders)
+            ],
+        }
+        for index in range(count)
+    ]
+
+
+def timed(label, func, count):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24}{elapsed * 1000:>10.1f} ms{count / elapsed:>14,.0f} 次/秒")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=10_000, help="渲染次数")
+    parser.add_argument("--orders", type=int, default=5, help="每个上下文的委托条数")
+    args = parser.parse_args()
+
+    template = SettingsService.DEFAULT_SETTINGS.notificationTemplates[0].content
+    contexts = build_contexts(args.renders, args.orders)
+
+    expected = timed(
+        "逐次正则替换",
+        lambda: [naive_render(template, context) for context in contexts],
+        args.renders,
+    )
+    recompiled = timed(
+        "每次重新编译",
+        lambda: [compile_template(template)(context) for context in contexts],
+        args.renders,
+    )
+    compiled = get_template("bench", template)
+    rendered = timed(
+        "编译缓存 + 批量渲染",
+        lambda: compiled.render_many(contexts),
+        args.renders,
+    )
+    assert recompiled == expected and rendered == expected, "编译渲染结果与对照不一致"
+
+
+if __name__ == "__main__":
+    main()
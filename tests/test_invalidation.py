@@ -0,0 +1,145 @@
+"""失效总线：用 MemoryBroker 连接两条总线模拟两个 worker"""
+
+import asyncio
+from datetime import datetime
+
+from app.core.data_versions import DataVersionRegistry
+from app.core.invalidation import (
+    ALL,
+    MAX_EVENT_SYMBOLS,
+    InvalidationBus,
+    InvalidationEvent,
+    MemoryBackend,
+    MemoryBroker,
+)
+from app.core.quote_store import LatestQuoteStore
+from app.services.quote_service import QuoteService
+
+
+def _workers(count: int = 2):
+    broker = MemoryBroker()
+    return [InvalidationBus(MemoryBackend(broker)) for _ in range(count)]
+
+
+async def _started(buses):
+    for bus in buses:
+        await bus.start()
+    return buses
+
+
+def test_bump_reaches_other_worker_as_remote_event():
+    async def scenario():
+        first, second = await _started(_workers())
+        versions = [DataVersionRegistry(first), DataVersionRegistry(second)]
+        seen = {"first": [], "second": []}
+        first.subscribe("stock_kline", seen["first"].append)
+        second.subscribe("stock_kline", seen["second"].append)
+
+        version = versions[0].bump("stock_kline", "primary", ["SH600000"])
+
+        assert versions[1].get("stock_kline", "primary") == version
+        assert [event.remote for event in seen["first"]] == [False]
+        assert [event.remote for event in seen["second"]] == [True]
+        assert seen["second"][0].symbols == ("SH600000",)
+
+    asyncio.run(scenario())
+
+
+def test_reset_event_advances_every_version():
+    async def scenario():
+        first, second = await _started(_workers())
+        versions = DataVersionRegistry(second)
+        before = versions.get("indicator", "primary:rsi14")
+        first.backend.publish(InvalidationEvent(ALL, ALL, 0, "redis"))
+        assert versions.get("indicator", "primary:rsi14") > before
+
+    asyncio.run(scenario())
+
+
+def test_stopped_bus_no_longer_receives():
+    async def scenario():
+        first, second = await _started(_workers())
+        received = []
+        second.subscribe(ALL, received.append)
+        await second.stop()
+        first.publish("roles", "all", 1)
+        assert received == []
+
+    asyncio.run(scenario())
+
+
+def test_event_json_round_trip_keeps_symbols():
+    event = InvalidationEvent("stock_kline", "primary", 3, "a", ("SH600000",))
+    decoded = InvalidationEvent.from_json(event.to_json())
+    assert decoded == event
+    legacy = '{"dataset": "roles", "key": "all", "version": 1, "origin": "b"}'
+    assert InvalidationEvent.from_json(legacy).symbols == ()
+
+
+def test_large_writes_fall_back_to_dataset_invalidation():
+    bus = InvalidationBus()
+    symbols = [f"SH{index:06d}" for index in range(MAX_EVENT_SYMBOLS + 1)]
+    assert bus.publish("stock_kline", "primary", 1, symbols).symbols == ()
+
+
+def test_quote_store_marks_only_written_symbols_stale():
+    async def scenario():
+        first, second = await _started(_workers())
+        store = LatestQuoteStore()
+        store.load([])
+        second.subscribe("stock_kline", store.on_invalidation)
+
+        first.publish("stock_kline", "primary", 1, ["SZ000001"])
+        assert store.is_warm
+        assert store.take_stale() == ["SZ000001"]
+
+        first.publish("stock_kline", "secondary", 2, ["SZ000002"])
+        assert not store.has_stale
+
+        first.publish("stock_kline", "primary", 3)
+        assert not store.is_warm
+
+    asyncio.run(scenario())
+
+
+class _CountingRepository:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def find_latest_quotes(self, fields, frequencies=None, symbols=None):
+        self.calls.append(symbols)
+        await asyncio.sleep(0.01)
+        return [
+            {
+                "symbol": symbol,
+                "frequency": "d",
+                "timestamp": datetime(2024, 1, 2),
+                "close": 10.0,
+            }
+            for symbol in symbols or ["SH600000", "SZ000001"]
+        ]
+
+
+class _QuoteService(QuoteService):
+    def __init__(self, store: LatestQuoteStore, repository: _CountingRepository):
+        super().__init__(store=store)
+        self.repository = repository
+
+    def _repository(self):
+        return self.repository
+
+
+def test_concurrent_readers_share_one_reload():
+    async def scenario():
+        store = LatestQuoteStore()
+        repository = _CountingRepository()
+        service = _QuoteService(store, repository)
+
+        await asyncio.gather(*(service.get_latest(["SH600000"]) for _ in range(20)))
+        assert repository.calls == [None]
+
+        store.mark_stale(["SZ000001"])
+        await asyncio.gather(*(service.get_latest(["SZ000001"]) for _ in range(20)))
+        assert repository.calls == [None, ["SZ000001"]]
+
+    asyncio.run(scenario())
@@ -0,0 +1,255 @@
+"""通知分发：SmtpEmailSender 与重试路径，对接本地 SMTP 替身
+
+优先使用 aiosmtpd；未安装时退回标准库 smtpd（Python 3.12 起已移除），两者都没有则跳过。
+"""
+
+import asyncio
+import importlib.util
+import socket
+import threading
+from email import message_from_bytes, policy
+from typing import List, Optional, Tuple
+
+import pytest
+
+from app.core.notifications import (
+    Notification,
+    NotificationDispatcher,
+    NotificationSender,
+    SmtpEmailSender,
+)
+from app.utils.in_memory_db import InMemoryCollection
+
+
+class Inbox:
+    """Accept mail after rejecting the first ``reject`` messages with 451."""
+
+    def __init__(self, reject: int = 0) -> None:
+        self.reject = reject
+        self.delivered: List[Tuple[List[str], bytes]] = []
+        self._lock = threading.Lock()
+
+    def accept(self, recipients: List[str], data: bytes) -> Optional[str]:
+        with self._lock:
+            if self.reject > 0:
+                self.reject -= 1
+                return "451 try later"
+            self.delivered.append((list(recipients), data))
+        return None
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _serve_aiosmtpd(inbox: Inbox, port: int):
+    from aiosmtpd.controller import Controller
+
+    class Handler:
+        async def handle_DATA(self, server, session, envelope):
+            data = envelope.original_content or envelope.content
+            if isinstance(data, str):
+                data = data.encode()
+            return inbox.accept(envelope.rcpt_tos, data) or "250 OK"
+
+    controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller.stop
+
+
+def _serve_smtpd(inbox: Inbox, port: int):
+    import warnings
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import asyncore
+        import smtpd
+
+    channels: dict = {}
+
+    class Server(smtpd.SMTPServer):
+        def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+            return inbox.accept(rcpttos, data)
+
+    server = Server(("127.0.0.1", port), None, map=channels, decode_data=False)
+    stopped = threading.Event()
+
+    def loop() -> None:
+        while not stopped.is_set():
+            asyncore.loop(timeout=0.05, map=channels, count=1)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        stopped.set()
+        thread.join()
+        server.close()
+        asyncore.close_all(map=channels)
+
+    return stop
+
+
+@pytest.fixture
+def smtp_server():
+    """Yield ``(inbox, port)`` of a local SMTP stand-in."""
+    if importlib.util.find_spec("aiosmtpd") is not None:
+        serve = _serve_aiosmtpd
+    elif importlib.util.find_spec("smtpd") is not None:
+        serve = _serve_smtpd
+    else:
+        pytest.skip("需要 aiosmtpd 作为本地 SMTP 替身")
+
+    inbox = Inbox()
+    port = _free_port()
+    stop = serve(inbox, port)
+    try:
+        yield inbox, port
+    finally:
+        stop()
+
+
+def _message(recipient: str, subject: str = "调仓通知") -> Notification:
+    return Notification("email", recipient, subject, "策略名称：Alpha趋势跟踪")
+
+
+def _dispatcher(port: int, max_retries: int = 3) -> NotificationDispatcher:
+    def sender() -> SmtpEmailSender:
+        return SmtpEmailSender("127.0.0.1", port, sender="noreply@example.com")
+
+    return NotificationDispatcher(
+        {"email": sender},
+        workers=1,
+        batch_window=0.01,
+        max_retries=max_retries,
+        retry_delay=0.01,
+    )
+
+
+async def _settled(dispatcher: NotificationDispatcher, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    stats = dispatcher.stats
+    while stats["sent"] + stats["failed"] < stats["queued"]:
+        assert loop.time() < deadline, stats
+        await asyncio.sleep(0.01)
+
+
+def test_sender_delivers_batch_over_smtp(smtp_server):
+    inbox, port = smtp_server
+    sender = SmtpEmailSender("127.0.0.1", port, sender="noreply@example.com")
+    try:
+        failures = sender.send_batch(
+            [_message(f"u{index}@example.com") for index in range(3)]
+        )
+    finally:
+        sender.close()
+
+    assert failures == []
+    assert [recipients for recipients, _ in inbox.delivered] == [
+        ["u0@example.com"],
+        ["u1@example.com"],
+        ["u2@example.com"],
+    ]
+    email = message_from_bytes(inbox.delivered[0][1], policy=policy.default)
+    assert email["From"] == "noreply@example.com"
+    assert email["Subject"] == "调仓通知"
+    assert "Alpha趋势跟踪" in email.get_content()
+
+
+def test_sender_reports_rejected_message_and_keeps_connection(smtp_server):
+    inbox, port = smtp_server
+    inbox.reject = 1
+    sender = SmtpEmailSender("127.0.0.1", port, sender="noreply@example.com")
+    try:
+        failures = sender.send_batch(
+            [_message("a@example.com"), _message("b@example.com")]
+        )
+        client = sender._client
+    finally:
+        sender.close()
+
+    assert [message.recipient for message, _ in failures] == ["a@example.com"]
+    assert client is not None
+    assert [recipients for recipients, _ in inbox.delivered] == [["b@example.com"]]
+
+
+def test_dispatcher_retries_rejected_message_until_delivered(smtp_server):
+    inbox, port = smtp_server
+    inbox.reject = 2
+
+    async def scenario():
+        dispatcher = _dispatcher(port)
+        await dispatcher.start()
+        try:
+            assert dispatcher.submit([_message("a@example.com")]) == 1
+            await _settled(dispatcher)
+        finally:
+            await dispatcher.stop()
+        return dispatcher.stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["sent"] == 1
+    assert stats["retried"] == 2
+    assert stats["failed"] == 0
+    assert [recipients for recipients, _ in inbox.delivered] == [["a@example.com"]]
+
+
+def test_dispatcher_gives_up_after_max_retries(smtp_server):
+    inbox, port = smtp_server
+    inbox.reject = 100
+
+    async def scenario():
+        dispatcher = _dispatcher(port, max_retries=2)
+        await dispatcher.start()
+        try:
+            dispatcher.submit([_message("a@example.com")])
+            await _settled(dispatcher)
+        finally:
+            await dispatcher.stop()
+        return dispatcher.stats
+
+    stats = asyncio.run(scenario())
+
+    assert stats["sent"] == 0
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+    assert inbox.delivered == []
+    assert inbox.reject == 97
+
+
+def test_sender_without_send_batch_fails_on_creation():
+    class Incomplete(NotificationSender):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_subscriber_filter_works_on_in_memory_fallback():
+    collection = InMemoryCollection("strategy_subscriptions")
+    states = {
+        "on": [{"id": "alpha-trend", "subscribed": True}],
+        "off": [{"id": "alpha-trend", "subscribed": False}],
+        "other": [{"id": "beta", "subscribed": True}],
+    }
+
+    async def scenario():
+        for username, strategies in states.items():
+            await collection.insert_one(
+                {"username": username, "state": {"strategies": strategies}}
+            )
+        cursor = collection.find(
+            {
+                "state.strategies": {
+                    "$elemMatch": {"id": "alpha-trend", "subscribed": True}
+                }
+            },
+            {"_id": 0, "username": 1},
+        )
+        return [document["username"] async for document in cursor]
+
+    assert asyncio.run(scenario()) == ["on"]